@@ -0,0 +1,223 @@
+"""
+Logisti-Co simulation result cache.
+"""
+import hashlib
+import json
+import os
+import tempfile
+
+# Modules whose source decides the outcome of a headless simulation.
+ENGINE_MODULES = ["game_model.py", "game_optimizer.py"]
+
+# Version hashes already computed, keyed by module list.
+VERSIONS = {}
+
+
+def code_version(modules=None):
+    """
+    Returns a hex string hashing the source of the simulation code, so
+    results of older code are never served.
+
+    Args:
+        modules: a list of strings of module paths, or None for
+                 ENGINE_MODULES next to this file.
+    """
+    if modules is None:
+        here = os.path.dirname(os.path.abspath(__file__))
+        modules = [os.path.join(here, name) for name in ENGINE_MODULES]
+    key = tuple(modules)
+    if key not in VERSIONS:
+        digest = hashlib.sha256()
+        for module in modules:
+            with open(module, "rb") as source:
+                digest.update(source.read())
+        VERSIONS[key] = digest.hexdigest()
+    return VERSIONS[key]
+
+
+def cache_key(inputs, version=None):
+    """
+    Returns the hex string content address of a set of simulation inputs.
+
+    Inputs are serialized as canonical JSON, with sorted keys and tuples
+    written as lists, so equal inputs always hash the same.
+
+    Args:
+        inputs: a JSON serializable dict of every input of the simulation.
+        version: a string representing the code version, or None for the
+                 current code_version().
+    """
+    canonical = json.dumps({"inputs": inputs, \
+                            "version": code_version() if version is None \
+                                       else version}, \
+                           sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResultCache():
+    """
+    A content-addressed on-disk cache of simulation results, capped in size
+    by evicting the least recently used entries.
+
+    Every entry is a JSON file named by its key. Entries are written to a
+    temporary file and moved into place with os.replace, so concurrent
+    writers from a process pool never expose a partial entry, and reads bump
+    the modification time that eviction orders entries by.
+
+    Attributes:
+        _directory: a string representing the directory of the entries.
+        _max_bytes: an int representing the size the entries are kept under.
+        _estimate: an int estimating the bytes of the entries, or None before
+                   the directory was first measured.
+        _hits: an int counting the lookups found in the cache.
+        _misses: an int counting the lookups missing from the cache.
+    """
+
+    def __init__(self, directory, max_bytes=64 * 1024 * 1024):
+        """
+        Initialize the cache directory.
+
+        Args:
+            directory: a string representing the directory of the entries.
+            max_bytes: an int representing the size the entries are kept
+                       under.
+        """
+        self._directory = directory
+        self._max_bytes = max_bytes
+        self._estimate = None
+        self._hits = 0
+        self._misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        """
+        Returns the path of the entry of a key.
+
+        Args:
+            key: a hex string of a cache key.
+        """
+        return os.path.join(self._directory, key + ".json")
+
+    def get(self, key):
+        """
+        Look up a result.
+
+        Args:
+            key: a hex string of a cache key.
+
+        Returns:
+            The cached result, or None when it is missing.
+        """
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as entry:
+                value = json.load(entry)["value"]
+            os.utime(path)
+        except (FileNotFoundError, ValueError, KeyError):
+            self._misses += 1
+            return None
+        self._hits += 1
+        return value
+
+    def put(self, key, value):
+        """
+        Store a result, then evict entries if the cache grew too large.
+
+        Args:
+            key: a hex string of a cache key.
+            value: a JSON serializable result.
+        """
+        data = json.dumps({"key": key, "value": value}).encode("utf-8")
+        handle, temporary = tempfile.mkstemp(dir=self._directory, \
+                                             suffix=".tmp")
+        try:
+            with os.fdopen(handle, "wb") as entry:
+                entry.write(data)
+            os.replace(temporary, self._path(key))
+        except BaseException:
+            os.unlink(temporary)
+            raise
+        if self._estimate is None:
+            self._estimate = self.size()
+        else:
+            self._estimate += len(data)
+        if self._estimate > self._max_bytes:
+            self.evict()
+
+    def get_or_compute(self, inputs, compute):
+        """
+        Return the cached result of a set of inputs, computing and storing
+        it when missing.
+
+        Args:
+            inputs: a JSON serializable dict of every input of the simulation.
+            compute: a function of no arguments returning the result.
+        """
+        key = cache_key(inputs)
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def _entries(self):
+        """
+        Returns a list of (mtime, size, path) tuples of every entry.
+        """
+        entries = []
+        with os.scandir(self._directory) as scan:
+            for item in scan:
+                if not item.name.endswith(".json"):
+                    continue
+                try:
+                    stat = item.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, item.path))
+        return entries
+
+    def size(self):
+        """
+        Returns the bytes of every entry.
+        """
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self):
+        """
+        Remove the least recently used entries until the cache is back under
+        three quarters of its cap, leaving room before the next eviction.
+        """
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = self._max_bytes * 3 // 4
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                # Another process evicted it first.
+                pass
+            total -= size
+        self._estimate = total
+
+    @property
+    def directory(self):
+        """
+        Returns the directory of the entries.
+        """
+        return self._directory
+
+    @property
+    def hits(self):
+        """
+        Returns the number of lookups found in the cache.
+        """
+        return self._hits
+
+    @property
+    def misses(self):
+        """
+        Returns the number of lookups missing from the cache.
+        """
+        return self._misses
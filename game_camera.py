@@ -0,0 +1,410 @@
+"""
+Logisti-Co scrolling camera.
+"""
+import math
+import pygame
+from game_view import View, VisualText
+
+# Limits of the camera zoom factor.
+MIN_ZOOM = 0.25
+MAX_ZOOM = 4.0
+# Factor the zoom changes by per mouse wheel step.
+ZOOM_STEP = 1.25
+
+
+class Camera():
+    """
+    A scrollable, zoomable window onto a gameboard larger than the screen.
+
+    Board positions map to the screen as
+    viewport corner + floor(board * zoom) - floor(camera * zoom), so
+    neighbouring tiles and sprites always meet on whole pixels.
+
+    Attributes:
+        _viewport: a pygame Rect of the screen area the board is drawn in.
+        _world_size: a tuple of ints of the width and height of the board.
+        _zoom: a float representing the screen pixels per board pixel.
+        _x: a float representing the board x coordinate at the left edge.
+        _y: a float representing the board y coordinate at the top edge.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, world_size, viewport=(0, 0, 800, 600), zoom=1.0,
+                 x_pos=0, y_pos=0):
+        """
+        Initialize the camera and keep it within the board.
+
+        Args:
+            world_size: a tuple of ints of the width and height of the board.
+            viewport: a Rect or (x, y, width, height) tuple of the screen area
+                      the board is drawn in.
+            zoom: a float representing the screen pixels per board pixel.
+            x_pos: an int representing the board x coordinate at the left
+                   edge.
+            y_pos: an int representing the board y coordinate at the top
+                   edge.
+        """
+        self._viewport = pygame.Rect(viewport)
+        self._world_size = world_size
+        self._zoom = min(max(zoom, MIN_ZOOM), MAX_ZOOM)
+        self._x = x_pos
+        self._y = y_pos
+        self._clamp()
+
+    def _clamp(self):
+        """
+        Keep the camera from scrolling past the edges of the board.
+        """
+        max_x = self._world_size[0] - self._viewport.width / self._zoom
+        max_y = self._world_size[1] - self._viewport.height / self._zoom
+        self._x = min(max(self._x, 0), max(max_x, 0))
+        self._y = min(max(self._y, 0), max(max_y, 0))
+
+    def pan(self, x_change, y_change):
+        """
+        Scroll the camera.
+
+        Args:
+            x_change: an int representing the screen pixels to scroll right.
+            y_change: an int representing the screen pixels to scroll down.
+        """
+        self._x += x_change / self._zoom
+        self._y += y_change / self._zoom
+        self._clamp()
+
+    def zoom_by(self, steps, anchor=None):
+        """
+        Zoom the camera in or out keeping the board point under an anchor
+        still.
+
+        Args:
+            steps: an int representing the zoom steps, positive to zoom in.
+            anchor: a tuple of ints of the screen position kept still, or None
+                    for the center of the viewport.
+        """
+        if anchor is None:
+            anchor = self._viewport.center
+        offset_x = anchor[0] - self._viewport.x
+        offset_y = anchor[1] - self._viewport.y
+        board_x = self._x + offset_x / self._zoom
+        board_y = self._y + offset_y / self._zoom
+        self._zoom = min(max(self._zoom * ZOOM_STEP ** steps, MIN_ZOOM), \
+                         MAX_ZOOM)
+        self._x = board_x - offset_x / self._zoom
+        self._y = board_y - offset_y / self._zoom
+        self._clamp()
+
+    def scale(self, value):
+        """
+        Returns the whole screen pixel a board coordinate scales to.
+
+        Args:
+            value: a number representing a board coordinate or length.
+        """
+        return math.floor(value * self._zoom)
+
+    def world_rect(self):
+        """
+        Returns a pygame Rect of the board area shown in the viewport.
+        """
+        return pygame.Rect(int(self._x), int(self._y), \
+                           math.ceil(self._viewport.width / self._zoom) + 1, \
+                           math.ceil(self._viewport.height / self._zoom) + 1)
+
+    def to_screen(self, pos):
+        """
+        Returns a tuple of ints of the screen position of a board position.
+
+        Args:
+            pos: a tuple of numbers of the board position.
+        """
+        return (self._viewport.x + self.scale(pos[0]) - self.scale(self._x), \
+                self._viewport.y + self.scale(pos[1]) - self.scale(self._y))
+
+    def to_world(self, pos):
+        """
+        Returns a tuple of ints of the board position of a screen position.
+
+        Args:
+            pos: a tuple of ints of the screen position.
+        """
+        return (math.floor((pos[0] - self._viewport.x + \
+                            self.scale(self._x)) / self._zoom), \
+                math.floor((pos[1] - self._viewport.y + \
+                            self.scale(self._y)) / self._zoom))
+
+    @property
+    def viewport(self):
+        """
+        Returns the pygame Rect of the screen area the board is drawn in.
+        """
+        return self._viewport
+
+    @property
+    def zoom(self):
+        """
+        Returns the screen pixels per board pixel.
+        """
+        return self._zoom
+
+    @property
+    def location(self):
+        """
+        Returns a tuple of the board position at the top left of the viewport.
+        """
+        return (self._x, self._y)
+
+
+class TiledBackground():
+    """
+    A floor image cut into tiles once, so only the tiles in view are scaled
+    and drawn.
+
+    Attributes:
+        _tile: an int representing the width and height of a tile in pixels.
+        _tiles: a dict mapping (column, row) tuples to subsurfaces of the
+                image.
+        _size: a tuple of ints of the width and height of the image.
+        _scaled: a dict mapping (column, row) tuples to the tiles scaled to
+                 _scaled_zoom.
+        _scaled_zoom: a float representing the zoom _scaled was built for.
+    """
+
+    def __init__(self, image, tile=256):
+        """
+        Cut the image into tiles.
+
+        Args:
+            image: a Surface of the whole floor.
+            tile: an int representing the width and height of a tile.
+        """
+        self._tile = tile
+        self._size = image.get_size()
+        self._tiles = {}
+        for column in range(math.ceil(self._size[0] / tile)):
+            for row in range(math.ceil(self._size[1] / tile)):
+                area = pygame.Rect(column * tile, row * tile, tile, tile)
+                self._tiles[(column, row)] = \
+                    image.subsurface(area.clip(image.get_rect()))
+        self._scaled = {}
+        self._scaled_zoom = None
+
+    def visible(self, camera):
+        """
+        Returns the list of (column, row) tuples of the tiles in view.
+
+        Args:
+            camera: a Camera instance.
+        """
+        area = camera.world_rect()
+        return [(column, row) \
+                for column in range(area.left // self._tile, \
+                                    (area.right - 1) // self._tile + 1) \
+                for row in range(area.top // self._tile, \
+                                 (area.bottom - 1) // self._tile + 1) \
+                if (column, row) in self._tiles]
+
+    def tile_surface(self, key, camera):
+        """
+        Returns a tile scaled to the camera zoom.
+
+        Args:
+            key: a (column, row) tuple of the tile.
+            camera: a Camera instance.
+        """
+        if camera.zoom == 1:
+            return self._tiles[key]
+        if camera.zoom != self._scaled_zoom:
+            self._scaled = {}
+            self._scaled_zoom = camera.zoom
+        scaled = self._scaled.get(key)
+        if scaled is None:
+            tile = self._tiles[key]
+            left = key[0] * self._tile
+            top = key[1] * self._tile
+            # Sizes come from the scaled edges of the tile so neighbouring
+            # tiles meet without gaps or overlaps.
+            size = (camera.scale(left + tile.get_width()) - camera.scale(left),
+                    camera.scale(top + tile.get_height()) - camera.scale(top))
+            scaled = pygame.transform.scale(tile, size)
+            self._scaled[key] = scaled
+        return scaled
+
+    def blits(self, camera):
+        """
+        Returns a list of (surface, position) tuples of the tiles in view.
+
+        Args:
+            camera: a Camera instance.
+        """
+        return [(self.tile_surface(key, camera), \
+                 camera.to_screen((key[0] * self._tile, key[1] * self._tile))) \
+                for key in self.visible(camera)]
+
+    @property
+    def size(self):
+        """
+        Returns a tuple of ints of the width and height of the image.
+        """
+        return self._size
+
+
+class CameraView(View):
+    """
+    A PyGame viewer for Logisti Co. which shows the gameboard through a
+    Camera.
+
+    Only the tiles, packages and towers in the viewport are drawn. Sprites
+    are found with the spatial indexes of the gameboard, so the draw cost
+    follows what is on screen rather than the size of the board.
+
+    Attributes:
+        _screen: the PyGame Display instance.
+        _camera: the Camera instance choosing what is shown.
+        _background: the TiledBackground of the factory floor.
+        _menu: the image behind the HUD.
+        _margin: an int representing the board pixels a sprite may reach past
+                 its indexed cell.
+        _detail: an int representing the fewest screen pixels between convoy
+                 packages drawn.
+        _scaled: a dict mapping the ids of sprite surfaces to tuples of the
+                 surface and its copy scaled to _scaled_zoom.
+        _scaled_zoom: a float representing the zoom _scaled was built for.
+        _drawn: an int representing the sprites drawn in the last frame.
+        _successful_packages: a VisualText which shows the number of packages
+                              that Tower instances have handled.
+        _lives: a VisualText which shows the number of lives the player has
+                left.
+        _available_towers: a VisualText which shows the number of Tower
+                           instances available to be placed.
+        _overlays: a list of objects whose blits method returns (surface,
+                   screen position) tuples drawn over the viewport and HUD,
+                   such as a LatencyTracer.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, gameboard, camera, background=None, tile=256,
+                 margin=64, detail=2, overlays=()):
+        """
+        Initialize CameraView.
+
+        Args:
+            gameboard: a Factory instance created with an index_cell.
+            camera: a Camera instance choosing what is shown.
+            background: a Surface of the whole floor, or None for the default
+                        factory floor.
+            tile: an int representing the width and height of a background
+                  tile.
+            margin: an int representing the board pixels a sprite may reach
+                    past its indexed cell.
+            detail: an int representing the fewest screen pixels between
+                    convoy packages drawn.
+            overlays: a sequence of objects whose blits method returns
+                      (surface, screen position) tuples drawn over the
+                      viewport and HUD.
+        """
+        super().__init__(gameboard)
+        if gameboard.package_index is None or gameboard.tower_index is None:
+            raise ValueError("CameraView needs a Factory with spatial " \
+                             "indexes, pass index_cell to Factory")
+        self._screen = pygame.display.set_mode([1100, 600])
+        if background is None:
+            background = pygame.image.load( \
+                "./game_assets/factory_path/Map1.png")
+        self._background = TiledBackground(background.convert(), tile)
+        self._menu = pygame.image.load( \
+            "./game_assets/factory_path/menu_back.png").convert()
+        self._camera = camera
+        self._margin = margin
+        self._detail = detail
+        self._scaled = {}
+        self._scaled_zoom = None
+        self._drawn = 0
+        self._overlays = list(overlays)
+        self._successful_packages = VisualText("Successes: ", (850, 20), 30)
+        self._lives = VisualText("Lives: ", (850, 70), 30)
+        self._available_towers = VisualText("Money: ", (850, 120), 30)
+
+    def draw(self):
+        """
+        Updates the viewport with the floor, packages and towers in view and
+        the HUD beside it.
+        """
+        camera = self._camera
+        self._screen.set_clip(camera.viewport)
+        self._screen.fill((0, 0, 0))
+        self._screen.blits(self._background.blits(camera), False)
+        area = camera.world_rect().inflate(2 * self._margin, 2 * self._margin)
+        sprites = self._gameboard.package_index.query(area) + \
+                  self._gameboard.tower_index.query(area)
+        blits = [self.sprite_blit(sprite.surf, sprite.rect) \
+                 for sprite in sprites]
+        if self._gameboard.convoys is not None:
+            # Zoomed out, convoy packages are drawn further apart on the
+            # path so they stay about as far apart on the screen.
+            spacing = max(1, math.ceil(self._detail / camera.zoom))
+            blits += [self.sprite_blit(surf, rect) for surf, rect \
+                      in self._gameboard.convoys.blits_in(area, spacing)]
+        self._drawn = len(blits)
+        self._screen.blits(blits, False)
+        self._screen.set_clip(None)
+
+        self._screen.blit(self._menu, (800, 0))
+        self._successful_packages.update(self._gameboard.packed)
+        self._lives.update(10 - self._gameboard.failed)
+        self._available_towers.update(self._gameboard.money)
+        self._screen.blits([(text.text, text.location) \
+                            for text in (self._successful_packages, \
+                                         self._lives, \
+                                         self._available_towers)], False)
+        for overlay in self._overlays:
+            self._screen.blits(overlay.blits(), False)
+        pygame.display.flip()
+
+    def sprite_blit(self, surf, rect):
+        """
+        Returns a (surface, position) tuple placing a sprite on the screen.
+
+        Args:
+            surf: the Surface of the sprite.
+            rect: the Rect of the sprite on the board.
+        """
+        surf = self.scaled_surface(surf)
+        center = self._camera.to_screen(rect.center)
+        return (surf, surf.get_rect(center=center))
+
+    def scaled_surface(self, surf):
+        """
+        Returns a sprite surface scaled to the camera zoom.
+
+        Args:
+            surf: a Surface of a sprite.
+        """
+        zoom = self._camera.zoom
+        if zoom == 1:
+            return surf
+        if zoom != self._scaled_zoom:
+            self._scaled = {}
+            self._scaled_zoom = zoom
+        # The surface is kept alongside its copy so its id is not reused.
+        cached = self._scaled.get(id(surf))
+        if cached is None:
+            size = (max(1, round(surf.get_width() * zoom)), \
+                    max(1, round(surf.get_height() * zoom)))
+            cached = (surf, pygame.transform.scale(surf, size))
+            self._scaled[id(surf)] = cached
+        return cached[1]
+
+    @property
+    def camera(self):
+        """
+        Returns the Camera instance choosing what is shown.
+        """
+        return self._camera
+
+    @property
+    def drawn(self):
+        """
+        Returns the number of sprites drawn in the last frame.
+        """
+        return self._drawn
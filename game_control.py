@@ -3,11 +3,18 @@ Logisti-Co game controller.
 """
 
 from abc import ABC, abstractmethod
+import time
 import pygame
 
 # pylint: disable=no-name-in-module
 from pygame.locals import (
     MOUSEBUTTONDOWN,
+    MOUSEWHEEL,
+    KEYDOWN,
+    K_LEFT,
+    K_RIGHT,
+    K_UP,
+    K_DOWN,
 )
 
 class Control(ABC):
@@ -40,6 +47,64 @@ class Control(ABC):
         Control the game.
         """
 
+class EventDispatcher():
+    """
+    Pull the pygame event queue once per frame and route every event to the
+    handlers registered for its type.
+
+    Attributes:
+        _handlers: a dict mapping pygame Event types to lists of callables
+                   taking the Event, in the order they were registered.
+        _tracer: an optional LatencyTracer instance stamping events before
+                 and after their handlers run.
+    """
+
+    def __init__(self, tracer=None):
+        """
+        Initialize handlers.
+
+        Args:
+            tracer: an optional LatencyTracer instance stamping events
+                    before and after their handlers run.
+        """
+        self._handlers = {}
+        self._tracer = tracer
+
+    def register(self, event_type, handler):
+        """
+        Register a handler for a type of event.
+
+        Args:
+            event_type: a pygame Event type.
+            handler: a callable taking the pygame Event.
+        """
+        self._handlers.setdefault(event_type, []).append(handler)
+
+    def dispatch(self, events=None):
+        """
+        Route every event to its handlers.
+
+        Args:
+            events: a list of pygame Events, or None to drain the pygame event
+                    queue.
+
+        Returns:
+            The list of pygame Events dispatched.
+        """
+        if events is None:
+            events = pygame.event.get()
+        tracer = self._tracer
+        drained = time.perf_counter()
+        for event in events:
+            trace = None
+            if tracer is not None and tracer.traces(event):
+                trace = tracer.received(event, drained)
+            for handler in self._handlers.get(event.type, ()):
+                handler(event)
+            if trace is not None:
+                tracer.applied(trace)
+        return events
+
 class MouseControl(Control):
     """
     A cursor based controller for Logisti Co. game.
@@ -48,28 +113,52 @@ class MouseControl(Control):
         events: a list of all of the user inputs taken by Pygame.
         mouse_pos: a tuple which contains the current x and y coordinates of
                    user's cursor.
+        _camera: an optional Camera instance mapping the screen to the board.
     """
 
-    def __init__(self, gameboard):
+    def __init__(self, gameboard, camera=None):
         """
         Initialize events and mouse position.
 
         Args:
             gameboard: a Factory instance.
+            camera: an optional Camera instance mapping the screen to the
+                    board.
         """
         super().__init__(gameboard)
         self.events = []
         self.mouse_pos = ()
+        self._camera = camera
 
     def control(self):
         """
-        Get user input and update game model.
+        Get user input and update game model for every click.
         """
         self.get_events()
         self.get_mouse_pos()
-        click = self.detect_click()
-        self.tower_placement(click)
-        self.tower_removal(click)
+        for click in self.detect_clicks():
+            self.tower_placement(click)
+            self.tower_removal(click)
+
+    def register(self, dispatcher):
+        """
+        Receive clicks from an EventDispatcher instead of the event queue.
+
+        Args:
+            dispatcher: an EventDispatcher instance.
+        """
+        dispatcher.register(MOUSEBUTTONDOWN, self.handle_click)
+
+    def handle_click(self, event):
+        """
+        Update game model for a single click, at the position it was made.
+
+        Args:
+            event: a pygame MOUSEBUTTONDOWN Event.
+        """
+        self.mouse_pos = event.pos
+        self.tower_placement(event.button)
+        self.tower_removal(event.button)
 
     def detect_click(self):
         """
@@ -82,6 +171,15 @@ class MouseControl(Control):
                 return event.button
         return 0
 
+    def detect_clicks(self):
+        """
+        Return the mouse button of every MOUSEBUTTONDOWN event, in order.
+
+        Returns: a list of ints corresponding to the mouse buttons pressed.
+        """
+        return [event.button for event in self.events \
+                if event.type == MOUSEBUTTONDOWN]
+
     def get_events(self):
         """
         Append pygame events into a separate list to preserve queue history.
@@ -94,21 +192,108 @@ class MouseControl(Control):
         """
         self.mouse_pos = pygame.mouse.get_pos()
 
+    def board_pos(self):
+        """
+        Return the board position under the mouse.
+
+        Returns: a tuple of ints of the board coordinates, or None when the
+                 mouse is outside of the camera viewport.
+        """
+        if self._camera is None:
+            return self.mouse_pos
+        if not self._camera.viewport.collidepoint(self.mouse_pos):
+            return None
+        return self._camera.to_world(self.mouse_pos)
+
     def tower_placement(self, click):
         """
         Attempt to place a tower where clicked.
         """
         if click == 1:
-            if 0<=self.mouse_pos[0]<=800 and 0<=self.mouse_pos[1]<=600:
-                self._gameboard.generate_tower(self.mouse_pos[0], \
-                self.mouse_pos[1], 300, 100)
+            pos = self.board_pos()
+            width, height = self._gameboard.size
+            if pos is not None and 0<=pos[0]<=width and 0<=pos[1]<=height:
+                self._gameboard.generate_tower(pos[0], pos[1], 300, 100)
 
     def tower_removal(self, click):
         """
         Attempt to remove a tower where clicked.
         """
         if click == 3:
+            pos = self.board_pos()
+            if pos is None:
+                return
             clicked_towers = [tower for tower in self._gameboard.robots if \
-                              tower.rect.collidepoint(self.mouse_pos)]
+                              tower.rect.collidepoint(pos)]
             for tower in clicked_towers:
                 self._gameboard.remove_tower(tower)
+
+class CameraControl(Control):
+    """
+    A keyboard and mouse wheel controller for scrolling and zooming a
+    Camera.
+
+    Attributes:
+        _camera: the Camera instance being moved.
+        _step: an int representing the screen pixels panned per key press.
+    """
+
+    # Screen pixel direction of every arrow key.
+    DIRECTIONS = {K_LEFT: (-1, 0), K_RIGHT: (1, 0), K_UP: (0, -1), \
+                  K_DOWN: (0, 1)}
+
+    def __init__(self, gameboard, camera, step=40):
+        """
+        Initialize camera and step.
+
+        Args:
+            gameboard: a Factory instance.
+            camera: the Camera instance to move.
+            step: an int representing the screen pixels panned per key press.
+        """
+        super().__init__(gameboard)
+        self._camera = camera
+        self._step = step
+
+    def control(self):
+        """
+        Pan the camera with the arrow keys currently held.
+        """
+        pressed = pygame.key.get_pressed()
+        for key, direction in self.DIRECTIONS.items():
+            if pressed[key]:
+                self._camera.pan(direction[0] * self._step, \
+                                 direction[1] * self._step)
+
+    def register(self, dispatcher):
+        """
+        Receive key presses and mouse wheel turns from an EventDispatcher.
+
+        Args:
+            dispatcher: an EventDispatcher instance.
+        """
+        # Held arrow keys repeat so the camera keeps scrolling.
+        pygame.key.set_repeat(200, 30)
+        dispatcher.register(KEYDOWN, self.handle_key)
+        dispatcher.register(MOUSEWHEEL, self.handle_wheel)
+
+    def handle_key(self, event):
+        """
+        Pan the camera when an arrow key is pressed.
+
+        Args:
+            event: a pygame KEYDOWN Event.
+        """
+        direction = self.DIRECTIONS.get(event.key)
+        if direction is not None:
+            self._camera.pan(direction[0] * self._step, \
+                             direction[1] * self._step)
+
+    def handle_wheel(self, event):
+        """
+        Zoom the camera around the mouse when the wheel is turned.
+
+        Args:
+            event: a pygame MOUSEWHEEL Event.
+        """
+        self._camera.zoom_by(event.y, pygame.mouse.get_pos())
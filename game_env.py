@@ -0,0 +1,293 @@
+"""
+Logisti-Co training environment.
+"""
+import random
+import numpy as np
+import game_model as gm
+
+
+class FactoryEnv():
+    """
+    A vectorized, gym-style environment running many Factory gameboards in
+    lockstep without drawing, for training tower placement agents.
+
+    Every board is split into a grid of cells. The action of a board is an
+    int: 0 does nothing, 1 + cell places a tower at the center of a cell and
+    1 + cells + cell removes the tower in a cell, where
+    cell = row * columns + column. Observations are a dict of NumPy arrays:
+    "packages" counts the packages in every cell, "towers" marks the cells
+    holding a tower and "money" holds the money of every board.
+
+    Boards whose game is lost are reset straight away with a new seed, and
+    their final counts are reported in the infos of that step.
+
+    Attributes:
+        _count: an int representing the number of boards.
+        _path: a list of tuples of ints which represent waypoints.
+        _cell: an int representing the width and height of a cell in pixels.
+        _grid: a tuple of ints of the rows and columns of the grid.
+        _starting_money: an int representing the money each board starts
+                         with.
+        _gen_rate: a float representing the mean ticks between packages.
+        _rate: an int representing the rate of every placed tower.
+        _radius: an int representing the radius of every placed tower.
+        _frame_skip: an int representing the game ticks run per step.
+        _rng: a Random instance drawing the seeds of reset boards.
+        _factories: a list of the Factory instance of every board.
+        _generators: a list of the PoissonGenerator instance of every board.
+        _towers: a list of dicts mapping cells to the Tower instance placed
+                 in them, one per board.
+        _tower_grid: a uint8 array of shape (boards, rows, columns) marking
+                     the cells holding a tower.
+        _ticks: an int array of the ticks every board has run this game.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, count, path=None, cell=40, size=(800, 600),
+                 starting_money=300, gen_rate=60, rate=300, radius=100,
+                 frame_skip=1):
+        """
+        Initialize the boards.
+
+        Args:
+            count: an int representing the number of boards.
+            path: a list of tuples of ints which represent waypoints, or None
+                  for the factory path.
+            cell: an int representing the width and height of a cell in
+                  pixels.
+            size: a tuple of ints of the width and height of a board.
+            starting_money: an int representing the money each board starts
+                            with.
+            gen_rate: a float representing the mean ticks between packages.
+            rate: an int representing the rate of every placed tower.
+            radius: an int representing the radius of every placed tower.
+            frame_skip: an int representing the game ticks run per step.
+        """
+        self._count = count
+        self._path = list(gm.FACTORY_PATH if path is None else path)
+        self._cell = cell
+        self._grid = (-(-size[1] // cell), -(-size[0] // cell))
+        self._starting_money = starting_money
+        self._gen_rate = gen_rate
+        self._rate = rate
+        self._radius = radius
+        self._frame_skip = frame_skip
+        self._rng = random.Random()
+        self._factories = [None] * count
+        self._generators = [None] * count
+        self._towers = [{} for _ in range(count)]
+        self._tower_grid = np.zeros((count,) + self._grid, np.uint8)
+        self._ticks = np.zeros(count, np.int64)
+
+    def reset(self, seed=None):
+        """
+        Start a new game on every board.
+
+        Args:
+            seed: an int seeding the package arrivals of every board, or None
+                  for fresh random seeds.
+
+        Returns:
+            The observation dict of every board.
+        """
+        self._rng = random.Random(seed)
+        for board in range(self._count):
+            self._reset_board(board)
+        return self.observe()
+
+    def _reset_board(self, board):
+        """
+        Start a new game on a board.
+
+        Args:
+            board: an int representing the index of the board.
+        """
+        factory = gm.Factory(self._starting_money, self._path)
+        self._factories[board] = factory
+        self._generators[board] = gm.PoissonGenerator(factory, \
+            self._gen_rate, self._path, self._rng.getrandbits(32))
+        self._towers[board] = {}
+        self._tower_grid[board] = 0
+        self._ticks[board] = 0
+
+    def step(self, actions):
+        """
+        Apply an action to every board, then run every board for _frame_skip
+        ticks.
+
+        Args:
+            actions: a sequence of ints, one action per board.
+
+        Returns:
+            A tuple of the observation dict, a float array of rewards (the
+            packages packed less the packages failed during the step), a bool
+            array telling which boards lost their game and were reset, and a
+            list of info dicts, one per board.
+
+        Raises:
+            RuntimeError: if reset has not been called yet.
+            ValueError: if the actions are malformed.
+        """
+        if self._factories[0] is None:
+            raise RuntimeError("call reset() first")
+        actions = np.asarray(actions)
+        if actions.shape != (self._count,):
+            raise ValueError(f"expected {self._count} actions, got shape " \
+                             f"{actions.shape}")
+        cells = self._grid[0] * self._grid[1]
+        # Every action is checked before any board changes, so a bad action
+        # never leaves the boards partly stepped.
+        for action in actions.tolist():
+            if not 0 <= action <= 2 * cells:
+                raise ValueError(f"action {action} is out of range")
+        rewards = np.zeros(self._count)
+        dones = np.zeros(self._count, bool)
+        infos = [{} for _ in range(self._count)]
+        for board, action in enumerate(actions.tolist()):
+            if action == 0:
+                pass
+            elif action <= cells:
+                infos[board]["applied"] = self._place(board, action - 1)
+            else:
+                infos[board]["applied"] = self._remove(board, \
+                                                       action - 1 - cells)
+            factory = self._factories[board]
+            generator = self._generators[board]
+            before = factory.packed - factory.failed
+            for _ in range(self._frame_skip):
+                factory.tick(generator)
+                self._ticks[board] += 1
+                if factory.failed >= 10:
+                    break
+            rewards[board] = factory.packed - factory.failed - before
+            if factory.failed >= 10:
+                dones[board] = True
+                infos[board]["episode"] = {"ticks": int(self._ticks[board]), \
+                                           "packed": factory.packed, \
+                                           "failed": factory.failed}
+                self._reset_board(board)
+        return (self.observe(), rewards, dones, infos)
+
+    def _place(self, board, cell):
+        """
+        Place a tower at the center of a cell.
+
+        Args:
+            board: an int representing the index of the board.
+            cell: an int representing the index of the cell.
+
+        Returns:
+            A bool telling whether a tower was placed, as a cell holds one
+            tower and towers need money.
+        """
+        factory = self._factories[board]
+        if cell in self._towers[board] or factory.money < gm.TOWER_COST:
+            return False
+        row, column = divmod(cell, self._grid[1])
+        factory.generate_tower(column * self._cell + self._cell // 2, \
+                               row * self._cell + self._cell // 2, \
+                               self._rate, self._radius)
+        # generate_tower adds the tower last, so it is the last sprite.
+        self._towers[board][cell] = factory.robots.sprites()[-1]
+        self._tower_grid[board, row, column] = 1
+        return True
+
+    def _remove(self, board, cell):
+        """
+        Remove the tower in a cell.
+
+        Args:
+            board: an int representing the index of the board.
+            cell: an int representing the index of the cell.
+
+        Returns:
+            A bool telling whether a tower was removed.
+        """
+        tower = self._towers[board].pop(cell, None)
+        if tower is None:
+            return False
+        self._factories[board].remove_tower(tower)
+        self._tower_grid[board].flat[cell] = 0
+        return True
+
+    def observe(self):
+        """
+        Returns the observation dict of every board.
+
+        Raises:
+            RuntimeError: if reset has not been called yet.
+        """
+        if self._factories[0] is None:
+            raise RuntimeError("call reset() first")
+        rows, columns = self._grid
+        cell = self._cell
+        # Gather the package centers of all boards into one array, then
+        # count them with a single bincount over their flattened
+        # (board, row, column) cells.
+        centers = [np.array([package.rect.center \
+                             for package in factory.packages], \
+                            np.int64).reshape(-1, 2) \
+                   for factory in self._factories]
+        boards = np.repeat(np.arange(self._count), \
+                           [len(board) for board in centers])
+        centers = np.concatenate(centers)
+        inside = (centers[:, 0] >= 0) & (centers[:, 0] < columns * cell) & \
+                 (centers[:, 1] >= 0) & (centers[:, 1] < rows * cell)
+        flat = (boards[inside] * rows + centers[inside, 1] // cell) * \
+               columns + centers[inside, 0] // cell
+        packages = np.bincount(flat, \
+                               minlength=self._count * rows * columns)
+        return {"packages": packages.astype(np.uint16) \
+                                    .reshape(self._count, rows, columns),
+                "towers": self._tower_grid.copy(),
+                "money": np.array([factory.money \
+                                   for factory in self._factories])}
+
+    def place_action(self, column, row):
+        """
+        Returns the action placing a tower in a cell.
+
+        Args:
+            column: an int representing the column of the cell.
+            row: an int representing the row of the cell.
+        """
+        return 1 + row * self._grid[1] + column
+
+    def remove_action(self, column, row):
+        """
+        Returns the action removing the tower in a cell.
+
+        Args:
+            column: an int representing the column of the cell.
+            row: an int representing the row of the cell.
+        """
+        return 1 + self._grid[0] * self._grid[1] + row * self._grid[1] + \
+               column
+
+    @property
+    def count(self):
+        """
+        Returns the number of boards.
+        """
+        return self._count
+
+    @property
+    def grid(self):
+        """
+        Returns a tuple of ints of the rows and columns of the grid.
+        """
+        return self._grid
+
+    @property
+    def action_count(self):
+        """
+        Returns the number of distinct actions of a board.
+        """
+        return 1 + 2 * self._grid[0] * self._grid[1]
+
+    @property
+    def factories(self):
+        """
+        Returns the list of the Factory instance of every board.
+        """
+        return self._factories
@@ -0,0 +1,327 @@
+"""
+Logisti-Co offscreen rendering and frame export.
+"""
+import os
+import queue
+import threading
+import numpy as np
+import pygame
+from game_view import View, VisualText, CONVOY_SPACING
+
+# Formats frames can be written in: a stream of raw RGB24 frames, or a
+# directory of numbered PNG images.
+FORMATS = ["raw", "png"]
+
+# Size in pixels of a whole frame, the board and the HUD beside it.
+FRAME_SIZE = (1100, 600)
+
+
+class FrameEncoder():
+    """
+    Writes frames on a background thread, so encoding and disk writes
+    overlap with rendering the next frames.
+
+    Frames are handed over through a bounded queue, so rendering waits once
+    depth frames are waiting to be written rather than growing without
+    bound. An error writing a frame stops the encoder and is raised by the
+    next put or by close.
+
+    Attributes:
+        _path: a string representing the raw stream file or the directory of
+               PNG images.
+        _fmt: a string in FORMATS representing the format written.
+        _stream: the open raw stream file, or None when writing PNG images.
+        _queue: a Queue of (index, Surface) tuples of frames to write, ended
+                by None.
+        _written: an int counting the frames written.
+        _error: the exception which stopped the encoder, or None.
+        _thread: the encoder Thread instance.
+    """
+
+    def __init__(self, path, fmt="png", depth=8):
+        """
+        Open the output and start the encoder thread.
+
+        Args:
+            path: a string representing the raw stream file to create, or
+                  the directory to write PNG images to.
+            fmt: a string in FORMATS representing the format to write.
+            depth: an int representing the most frames waiting to be
+                   written.
+
+        Raises:
+            ValueError: if fmt is not in FORMATS.
+        """
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown frame format {fmt!r}")
+        self._path = path
+        self._fmt = fmt
+        self._stream = None
+        if fmt == "raw":
+            # pylint: disable=consider-using-with
+            self._stream = open(path, "wb")
+        else:
+            os.makedirs(path, exist_ok=True)
+        self._queue = queue.Queue(maxsize=depth)
+        self._written = 0
+        self._error = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def put(self, index, surface):
+        """
+        Queue a frame to be written, waiting while the queue is full.
+
+        Args:
+            index: an int representing the position of the frame in the
+                   sequence.
+            surface: a Surface of the frame, not modified afterwards.
+        """
+        if self._error is not None:
+            raise self._error
+        self._queue.put((index, surface))
+
+    def _run(self):
+        """
+        Write queued frames until the queue is ended.
+        """
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            # Frames after an error are dropped, so put never blocks forever.
+            if self._error is None:
+                try:
+                    self.write(*item)
+                except (OSError, pygame.error) as error:
+                    self._error = error
+
+    def write(self, index, surface):
+        """
+        Write a frame to the output.
+
+        Args:
+            index: an int representing the position of the frame in the
+                   sequence.
+            surface: a Surface of the frame.
+        """
+        if self._stream is not None:
+            self._stream.write(pygame.image.tobytes(surface, "RGB"))
+        else:
+            pygame.image.save(surface, \
+                              os.path.join(self._path, f"{index:06d}.png"))
+        self._written += 1
+
+    def close(self):
+        """
+        Write every queued frame, stop the encoder thread and close the
+        output.
+        """
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+        if self._error is not None:
+            raise self._error
+
+    @property
+    def written(self):
+        """
+        Returns the number of frames written.
+        """
+        return self._written
+
+    @property
+    def fmt(self):
+        """
+        Returns the format frames are written in.
+        """
+        return self._fmt
+
+
+class OffscreenView(View):
+    """
+    A viewer for Logisti Co. which draws into a plain Surface instead of a
+    window, as fast as it is asked to.
+
+    No display mode is set, so it runs under the SDL dummy video driver
+    without a screen, and nothing is flipped or waited for. Only every
+    skip-th frame is drawn, and drawing is clipped to the region of
+    interest, so the work done per exported frame is only what shows up in
+    it. Every drawn frame is cropped to the region and handed to an optional
+    FrameEncoder.
+
+    Attributes:
+        _surface: the Surface the whole frame is drawn into.
+        _background: the image of the factory floor.
+        _menu: the image behind the HUD.
+        _encoder: a FrameEncoder instance writing the drawn frames, or None.
+        _skip: an int representing the frames advanced per frame drawn.
+        _region: a Rect of the part of the frame drawn and exported.
+        _frame: an int counting the calls to draw.
+        _rendered: an int counting the frames drawn.
+        _hud: a list of [VisualText, shown value] lists for the HUD.
+        _overlays: a list of objects whose blits method returns (surface,
+                   position) tuples drawn over the board and HUD.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, gameboard, encoder=None, skip=1, region=None,
+                 overlays=()):
+        """
+        Initialize OffscreenView.
+
+        Args:
+            gameboard: a Factory instance.
+            encoder: a FrameEncoder instance writing the drawn frames, or
+                     None to only keep the latest frame.
+            skip: an int representing the frames advanced per frame drawn.
+            region: a rectangle style object of the part of the frame drawn
+                    and exported, or None for the whole frame.
+            overlays: a sequence of objects whose blits method returns
+                      (surface, position) tuples drawn over the board and
+                      HUD.
+
+        Raises:
+            ValueError: if skip is not positive or region is outside the
+                        frame.
+        """
+        super().__init__(gameboard)
+        if skip < 1:
+            raise ValueError("skip must be at least 1")
+        self._surface = pygame.Surface(FRAME_SIZE)
+        if region is None:
+            self._region = self._surface.get_rect()
+        else:
+            self._region = pygame.Rect(region).clip(self._surface.get_rect())
+            if not self._region.width or not self._region.height:
+                raise ValueError(f"Region {region} is outside the frame")
+        self._surface.set_clip(self._region)
+        self._background = pygame.image.load( \
+            "./game_assets/factory_path/Map1.png").convert(self._surface)
+        self._menu = pygame.image.load( \
+            "./game_assets/factory_path/menu_back.png").convert(self._surface)
+        self._encoder = encoder
+        self._skip = skip
+        self._frame = 0
+        self._rendered = 0
+        self._hud = [[VisualText("Successes: ", (850, 20), 30), None],
+                     [VisualText("Lives: ", (850, 70), 30), None],
+                     [VisualText("Money: ", (850, 120), 30), None]]
+        self._overlays = list(overlays)
+
+    def draw(self):
+        """
+        Draw the frame if it is not skipped, and hand it to the encoder.
+
+        Returns:
+            A Surface of the region of the drawn frame, or None if the frame
+            was skipped.
+        """
+        self._frame += 1
+        if (self._frame - 1) % self._skip:
+            return None
+        surface = self._surface
+        surface.blit(self._background, (0, 0))
+        surface.blit(self._menu, (800, 0))
+        blits = [(package.surf, package.rect) \
+                 for package in self._gameboard.packages.sprites()]
+        if self._gameboard.convoys is not None:
+            blits += self._gameboard.convoys.blits(CONVOY_SPACING)
+        surface.blits(blits, False)
+        surface.blits([(tower.surf, tower.rect) \
+                       for tower in self._gameboard.robots.sprites()], False)
+        values = [self._gameboard.packed, 10 - self._gameboard.failed, \
+                  self._gameboard.money]
+        for entry, value in zip(self._hud, values):
+            # Only render the HUD text again when its value has changed.
+            if entry[1] != value:
+                entry[0].update(value)
+                entry[1] = value
+        surface.blits([(entry[0].text, entry[0].location) \
+                       for entry in self._hud], False)
+        for overlay in self._overlays:
+            surface.blits(overlay.blits(), False)
+        frame = surface.subsurface(self._region).copy()
+        if self._encoder is not None:
+            self._encoder.put(self._rendered, frame)
+        self._rendered += 1
+        return frame
+
+    def close(self):
+        """
+        Write every frame still queued and close the encoder.
+        """
+        if self._encoder is not None:
+            self._encoder.close()
+
+    @property
+    def surface(self):
+        """
+        Returns the Surface the whole frame is drawn into.
+        """
+        return self._surface
+
+    @property
+    def region(self):
+        """
+        Returns a Rect of the part of the frame drawn and exported.
+        """
+        return self._region
+
+    @property
+    def rendered(self):
+        """
+        Returns the number of frames drawn.
+        """
+        return self._rendered
+
+    @property
+    def hud_texts(self):
+        """
+        Returns the list of VisualText instances drawn on the HUD.
+        """
+        return [entry[0] for entry in self._hud]
+
+
+def export(gameboard, generator, view, ticks):
+    """
+    Run the game without input and draw every tick with a view, as fast as
+    the view allows, until it is lost or a number of ticks have passed.
+
+    Args:
+        gameboard: a Factory instance.
+        generator: a Generator instance which feeds packages onto the
+                   gameboard.
+        view: a View instance, usually an OffscreenView.
+        ticks: an int representing the most game ticks to run.
+
+    Returns:
+        An int representing the number of game ticks run.
+    """
+    for tick in range(ticks):
+        gameboard.tick(generator)
+        view.draw()
+        if gameboard.failed >= 10:
+            return tick + 1
+    return ticks
+
+
+def pixel_diff(first, second):
+    """
+    Returns the number of pixels whose color differs between two frames.
+
+    Args:
+        first: a Surface of a frame.
+        second: a Surface of a frame of the same size.
+
+    Raises:
+        ValueError: if the frames differ in size.
+    """
+    if first.get_size() != second.get_size():
+        raise ValueError(f"Frame sizes {first.get_size()} and " \
+                         f"{second.get_size()} differ")
+    return int(np.any(pygame.surfarray.array3d(first) != \
+                      pygame.surfarray.array3d(second), axis=2).sum())
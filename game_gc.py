@@ -0,0 +1,180 @@
+"""
+Logisti-Co garbage collection pause management.
+"""
+import gc
+import time
+from game_monitor import Monitor
+
+# The generation 2 threshold set while full collections are held back, high
+# enough that the collector never starts one on its own.
+HELD_THRESHOLD = 1 << 30
+
+
+class GCManager(Monitor):
+    """
+    A monitor which keeps cyclic garbage collection from pausing ticks.
+
+    Everything alive when the manager starts, such as the loaded assets,
+    animation frames and fonts, is frozen so collections no longer scan it.
+    Full collections are held back during play and run after a frame
+    instead, once the frame leaves enough of its budget to absorb one. A
+    full collection that stays due for too long runs anyway, so memory held
+    by cycles stays bounded. Young generations are still collected as
+    usual, as their pauses are short.
+
+    Every collection is timed through gc.callbacks, so the pauses of each
+    tick can be sampled by a TelemetryMonitor.
+
+    Attributes:
+        _budget: a float representing the seconds a frame may take.
+        _max_delay: an int representing the most frames a due full
+                    collection waits for slack.
+        _thresholds: the tuple of collector thresholds before the manager
+                     started.
+        _frozen: a bool telling whether the manager froze objects.
+        _start: a float representing when the running collection started,
+                or None.
+        _idle: a bool telling whether the running collection was started by
+               the manager.
+        _pause: a float representing the seconds collections paused the
+                current tick.
+        _last_pause: a float representing the seconds collections paused the
+                     last tick.
+        _max_pause: a float representing the longest pause seen in a tick.
+        _collections: a list of ints counting collections per generation
+                      during ticks.
+        _idle_collections: an int counting full collections run in slack.
+        _full_time: a float estimating the seconds a full collection takes.
+        _waited: an int counting frames a due full collection has waited.
+    """
+
+    def __init__(self, gameboard, budget=1/60, max_delay=600, freeze=True):
+        """
+        Freeze the objects alive at startup and hold full collections back.
+
+        Args:
+            gameboard: a Factory instance.
+            budget: a float representing the seconds a frame may take.
+            max_delay: an int representing the most frames a due full
+                       collection waits for slack.
+            freeze: a bool telling whether to freeze the objects alive now.
+        """
+        super().__init__(gameboard)
+        self._budget = budget
+        self._max_delay = max_delay
+        self._thresholds = gc.get_threshold()
+        self._frozen = freeze
+        self._start = None
+        self._idle = False
+        self._pause = 0.0
+        self._last_pause = 0.0
+        self._max_pause = 0.0
+        self._collections = [0, 0, 0]
+        self._idle_collections = 0
+        self._full_time = 0.0
+        self._waited = 0
+        if freeze:
+            gc.collect()
+            gc.freeze()
+        gc.set_threshold(self._thresholds[0], self._thresholds[1], \
+                         HELD_THRESHOLD)
+        gc.callbacks.append(self._callback)
+
+    def _callback(self, phase, info):
+        """
+        Time a collection.
+
+        Args:
+            phase: a string, "start" or "stop".
+            info: a dict holding the generation being collected.
+        """
+        if phase == "start":
+            self._start = time.perf_counter()
+            return
+        if self._start is None:
+            return
+        pause = time.perf_counter() - self._start
+        self._start = None
+        if self._idle:
+            self._full_time += 0.5 * (pause - self._full_time)
+        else:
+            self._pause += pause
+            self._collections[info["generation"]] += 1
+
+    def due(self):
+        """
+        Returns whether the collector would have started a full collection
+        by now.
+        """
+        return gc.get_count()[2] >= self._thresholds[2]
+
+    def update(self, generator, tick_time):
+        """
+        Close the pause account of the tick, and run a due full collection
+        if the frame left enough of its budget.
+
+        Args:
+            generator: the Generator instance feeding the gameboard.
+            tick_time: a float representing the seconds spent updating and
+                       drawing the tick.
+        """
+        self._last_pause = self._pause
+        self._max_pause = max(self._max_pause, self._pause)
+        self._pause = 0.0
+        if not self.due():
+            self._waited = 0
+            return
+        self._waited += 1
+        if self._budget - tick_time > self._full_time or \
+                self._waited >= self._max_delay:
+            self.collect()
+
+    def collect(self):
+        """
+        Run a full collection outside of the tick.
+        """
+        self._idle = True
+        try:
+            gc.collect()
+        finally:
+            self._idle = False
+        self._idle_collections += 1
+        self._waited = 0
+
+    def close(self):
+        """
+        Give the collector back its thresholds and unfreeze objects.
+        """
+        if self._callback in gc.callbacks:
+            gc.callbacks.remove(self._callback)
+        gc.set_threshold(*self._thresholds)
+        if self._frozen:
+            gc.unfreeze()
+
+    @property
+    def last_pause(self):
+        """
+        Returns the seconds collections paused the last tick.
+        """
+        return self._last_pause
+
+    @property
+    def max_pause(self):
+        """
+        Returns the longest pause collections caused in a tick.
+        """
+        return self._max_pause
+
+    @property
+    def collections(self):
+        """
+        Returns a list of the collections per generation during ticks.
+        """
+        return list(self._collections)
+
+    @property
+    def idle_collections(self):
+        """
+        Returns the number of full collections run in slack.
+        """
+        return self._idle_collections
@@ -0,0 +1,118 @@
+"""
+Logisti-Co frame budget governor.
+"""
+from game_monitor import Monitor
+
+# Quality levels in the form (tower_stride, hud_interval, package_stride):
+# how many frames tower animation frames are held, how many frames pass
+# between HUD refreshes and how many frames the package layer is held.
+QUALITY_LEVELS = [
+    (1, 1, 1),
+    (2, 1, 1),
+    (2, 15, 1),
+    (2, 15, 2),
+]
+
+
+class FrameGovernor(Monitor):
+    """
+    A monitor which measures every frame against a budget and sheds optional
+    drawing work one quality level at a time while frames run over, then
+    restores it once there is headroom again.
+
+    The model always ticks fully, only the view skips work.
+
+    Attributes:
+        _budget: a float representing the seconds a frame may take.
+        _headroom: a float representing the share of the budget frames must
+                   stay under before quality is restored.
+        _patience: an int representing the frames over budget before quality
+                   is lowered.
+        _recovery: an int representing the frames under the headroom before
+                   quality is raised.
+        _average: a float representing the smoothed frame time in seconds.
+        _over: an int counting consecutive smoothed frames over budget.
+        _under: an int counting consecutive smoothed frames under headroom.
+        _level: an int representing the current index in QUALITY_LEVELS.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, gameboard, budget=1/60, headroom=0.7, patience=10,
+                 recovery=120):
+        """
+        Initialize the budget and start at full quality.
+
+        Args:
+            gameboard: a Factory instance.
+            budget: a float representing the seconds a frame may take.
+            headroom: a float representing the share of the budget frames
+                      must stay under before quality is restored.
+            patience: an int representing the frames over budget before
+                      quality is lowered.
+            recovery: an int representing the frames under the headroom
+                      before quality is raised.
+        """
+        super().__init__(gameboard)
+        self._budget = budget
+        self._headroom = headroom
+        self._patience = patience
+        self._recovery = recovery
+        self._average = 0.0
+        self._over = 0
+        self._under = 0
+        self._level = 0
+
+    def update(self, generator, tick_time):
+        """
+        Measure the frame and change the quality level if needed.
+
+        Args:
+            generator: the Generator instance feeding the gameboard.
+            tick_time: a float representing the seconds spent updating and
+                       drawing the tick.
+        """
+        self._average += 0.2 * (tick_time - self._average)
+        if self._average > self._budget:
+            self._over += 1
+            self._under = 0
+        elif self._average < self._budget * self._headroom:
+            self._under += 1
+            self._over = 0
+        else:
+            self._over = 0
+            self._under = 0
+        if self._over >= self._patience and \
+                self._level < len(QUALITY_LEVELS) - 1:
+            self._level += 1
+            self._over = 0
+        elif self._under >= self._recovery and self._level > 0:
+            self._level -= 1
+            self._under = 0
+
+    @property
+    def level(self):
+        """
+        Returns the current quality level, 0 being full quality.
+        """
+        return self._level
+
+    @property
+    def tower_stride(self):
+        """
+        Returns the number of frames tower animation frames are held.
+        """
+        return QUALITY_LEVELS[self._level][0]
+
+    @property
+    def hud_interval(self):
+        """
+        Returns the number of frames between HUD refreshes.
+        """
+        return QUALITY_LEVELS[self._level][1]
+
+    @property
+    def package_stride(self):
+        """
+        Returns the number of frames the package layer is held.
+        """
+        return QUALITY_LEVELS[self._level][2]
@@ -0,0 +1,183 @@
+"""
+Logisti-Co tower utilization and leak heatmap.
+"""
+import json
+import pygame
+from game_monitor import Monitor
+from game_optimizer import path_samples
+
+# Opacity of the heatmap drawn over the board.
+HEAT_ALPHA = 160
+
+
+def heat(share):
+    """
+    Returns an RGBA color tuple from green for a share of 0 to red for a
+    share of 1.
+
+    Args:
+        share: a float between 0 and 1.
+    """
+    share = min(max(share, 0.0), 1.0)
+    return (int(255 * share), int(255 * (1 - share)), 0, HEAT_ALPHA)
+
+
+class TowerHeatmap(Monitor):
+    """
+    A monitor which shows which towers earn their cost and which stretches
+    of the path let packages through, and reports both at game end.
+
+    Towers are drawn from green to red by the share of their ticks they sat
+    ready with nothing in range. Path segments are drawn from green to red
+    by the share of the packages reaching them which were not packed in
+    them, when the gameboard keeps a LeakHistogram. The overlay is redrawn
+    every interval ticks from the counters the gameboard keeps anyway, so
+    watching costs nothing per tick.
+
+    With a Camera, the part of the overlay in view is scaled and placed on
+    the screen the same way as the board, cropped to the viewport. Path
+    segments are measured along the path, so leaks of boards whose packages
+    follow a flow field cannot be shown.
+
+    Attributes:
+        _report_path: a string representing the location of the JSON report
+                      written when closed, or None.
+        _interval: an int representing the ticks between overlay redraws.
+        _ticks: an int counting the ticks observed.
+        _samples: a float array of shape (samples, 2) of the path at every
+                  pixel of arc length.
+        _surface: a Surface of the heatmap, or None before the first redraw.
+        _camera: the Camera instance the board is shown through, or None.
+        _shown: a tuple of the Surface, camera zoom and location the
+                overlay was last placed for and its (surface, position)
+                blit, or None.
+    """
+
+    def __init__(self, gameboard, report_path=None, interval=30,
+                 camera=None):
+        """
+        Sample the path of the gameboard.
+
+        Args:
+            gameboard: a Factory instance.
+            report_path: a string representing the location of the JSON
+                         report written when closed, or None.
+            interval: an int representing the ticks between overlay
+                      redraws.
+            camera: a Camera instance the board is shown through, or None
+                    when the board is drawn at the top left of the screen.
+
+        Raises:
+            ValueError: if the gameboard keeps a LeakHistogram of packages
+                        following a flow field.
+        """
+        super().__init__(gameboard)
+        if gameboard.leaks is not None and gameboard.flow_field is not None:
+            raise ValueError("TowerHeatmap measures leaks along the path, " \
+                             "not a flow field")
+        self._report_path = report_path
+        self._interval = interval
+        self._ticks = 0
+        self._samples = path_samples(gameboard.path)
+        self._surface = None
+        self._camera = camera
+        self._shown = None
+
+    def update(self, generator, tick_time):
+        """
+        Redraw the overlay every interval ticks.
+
+        Args:
+            generator: the Generator instance feeding the gameboard.
+            tick_time: a float representing the seconds spent updating and
+                       drawing the tick.
+        """
+        self._ticks += 1
+        if self._ticks % self._interval == 0:
+            self.refresh()
+
+    def refresh(self):
+        """
+        Redraw the overlay from the current counters.
+        """
+        surface = pygame.Surface(self._gameboard.size, pygame.SRCALPHA)
+        leaks = self._gameboard.leaks
+        if leaks is not None:
+            segment = leaks.segment
+            entered = leaks.entered()
+            leaked = leaks.leaked()
+            for index in range(len(entered)):
+                if entered[index] == 0:
+                    continue
+                color = heat(leaked[index] / entered[index])
+                for x_pos, y_pos in self._samples[index * segment: \
+                        (index + 1) * segment].astype(int):
+                    surface.fill(color, (x_pos - 2, y_pos - 2, 5, 5))
+        for tally in self._gameboard.tower_state.tallies():
+            ticks = tally.packed + tally.idle_ticks + tally.busy_ticks
+            color = heat(tally.idle_ticks / ticks if ticks else 0.0)
+            center = (int(tally.x_pos), int(tally.y_pos))
+            pygame.draw.circle(surface, color, center, int(tally.radius), 2)
+            pygame.draw.circle(surface, color, center, 8)
+        self._surface = surface
+
+    def report(self):
+        """
+        Returns a dict of the counters of every tower, placed or removed,
+        and of the packages entering and leaking out of every path segment.
+        """
+        state = self._gameboard.tower_state
+        towers = [dict(tally._asdict(), removed=False) \
+                  for tally in state.tallies()]
+        towers += [dict(tally._asdict(), removed=True) \
+                   for tally in state.retired]
+        found = {"ticks": self._ticks, "towers": towers, "segments": None}
+        leaks = self._gameboard.leaks
+        if leaks is not None:
+            found["segments"] = {"length": leaks.segment, \
+                                 "entered": leaks.entered().tolist(), \
+                                 "caught": leaks.caught.tolist(), \
+                                 "leaked": leaks.leaked().tolist()}
+        return found
+
+    def close(self):
+        """
+        Write the report, if a report path was given.
+        """
+        if self._report_path is not None:
+            with open(self._report_path, "w", encoding="utf-8") as report:
+                json.dump(self.report(), report, indent=1)
+
+    def blits(self):
+        """
+        Returns a list of (surface, position) tuples of the overlay.
+        """
+        if self._surface is None:
+            return []
+        camera = self._camera
+        if camera is None:
+            return [(self._surface, (0, 0))]
+        key = (self._surface, camera.zoom, camera.location)
+        if self._shown is None or self._shown[:3] != key:
+            self._shown = key + (self.place(),)
+        return self._shown[3]
+
+    def place(self):
+        """
+        Returns a list of the (surface, position) tuple of the part of the
+        overlay in view, scaled and placed on the screen by the camera, or
+        an empty list when none of it is in view.
+        """
+        camera = self._camera
+        area = camera.world_rect().clip(self._surface.get_rect())
+        if not area.width or not area.height:
+            return []
+        left, top = camera.to_screen(area.topleft)
+        right, bottom = camera.to_screen(area.bottomright)
+        surface = pygame.transform.scale(self._surface.subsurface(area), \
+            (max(1, right - left), max(1, bottom - top)))
+        rect = surface.get_rect(topleft=(left, top))
+        shown = rect.clip(camera.viewport)
+        if not shown.width or not shown.height:
+            return []
+        return [(surface.subsurface(shown.move(-left, -top)), shown.topleft)]
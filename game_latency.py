@@ -0,0 +1,198 @@
+"""
+Logisti-Co input latency tracing.
+"""
+import collections
+import time
+import numpy as np
+import pygame
+# pylint: disable=no-name-in-module
+from pygame.locals import (
+    MOUSEBUTTONDOWN,
+)
+from game_monitor import Monitor
+from game_view import VisualText
+
+# Percentiles shown on the overlay and logged.
+PERCENTILES = [50, 95, 99]
+
+
+class LatencyTracer(Monitor):
+    """
+    A monitor which traces every input from the moment it happened, through
+    the model applying it, to the frame showing it being presented.
+
+    An EventDispatcher given the tracer stamps traced events before and
+    after their handlers run. The tracer is updated right after the view
+    presents the frame, so every event applied during the tick is presented
+    at that update. Events carrying an SDL timestamp are traced from it,
+    other events from the moment the event queue was drained.
+
+    Attributes:
+        _event_types: a tuple of the pygame Event types traced.
+        _window: a deque of (queue, apply, photon) tuples of the seconds from
+                 the input to it being dispatched, applied and presented,
+                 for the latest inputs.
+        _pending: a list of the traces of inputs applied but not yet
+                  presented, each a list of the event type and the
+                  perf_counter times of the input, its dispatch and it
+                  being applied.
+        _log: the open log file, or None.
+        _interval: an int representing the frames between overlay updates.
+        _frame: an int counting the frames seen.
+        _traced: an int counting the inputs presented.
+        _text: a VisualText showing the latency percentiles.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, gameboard, event_types=(MOUSEBUTTONDOWN,), window=256,
+                 log_path=None, interval=30):
+        """
+        Initialize the trace window and open the log.
+
+        Args:
+            gameboard: a Factory instance.
+            event_types: a sequence of the pygame Event types traced.
+            window: an int representing the latest inputs percentiles are
+                    taken over.
+            log_path: a string representing the location of a CSV log of
+                      every input, or None to keep no log.
+            interval: an int representing the frames between overlay
+                      updates.
+        """
+        super().__init__(gameboard)
+        self._event_types = tuple(event_types)
+        self._window = collections.deque(maxlen=window)
+        self._pending = []
+        self._log = None
+        if log_path is not None:
+            # pylint: disable=consider-using-with
+            self._log = open(log_path, "w", encoding="utf-8")
+            self._log.write("type,queue_ms,apply_ms,photon_ms\n")
+        self._interval = interval
+        self._frame = 0
+        self._traced = 0
+        self._text = VisualText("Input p50/95/99: ", (850, 560), 20)
+
+    def traces(self, event):
+        """
+        Returns whether an event is traced.
+
+        Args:
+            event: a pygame Event.
+        """
+        return event.type in self._event_types
+
+    def received(self, event, drained):
+        """
+        Start the trace of an event about to be handled.
+
+        Args:
+            event: a pygame Event.
+            drained: a float representing the perf_counter time the event
+                     queue was drained.
+
+        Returns:
+            A list of the event type and the perf_counter times of the input
+            and of it being dispatched.
+        """
+        now = time.perf_counter()
+        timestamp = getattr(event, "timestamp", None)
+        if timestamp is None:
+            happened = drained
+        else:
+            # SDL timestamps count milliseconds on the pygame.time clock.
+            happened = now - (pygame.time.get_ticks() - timestamp) / 1000
+        return [event.type, happened, now]
+
+    def applied(self, trace):
+        """
+        Mark the model as having applied a traced event.
+
+        Args:
+            trace: the list returned by received for the event.
+        """
+        trace.append(time.perf_counter())
+        self._pending.append(trace)
+
+    def update(self, generator, tick_time):
+        """
+        Mark every applied event as presented, and refresh the overlay.
+
+        Args:
+            generator: the Generator instance feeding the gameboard.
+            tick_time: a float representing the seconds spent updating and
+                       drawing the tick.
+        """
+        self._frame += 1
+        if self._pending:
+            presented = time.perf_counter()
+            for event_type, happened, dispatched, applied in self._pending:
+                latency = (dispatched - happened, applied - happened, \
+                           presented - happened)
+                self._window.append(latency)
+                if self._log is not None:
+                    self._log.write(pygame.event.event_name(event_type) + \
+                        "".join(f",{stage * 1000:.3f}" for stage in latency) \
+                        + "\n")
+            self._traced += len(self._pending)
+            self._pending = []
+        if self._frame % self._interval == 0:
+            self.refresh()
+
+    def percentiles(self, stage=2):
+        """
+        Returns a list of the PERCENTILES of the latest latencies in
+        milliseconds, or None when nothing was traced.
+
+        Args:
+            stage: an int, 0 for the latency until the input was dispatched,
+                   1 until it was applied and 2 until it was presented.
+        """
+        if not self._window:
+            return None
+        latencies = np.array([latency[stage] for latency in self._window])
+        return (np.percentile(latencies, PERCENTILES) * 1000).tolist()
+
+    def refresh(self):
+        """
+        Show the input to presentation percentiles on the overlay.
+        """
+        found = self.percentiles()
+        if found is not None:
+            self._text.update("/".join(f"{value:.0f}" for value in found) + \
+                              " ms")
+
+    def close(self):
+        """
+        Log the percentiles of every stage and close the log.
+        """
+        if self._log is None:
+            return
+        for name, stage in (("queue", 0), ("apply", 1), ("photon", 2)):
+            found = self.percentiles(stage)
+            if found is not None:
+                self._log.write(f"# {name} " + " ".join( \
+                    f"p{percentile}={value:.3f}" for percentile, value \
+                    in zip(PERCENTILES, found)) + "\n")
+        self._log.close()
+        self._log = None
+
+    @property
+    def traced(self):
+        """
+        Returns the number of inputs presented.
+        """
+        return self._traced
+
+    def blits(self):
+        """
+        Returns a list of (surface, position) tuples of the overlay.
+        """
+        return [(text.text, text.location) for text in self.texts]
+
+    @property
+    def texts(self):
+        """
+        Returns the list of VisualText instances drawn on the overlay.
+        """
+        return [self._text]
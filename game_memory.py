@@ -0,0 +1,176 @@
+"""
+Logisti-Co memory instrumentation.
+"""
+import sys
+import tracemalloc
+from game_monitor import Monitor
+
+
+def object_bytes(obj):
+    """
+    Estimate the bytes held by a game object.
+
+    Counts the object, its attribute dict and any list or tuple attributes
+    (such as a Package path), but not surfaces, which are counted separately.
+
+    Args:
+        obj: an object with an attribute dict.
+
+    Returns:
+        An int representing the estimated number of bytes.
+    """
+    attributes = vars(obj)
+    total = sys.getsizeof(obj) + sys.getsizeof(attributes)
+    for value in attributes.values():
+        if isinstance(value, (list, tuple)):
+            total += sys.getsizeof(value)
+    return total
+
+
+def surface_bytes(surfaces):
+    """
+    Count the pixel bytes of distinct surfaces.
+
+    Surfaces shared between sprites are only counted once, so copies made per
+    sprite show up as growth.
+
+    Args:
+        surfaces: an iterable of pygame Surface instances.
+
+    Returns:
+        A tuple of ints holding the number of distinct surfaces and their
+        pixel bytes.
+    """
+    seen = {}
+    for surf in surfaces:
+        seen[id(surf)] = surf
+    total = sum(surf.get_pitch() * surf.get_height() for surf in seen.values())
+    return (len(seen), total)
+
+
+class MemoryMonitor(Monitor):
+    """
+    A monitor which takes tracemalloc snapshots every _interval ticks and
+    writes a report of live bytes per entity type and of the allocation
+    sites which grew the most when the game ends.
+
+    Attributes:
+        _view: an optional View instance whose HUD surfaces are counted.
+        _interval: an int representing the number of ticks between snapshots.
+        _report_path: a string representing the location of the report file.
+        _top: an int representing the number of allocation sites reported
+              per snapshot.
+        _tick: an int representing the number of ticks seen so far.
+        _previous: the previous tracemalloc Snapshot instance, or None.
+        _last_tick: an int representing the tick of the previous snapshot,
+                    or None.
+        _entries: a list of the report lines gathered so far.
+        _started: a bool telling whether this monitor started tracemalloc.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, gameboard, interval=600, report_path="memory_report.txt",
+                 top=10, view=None):
+        """
+        Start tracing allocations.
+
+        Args:
+            gameboard: a Factory instance.
+            interval: an int representing the number of ticks between
+                      snapshots.
+            report_path: a string representing the location of the report
+                         file written by close.
+            top: an int representing the number of allocation sites reported
+                 per snapshot.
+            view: an optional PyGameView instance whose HUD surfaces are
+                  counted.
+        """
+        super().__init__(gameboard)
+        self._view = view
+        self._interval = interval
+        self._report_path = report_path
+        self._top = top
+        self._tick = 0
+        self._previous = None
+        self._last_tick = None
+        self._entries = []
+        self._started = not tracemalloc.is_tracing()
+        if self._started:
+            tracemalloc.start()
+
+    def update(self, generator, tick_time):
+        """
+        Take a snapshot every _interval ticks.
+
+        Args:
+            generator: the Generator instance feeding the gameboard.
+            tick_time: a float representing the seconds spent updating and
+                       drawing the tick.
+        """
+        self._tick += 1
+        if self._tick % self._interval == 0:
+            self.snapshot()
+
+    def entity_bytes(self):
+        """
+        Measure the live bytes of every entity type.
+
+        Returns:
+            A dict mapping entity type names to (count, bytes) tuples.
+        """
+        packages = list(self._gameboard.packages)
+        towers = list(self._gameboard.robots)
+        usage = {
+            "Package": (len(packages), \
+                        sum(object_bytes(package) for package in packages)),
+            "Tower": (len(towers), \
+                      sum(object_bytes(tower) for tower in towers)),
+            "Package surfaces": surface_bytes(package.surf \
+                                              for package in packages),
+            "Tower surfaces": surface_bytes(tower.surf for tower in towers),
+        }
+        if self._view is not None:
+            usage["HUD"] = surface_bytes(text.text \
+                                         for text in self._view.hud_texts)
+        return usage
+
+    def snapshot(self):
+        """
+        Take a tracemalloc snapshot and add it to the report.
+        """
+        current = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        traced, peak = tracemalloc.get_traced_memory()
+        self._entries.append(f"== tick {self._tick}: traced {traced} bytes, "
+                             f"peak {peak} bytes")
+        for name, (count, size) in self.entity_bytes().items():
+            self._entries.append(f"  {name}: {count} live, {size} bytes")
+        if self._previous is not None:
+            self._entries.append(f"  top {self._top} growth since last "
+                                 "snapshot:")
+            for stat in current.compare_to(self._previous, "lineno") \
+                    [:self._top]:
+                self._entries.append(f"    {stat}")
+        self._previous = current
+        self._last_tick = self._tick
+
+    def close(self):
+        """
+        Take a final snapshot unless one was just taken this tick, write the
+        report file and stop tracing.
+        """
+        if self._last_tick != self._tick:
+            self.snapshot()
+        with open(self._report_path, "w", encoding="utf-8") as report:
+            report.write("\n".join(self._entries) + "\n")
+        if self._started:
+            tracemalloc.stop()
+
+    @property
+    def entries(self):
+        """
+        Returns the list of report lines gathered so far.
+        """
+        return self._entries
@@ -1,6 +1,15 @@
 """
 Logisti-Co game model.
 """
+import bisect
+import collections
+import heapq
+import itertools
+import math
+import random
+import struct
+import time
+import numpy as np
 # pylint: disable=no-name-in-module
 from pygame.locals import (
     RLEACCEL,
@@ -15,19 +24,78 @@ BOX_TEXTURE = pygame.image.load("./game_assets/box_texture/box.png")
 BOX_SIZE = BOX_TEXTURE.get_size()
 BOX_TEXTURE = pygame.transform.scale(BOX_TEXTURE, (int(BOX_SIZE[0]*0.075), \
                                                    int(BOX_SIZE[1]*0.075)))
+# The money placing a Tower instance costs, and removing it refunds.
+TOWER_COST = 100
+
+# Serial numbers identifying Package and Tower instances for as long as the
+# game runs, unlike their slots or ids.
+SERIALS = itertools.count()
+
+# Package locations are kept in fixed point, as ints counting 1/FIXED_ONE
+# of a pixel. Packages are moved and measured with integer arithmetic only,
+# so every engine reaches bit for bit the same results on any platform.
+FIXED_SHIFT = 16
+FIXED_ONE = 1 << FIXED_SHIFT
+
+def to_fixed(value):
+    """
+    Returns the fixed point int of a number of pixels.
+
+    Args:
+        value: an int or float representing a number of pixels.
+    """
+    return int(round(value * FIXED_ONE))
+
+def isqrt_array(values):
+    """
+    Returns an int64 array of the integer square roots of an int64 array,
+    rounded down as math.isqrt rounds them.
+
+    Args:
+        values: an int64 array of values below 2**62.
+    """
+    roots = np.sqrt(values.astype(np.float64)).astype(np.int64)
+    # Below 2**62 the float root is off by at most one either way.
+    roots -= roots * roots > values
+    roots += (roots + 1) * (roots + 1) <= values
+    return roots
+
+# Box surfaces shared by every Package instance, keyed by whether they have
+# been converted to the display format.
+BOX_SURFACES = {}
+
+def box_surface():
+    """
+    Returns the box surface shared by every Package instance.
+
+    The surface is converted to the display format once a display mode has
+    been set, so packages can also be created without a display.
+    """
+    converted = pygame.display.get_surface() is not None
+    if converted not in BOX_SURFACES:
+        if converted:
+            surf = BOX_TEXTURE.convert_alpha()
+        else:
+            surf = BOX_TEXTURE.copy()
+        surf.set_colorkey((255, 255, 255), RLEACCEL)
+        BOX_SURFACES[converted] = surf
+    return BOX_SURFACES[converted]
 
 class Package(pygame.sprite.Sprite):
     """
     Package representation
 
     Attributes:
-        _location: a tuple of floats representing the location of the package
-                   in cartesian coordinates.
+        _location: a tuple of ints representing the location of the package
+                   in cartesian coordinates, in fixed point.
         _path: a list of tuples of int coordinates depicting the pixel waypoints
                the package should reach.
-        _surf: an image which represents the Package instance in the view.
+        _surf: an image which represents the Package instance in the view,
+               shared between all Package instances.
         _rect: a Pygame Rect object storing the rectangular coordinates of the
                Package surface in pixel.
+        serial: an int uniquely identifying the package.
+        age: an int representing the number of times the package moved.
     """
     def __init__(self, x_pos, y_pos, path):
         """
@@ -42,14 +110,16 @@ class Package(pygame.sprite.Sprite):
                   package should reach.
         """
 
-        self._location = (x_pos,y_pos)
+        self._location = (to_fixed(x_pos), to_fixed(y_pos))
         self._path = path
+        self.serial = next(SERIALS)
+        self.age = 0
 
         super().__init__()
-        self._surf = BOX_TEXTURE.convert_alpha()
-        self._surf.set_colorkey((255, 255, 255), RLEACCEL)
+        self._surf = box_surface()
         self._rect = self._surf.get_rect()
-        self._rect.center = (int(self._location[0]), int(self._location[1]))
+        self._rect.center = (self._location[0] >> FIXED_SHIFT, \
+                             self._location[1] >> FIXED_SHIFT)
 
     def move(self):
         """
@@ -58,27 +128,36 @@ class Package(pygame.sprite.Sprite):
         Returns:
             bool: False if the end of the path has been reached, else True.
         """
-        # Move onto the next waypoint if reached
-        if self._rect.center == self._path[0]:
-            self._path = self._path[1:]
+        self.age += 1
+        # Move onto the next waypoint if reached. Locals stand in for the
+        # properties as this runs for every package on every tick.
+        path = self._path
+        x_pos, y_pos = self._location
+        if x_pos == path[0][0] << FIXED_SHIFT and \
+                y_pos == path[0][1] << FIXED_SHIFT:
+            path = self._path = path[1:]
         # Detect if the list is too short
-        if len(self._path) == 0:
+        if len(path) == 0:
             return False
         # Calculate the normalized direction and use it to transform location
-        # with a certain speed
-        distance = ((self.location[0] - self._path[0][0])**2 + \
-                    (self.location[1] - self._path[0][1])**2)**(1/2)
-        if distance == 0:
-            direction = (0,0)
+        # with a certain speed of 1 pixel/tick. Only integer operations are
+        # used, so the NumPy engine in game_shard moves packages bit for bit
+        # the same.
+        x_target = path[0][0] << FIXED_SHIFT
+        y_target = path[0][1] << FIXED_SHIFT
+        x_change = x_target - x_pos
+        y_change = y_target - y_pos
+        squared = x_change*x_change + y_change*y_change
+        if squared <= FIXED_ONE * FIXED_ONE:
+            # The last pixel lands exactly on the waypoint, so packages on
+            # diagonal legs cannot circle it without ever arriving.
+            x_pos, y_pos = x_target, y_target
         else:
-            direction = ((self._path[0][0] - self.location[0])/distance, \
-                        (self._path[0][1] - self.location[1])/distance)
-        # The speed, in pixels/tic, which the package will move
-        speed = 1
-        displacement = (direction[0]*speed, direction[1]*speed)
-        self._location = (self._location[0]+displacement[0], self._location[1]+displacement[1])
-
-        self._rect.center = (int(self._location[0]), int(self._location[1]))
+            distance = math.isqrt(squared)
+            x_pos += (x_change << FIXED_SHIFT) // distance
+            y_pos += (y_change << FIXED_SHIFT) // distance
+        self._location = (x_pos, y_pos)
+        self._rect.center = (x_pos >> FIXED_SHIFT, y_pos >> FIXED_SHIFT)
 
         # Report successful behavior
         return True
@@ -87,7 +166,14 @@ class Package(pygame.sprite.Sprite):
     @property
     def location(self):
         """
-        Returns location of the package.
+        Returns location of the package in pixels.
+        """
+        return (self._location[0] / FIXED_ONE, self._location[1] / FIXED_ONE)
+
+    @property
+    def fixed(self):
+        """
+        Returns location of the package in fixed point.
         """
         return self._location
 
@@ -120,33 +206,257 @@ for index in range(FRAME_COUNT):
     image.set_colorkey((255, 255, 255), RLEACCEL)
     TOWER_FRAMES_Y.append(image)
 
-# pylint: disable=too-many-instance-attributes
+# The counters of a tower, telling whether it earns its cost.
+#     serial: an int uniquely identifying the tower.
+#     x_pos: a float of the x-axis location of the tower.
+#     y_pos: a float of the y-axis location of the tower.
+#     radius: a float of the distance the tower processes packages within.
+#     packed: an int of the packages the tower packed.
+#     idle_ticks: an int of the ticks the tower was ready with no package in
+#                 range.
+#     busy_ticks: an int of the ticks the tower was cooling down.
+TowerTally = collections.namedtuple("TowerTally", \
+    ["serial", "x_pos", "y_pos", "radius", "packed", "idle_ticks", \
+     "busy_ticks"])
+
+class TowerState():
+    """
+    The state of a set of Tower instances held in parallel arrays, so the
+    readiness and animation of every tower advance in one vectorized step.
+
+    Slots are kept in the order the towers were added, which is also the
+    order of the Factory robots group.
+
+    Attributes:
+        _towers: a list of the Tower instances in slot order.
+        _size: an int representing the number of slots in use.
+        cooldown: an int array of the ticks left before each tower is ready,
+                  counted down from its rate.
+        ready: a bool array telling whether each tower is ready to receive a
+               package.
+        animating: a bool array telling whether each tower is animating.
+        frame: a float array of the animation frame each tower shows.
+        rate: an int array of the ticks each tower waits after processing a
+              package.
+        radius: a float array of the distance from each tower which it can
+                process packages.
+        x_pos: a float array of the x-axis location of each tower.
+        y_pos: a float array of the y-axis location of each tower.
+        packed: an int array of the packages each tower packed.
+        idle_ticks: an int array of the ticks each tower was ready with no
+                    package in range.
+        busy_ticks: an int array of the ticks each tower was cooling down.
+        retired: a list of the TowerTally tuples of removed towers.
+    """
+    def __init__(self, capacity=16):
+        """
+        Preallocate the state arrays.
+
+        Args:
+            capacity: an int representing the number of slots allocated
+                      before the arrays have to grow.
+        """
+        self._towers = []
+        self._size = 0
+        self.cooldown = np.zeros(capacity, np.int64)
+        self.ready = np.zeros(capacity, bool)
+        self.animating = np.zeros(capacity, bool)
+        self.frame = np.zeros(capacity, np.float64)
+        self.rate = np.zeros(capacity, np.int64)
+        self.radius = np.zeros(capacity, np.float64)
+        self.x_pos = np.zeros(capacity, np.float64)
+        self.y_pos = np.zeros(capacity, np.float64)
+        self.packed = np.zeros(capacity, np.int64)
+        self.idle_ticks = np.zeros(capacity, np.int64)
+        self.busy_ticks = np.zeros(capacity, np.int64)
+        self.retired = []
+
+    def _arrays(self):
+        """
+        Returns the names of the state arrays.
+        """
+        return ["cooldown", "ready", "animating", "frame", "rate", "radius", \
+                "x_pos", "y_pos", "packed", "idle_ticks", "busy_ticks"]
+
+    def add(self, tower, rate, radius):
+        """
+        Give a Tower instance the next slot.
+
+        Args:
+            tower: a Tower instance.
+            rate: an int representing the ticks the tower waits after
+                  processing a package.
+            radius: a float representing the distance from the tower which
+                    it can process packages.
+
+        Returns:
+            An int representing the slot of the tower.
+        """
+        if self._size == len(self.ready):
+            for name in self._arrays():
+                array = getattr(self, name)
+                setattr(self, name, np.concatenate( \
+                    (array, np.zeros_like(array))))
+        slot = self._size
+        self._towers.append(tower)
+        self._size += 1
+        self.cooldown[slot] = rate
+        self.ready[slot] = False
+        self.animating[slot] = False
+        self.frame[slot] = 0
+        self.rate[slot] = rate
+        self.radius[slot] = radius
+        self.x_pos[slot] = tower.location[0]
+        self.y_pos[slot] = tower.location[1]
+        self.packed[slot] = 0
+        self.idle_ticks[slot] = 0
+        self.busy_ticks[slot] = 0
+        return slot
+
+    def remove(self, tower):
+        """
+        Free the slot of a Tower instance, keeping the other slots in order,
+        and keep the tally of the tower in retired.
+
+        Args:
+            tower: a Tower instance added to this state.
+        """
+        slot = tower.slot
+        self.retired.append(self.tally(slot))
+        for name in self._arrays():
+            array = getattr(self, name)
+            array[slot:self._size - 1] = array[slot + 1:self._size]
+        del self._towers[slot]
+        self._size -= 1
+        for index in range(slot, self._size):
+            self._towers[index].slot = index
+
+    def update_ready(self, start=0, stop=None):
+        """
+        Mark towers whose cooldown is over as ready and count down.
+
+        Args:
+            start: an int representing the first slot to update.
+            stop: an int representing the slot after the last one to update,
+                  or None for every slot in use.
+        """
+        stop = self._size if stop is None else stop
+        self.ready[start:stop] |= self.cooldown[start:stop] <= 0
+        self.cooldown[start:stop] -= 1
+
+    def update_frame(self, start=0, stop=None):
+        """
+        Advance the animation frame of animating towers, and stop animating
+        once the last frame has been reached.
+
+        Args:
+            start: an int representing the first slot to update.
+            stop: an int representing the slot after the last one to update,
+                  or None for every slot in use.
+        """
+        stop = self._size if stop is None else stop
+        slots = np.flatnonzero(self.animating[start:stop]) + start
+        if slots.size == 0:
+            return
+        rate = self.rate[slots]
+        tick = rate - self.cooldown[slots]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            frame = 1.5 * tick / (rate / FRAME_COUNT)
+        # fmin also clamps the nan of a zero rate to the last frame.
+        frame = np.fmin(frame, FRAME_COUNT - 1)
+        done = frame >= FRAME_COUNT - 1
+        frame[done] = 0
+        self.frame[slots] = frame
+        self.animating[slots[done]] = False
+
+    def update(self, start=0, stop=None):
+        """
+        Update the readiness and then the animation of towers.
+
+        Args:
+            start: an int representing the first slot to update.
+            stop: an int representing the slot after the last one to update,
+                  or None for every slot in use.
+        """
+        self.update_ready(start, stop)
+        self.update_frame(start, stop)
+
+    def ready_reset(self, slot):
+        """
+        Reset the ready state and cooldown of a tower.
+
+        Args:
+            slot: an int representing the slot of the tower.
+        """
+        self.ready[slot] = False
+        self.cooldown[slot] = self.rate[slot]
+
+    def ready_slots(self):
+        """
+        Returns an int array of the slots of every ready tower.
+        """
+        return np.flatnonzero(self.ready[:self._size])
+
+    def count_busy(self):
+        """
+        Count a tick for every tower which is cooling down. Ready towers are
+        counted as packing or idle by whoever hands them packages.
+        """
+        self.busy_ticks[:self._size] += ~self.ready[:self._size]
+
+    def tally(self, slot):
+        """
+        Returns the TowerTally tuple of the tower in a slot.
+
+        Args:
+            slot: an int representing the slot of the tower.
+        """
+        return TowerTally(self._towers[slot].serial, \
+                          float(self.x_pos[slot]), float(self.y_pos[slot]), \
+                          float(self.radius[slot]), int(self.packed[slot]), \
+                          int(self.idle_ticks[slot]), \
+                          int(self.busy_ticks[slot]))
+
+    def tallies(self):
+        """
+        Returns a list of the TowerTally tuples of the towers in slot order.
+        """
+        return [self.tally(slot) for slot in range(self._size)]
+
+    def tower(self, slot):
+        """
+        Returns the Tower instance in a slot.
+
+        Args:
+            slot: an int representing the slot of the tower.
+        """
+        return self._towers[slot]
+
+    def __len__(self):
+        """
+        Returns the number of slots in use.
+        """
+        return self._size
+
 class Tower(pygame.sprite.Sprite):
     """
     Representation of the robot tower.
 
+    The changing state of the tower lives in a slot of a TowerState, which
+    is shared by every tower of a Factory.
+
     Attributes:
         _frames: a list of GIF images representing the keyframes of the tower.
-        _current_frame: an int representing the current frame that the Tower
-                        instance should display.
-        _animating: a boolean telling the Tower instance whether it should
-                    be animating or not.
         _location: a tuple of floats representing the location of the package
                    in cartesian coordinates
-        _rate: an int representing the rate at which the tower can process
-               Package classes.
-        _radius: a float representing the distance from the tower which the
-                 robot can process packages.
-        _ready: a bool status indicating whether the Tower is ready to receive
-                a package or not.
-        _tick: an int representing how much time has passed since the _ready
-               attribute was changed.
-        _surf: an image which represents the Package instance in the view.
+        _state: the TowerState instance holding the tower's state.
+        slot: an int representing the slot of the tower in _state.
+        serial: an int uniquely identifying the tower.
         _rect: a Pygame Rect object storing the rectangular coordinates of the
                Package surface in pixel.
     """
     # pylint: disable=too-many-arguments
-    def __init__(self,x_pos,y_pos,rate,radius,frames):
+    def __init__(self,x_pos,y_pos,rate,radius,frames,state=None):
         """
         Initialize robot tower.
 
@@ -160,111 +470,1054 @@ class Tower(pygame.sprite.Sprite):
                     packages.
             frames: a list of images representing the keyframes of the Tower
                     animation.
+            state: the TowerState instance to hold the tower's state, or None
+                   to give the tower a state of its own.
+        """
+        self._frames = frames
+        self._location = [x_pos,y_pos]
+        self._state = TowerState(1) if state is None else state
+        self.slot = self._state.add(self, rate - 1, radius)
+        self.serial = next(SERIALS)
+
+        super().__init__()
+        self._rect = self._frames[0].get_rect(center = self._location)
+
+    def update_frame(self):
+        """
+        Update the sprite of the robot to the next animation frame.
+        """
+        self._state.update_frame(self.slot, self.slot + 1)
+
+    def animate(self):
+        """
+        Change _animating attribute to True.
+        """
+        self._state.animating[self.slot] = True
+
+    def ready_reset(self):
+        """
+        Reset the ready state of the tower to false and reset tick
+        """
+        self._state.ready_reset(self.slot)
+
+    def update_ready(self):
+        """
+        Update ready state based off of Tower rate.
+        """
+        self._state.update_ready(self.slot, self.slot + 1)
+
+    def update(self):
+        """
+        Update all conditions of the Tower instance.
+        """
+        self._state.update(self.slot, self.slot + 1)
+
+    def kill(self):
+        """
+        Remove the tower from every group and free its state slot.
+        """
+        if self.alive():
+            self._state.remove(self)
+        super().kill()
+
+    # All of the properties created here
+    @property
+    def ready(self):
+        """
+        Returns True is wait function is running, False otherwise.
+        """
+        return bool(self._state.ready[self.slot])
+
+    @property
+    def animating(self):
+        """
+        Returns animating status.
+        """
+        return bool(self._state.animating[self.slot])
+
+    @property
+    def frames(self):
+        """
+        Returns the list of animation frames of the tower.
+        """
+        return self._frames
+
+    @property
+    def frame(self):
+        """
+        Returns the index of the animation frame currently shown.
+        """
+        return int(self._state.frame[self.slot])
+
+    @property
+    def location(self):
+        """
+        Returns location of the package.
+        """
+        return self._location
+
+    @property
+    def rate(self):
+        """
+        Returns rate of the tower's package processing.
+        """
+        return int(self._state.rate[self.slot])
+
+    @property
+    def radius(self):
+        """
+        Returns active radius of the tower.
+        """
+        return float(self._state.radius[self.slot])
+
+    @property
+    def tally(self):
+        """
+        Returns the TowerTally tuple of the tower's counters.
+        """
+        return self._state.tally(self.slot)
+
+    @property
+    def surf(self):
+        """
+        Returns the surface of the tower.
+        """
+        return self._frames[self.frame]
+
+    @property
+    def rect(self):
+        """
+        Returns the pixel position of the tower.
+        """
+        return self._rect
+
+class SpatialGrid():
+    """
+    A uniform grid index of sprites by the cell their center is in, so the
+    sprites within an area can be found without scanning every sprite.
+
+    Attributes:
+        _cell: an int representing the width and height of a cell in pixels.
+        _cells: a dict mapping (column, row) tuples to sets of sprites.
+        _keys: a dict mapping sprites to the (column, row) of their cell.
+    """
+    def __init__(self, cell=64):
+        """
+        Initialize an empty grid.
+
+        Args:
+            cell: an int representing the width and height of a cell in
+                  pixels.
+        """
+        self._cell = cell
+        self._cells = {}
+        self._keys = {}
+
+    def update(self, sprite):
+        """
+        Add a sprite, or move it to the cell it is now in.
+
+        Args:
+            sprite: a sprite with a rect.
+        """
+        center = sprite.rect.center
+        key = (center[0] // self._cell, center[1] // self._cell)
+        old = self._keys.get(sprite)
+        if old != key:
+            if old is not None:
+                self._cells[old].discard(sprite)
+            self._cells.setdefault(key, set()).add(sprite)
+            self._keys[sprite] = key
+
+    def remove(self, sprite):
+        """
+        Remove a sprite from the grid.
+
+        Args:
+            sprite: a sprite added to the grid.
+        """
+        key = self._keys.pop(sprite, None)
+        if key is not None:
+            self._cells[key].discard(sprite)
+
+    def query(self, rect):
+        """
+        Find the sprites whose center is in a cell overlapping an area.
+
+        Args:
+            rect: a pygame Rect of the area in pixels.
+
+        Returns:
+            A list of the sprites found.
+        """
+        found = []
+        for column in range(rect.left // self._cell, \
+                            (rect.right - 1) // self._cell + 1):
+            for row in range(rect.top // self._cell, \
+                             (rect.bottom - 1) // self._cell + 1):
+                cell = self._cells.get((column, row))
+                if cell:
+                    found.extend(cell)
+        return found
+
+    def __len__(self):
+        """
+        Returns the number of sprites in the grid.
+        """
+        return len(self._keys)
+
+class FlowField():
+    """
+    The distance of every tile of a grid to the exit tile, counted in steps
+    around blocked tiles, so packages find their way through a maze of
+    towers by stepping to a neighbouring tile closer to the exit.
+
+    Blocking or freeing a tile only searches again from the tiles whose
+    distance it can change, so placing a tower does not recompute the whole
+    field.
+
+    Attributes:
+        _cell: an int representing the width and height of a tile in pixels.
+        _columns: an int representing the number of tile columns.
+        _rows: an int representing the number of tile rows.
+        _exit: an int representing the tile packages leave the board at.
+        _blocked: a list of bools telling whether each tile is blocked.
+        _distance: a list of the steps from each tile to the exit, or
+                   UNREACHABLE.
+    """
+    UNREACHABLE = float("inf")
+
+    def __init__(self, size, exit_pos, cell=20):
+        """
+        Compute the field of an open grid.
+
+        Args:
+            size: a tuple of ints of the width and height of the board in
+                  pixels.
+            exit_pos: a tuple of ints of the location packages leave at.
+            cell: an int representing the width and height of a tile in
+                  pixels.
+        """
+        self._cell = cell
+        self._columns = -(-size[0] // cell)
+        self._rows = -(-size[1] // cell)
+        self._exit = self.tile(*exit_pos)
+        self._blocked = [False] * (self._columns * self._rows)
+        self._distance = [self.UNREACHABLE] * (self._columns * self._rows)
+        self.recompute()
+
+    def tile(self, x_pos, y_pos):
+        """
+        Returns the int tile of a location, clamped to the grid.
+
+        Args:
+            x_pos: a number representing the x-axis location in pixels.
+            y_pos: a number representing the y-axis location in pixels.
+        """
+        column = min(max(int(x_pos) // self._cell, 0), self._columns - 1)
+        row = min(max(int(y_pos) // self._cell, 0), self._rows - 1)
+        return row * self._columns + column
+
+    def center(self, tile):
+        """
+        Returns a tuple of ints of the center of a tile in pixels.
+
+        Args:
+            tile: an int representing a tile.
+        """
+        row, column = divmod(tile, self._columns)
+        return (column * self._cell + self._cell // 2, \
+                row * self._cell + self._cell // 2)
+
+    def _neighbours(self, tile):
+        """
+        Returns a list of the tiles left, right, above and below a tile.
+
+        Args:
+            tile: an int representing a tile.
+        """
+        column = tile % self._columns
+        found = []
+        if column > 0:
+            found.append(tile - 1)
+        if column < self._columns - 1:
+            found.append(tile + 1)
+        if tile >= self._columns:
+            found.append(tile - self._columns)
+        if tile < len(self._blocked) - self._columns:
+            found.append(tile + self._columns)
+        return found
+
+    def _settle(self, heap):
+        """
+        Lower distances outwards from a heap of candidate distances until no
+        tile can be reached in fewer steps.
+
+        Args:
+            heap: a list heap of (distance, tile) tuples.
+        """
+        distance = self._distance
+        blocked = self._blocked
+        while heap:
+            steps, tile = heapq.heappop(heap)
+            if steps >= distance[tile]:
+                continue
+            distance[tile] = steps
+            for neighbour in self._neighbours(tile):
+                if not blocked[neighbour] and steps + 1 < distance[neighbour]:
+                    heapq.heappush(heap, (steps + 1, neighbour))
+
+    def recompute(self):
+        """
+        Compute every distance from scratch.
+        """
+        self._distance = [self.UNREACHABLE] * len(self._blocked)
+        self._settle([(0, self._exit)])
+
+    def block(self, tile, keep=()):
+        """
+        Block a tile, unless that cuts a tile to keep off from the exit.
+
+        Only the tiles downstream of the blocked tile, whose every
+        neighbour one step closer to the exit is also downstream, get
+        further from the exit. Their distances are cleared and searched
+        again from the tiles around them.
+
+        Args:
+            tile: an int representing the tile to block.
+            keep: a sequence of ints of tiles which have to keep a way to the
+                  exit.
+
+        Returns:
+            A bool telling whether the tile was blocked.
+        """
+        if self._blocked[tile] or tile == self._exit or tile in keep:
+            return False
+        distance = self._distance
+        self._blocked[tile] = True
+        region = [tile]
+        if distance[tile] != self.UNREACHABLE:
+            found = {tile}
+            index = 0
+            while index < len(region):
+                current = region[index]
+                index += 1
+                steps = distance[current] + 1
+                for neighbour in self._neighbours(current):
+                    if neighbour in found or distance[neighbour] != steps:
+                        continue
+                    # Tiles are found a layer at a time, so every other
+                    # neighbour one step closer has been checked already.
+                    if not any(distance[other] == steps - 1 and \
+                               other not in found for other \
+                               in self._neighbours(neighbour)):
+                        found.add(neighbour)
+                        region.append(neighbour)
+        saved = [distance[current] for current in region]
+        for current in region:
+            distance[current] = self.UNREACHABLE
+        heap = []
+        for current in region[1:]:
+            steps = min(distance[neighbour] for neighbour \
+                        in self._neighbours(current)) + 1
+            if steps != self.UNREACHABLE:
+                heap.append((steps, current))
+        heapq.heapify(heap)
+        self._settle(heap)
+        if any(distance[current] == self.UNREACHABLE for current in keep):
+            self._blocked[tile] = False
+            for current, steps in zip(region, saved):
+                distance[current] = steps
+            return False
+        return True
+
+    def unblock(self, tile):
+        """
+        Free a blocked tile, lowering the distances it shortens.
+
+        Args:
+            tile: an int representing the tile to free.
+        """
+        if not self._blocked[tile]:
+            return
+        self._blocked[tile] = False
+        steps = min(self._distance[neighbour] for neighbour \
+                    in self._neighbours(tile)) + 1
+        if steps != self.UNREACHABLE:
+            self._settle([(steps, tile)])
+
+    def next_tile(self, tile):
+        """
+        Returns the int neighbouring tile closest to the exit, or None when
+        the exit cannot be reached.
+
+        Args:
+            tile: an int representing a tile.
+        """
+        best = None
+        best_distance = self.UNREACHABLE
+        for neighbour in self._neighbours(tile):
+            if self._distance[neighbour] < best_distance and \
+                    not self._blocked[neighbour]:
+                best = neighbour
+                best_distance = self._distance[neighbour]
+        return best
+
+    def distance(self, tile):
+        """
+        Returns the steps from a tile to the exit, or UNREACHABLE.
+
+        Args:
+            tile: an int representing a tile.
+        """
+        return self._distance[tile]
+
+    def blocked(self, tile):
+        """
+        Returns whether a tile is blocked.
+
+        Args:
+            tile: an int representing a tile.
+        """
+        return self._blocked[tile]
+
+    def distances(self):
+        """
+        Returns a float array of the distance of every tile in rows and
+        columns, with inf for tiles that cannot reach the exit.
+        """
+        return np.array(self._distance, np.float64).reshape( \
+            self._rows, self._columns)
+
+    @property
+    def cell(self):
+        """
+        Returns the width and height of a tile in pixels.
+        """
+        return self._cell
+
+    @property
+    def exit(self):
+        """
+        Returns the tile packages leave the board at.
+        """
+        return self._exit
+
+class FlowPackage(Package):
+    """
+    A package finding its way to the exit through a FlowField instead of
+    following the waypoints of a path.
+
+    The package moves from tile center to tile center, and only looks up
+    the next tile when it reaches the center of one, so following the field
+    costs the same per tick however large the board is.
+
+    Attributes:
+        _field: the FlowField instance the package follows.
+        _target: an int representing the tile the package is heading to.
+    """
+    def __init__(self, x_pos, y_pos, field):
+        """
+        Initializes package location and the field it follows.
+
+        Args:
+            x_pos: an int representing the x-axis location of the package in
+                   pixels.
+            y_pos: an int representing the y-axis location of the package in
+                   pixels.
+            field: the FlowField instance to follow.
+        """
+        super().__init__(x_pos, y_pos, [field.center(field.exit)])
+        self._field = field
+        self._target = field.tile(x_pos, y_pos)
+
+    def move(self):
+        """
+        Move the package for the game tick towards the exit.
+
+        Returns:
+            bool: False if the exit has been reached, else True.
+        """
+        self.age += 1
+        field = self._field
+        target = field.center(self._target)
+        x_pos, y_pos = self._location
+        if (x_pos, y_pos) == (target[0] << FIXED_SHIFT, \
+                              target[1] << FIXED_SHIFT):
+            if self._target == field.exit:
+                return False
+            following = field.next_tile(self._target)
+            if following is None:
+                return True
+            self._target = following
+            target = field.center(following)
+        x_change = (target[0] << FIXED_SHIFT) - x_pos
+        y_change = (target[1] << FIXED_SHIFT) - y_pos
+        squared = x_change*x_change + y_change*y_change
+        if squared <= FIXED_ONE * FIXED_ONE:
+            x_pos = target[0] << FIXED_SHIFT
+            y_pos = target[1] << FIXED_SHIFT
+        else:
+            distance = math.isqrt(squared)
+            x_pos += (x_change << FIXED_SHIFT) // distance
+            y_pos += (y_change << FIXED_SHIFT) // distance
+        self._location = (x_pos, y_pos)
+        self._rect.center = (x_pos >> FIXED_SHIFT, y_pos >> FIXED_SHIFT)
+        return True
+
+    @property
+    def target(self):
+        """
+        Returns the tile the package is heading to.
+        """
+        return self._target
+
+class Convoys():
+    """
+    Runs of consecutive packages outside the range of every tower, advanced
+    as whole units instead of one package at a time.
+
+    Every package follows the same trajectory, so the state of a package is
+    fixed by its age alone. The trajectory is recorded once, and the ages
+    outside every tower's range are split into stretches. The packages in a
+    stretch form a convoy which only stores their spawn ticks and serials,
+    so a tick costs the same however many packages it holds. The oldest
+    packages leave a convoy as Package instances at the age the next tower
+    can reach them, or fail at the end of the path.
+
+    Attributes:
+        _path: a list of tuples of ints which represent waypoints.
+        _locations: a list of the fixed point location tuple at every
+                    recorded age.
+        _waypoints: a list of the waypoints passed at every recorded age.
+        _end: an int representing the age packages fail at, or None when the
+              path is not finished within the recorded ages.
+        _stretch: an int array of the stretch of every recorded age, or -1
+                  for ages within the range of a tower.
+        _stops: a list of the age every stretch ends at.
+        _members: a list with a deque of (spawn tick, serial) tuples per
+                  stretch, oldest first.
+        _tick: an int counting the ticks advanced.
+        _count: an int representing the packages in every convoy.
+        _cells: a dict mapping (column, row) tuples of INDEX_CELL pixel cells
+                to lists of [start, stop) age ranges spent in them, or None
+                until an area is first queried.
+    """
+    INDEX_CELL = 64
+
+    def __init__(self, path, max_age=100000):
+        """
+        Record the trajectory of a package along a path.
+
+        Args:
+            path: a list of tuples of ints which represent waypoints.
+            max_age: an int representing the most ages recorded, packages
+                     older than this are always simulated one at a time.
+        """
+        self._path = path
+        probe = Package(path[0][0], path[0][1], path)
+        self._locations = [probe.fixed]
+        self._waypoints = [0]
+        self._end = None
+        while len(self._locations) <= max_age:
+            if probe.move() is False:
+                self._end = len(self._locations)
+                break
+            self._locations.append(probe.fixed)
+            self._waypoints.append(len(path) - len(probe._path))
+        self._stretch = np.full(len(self._locations), -1, np.int64)
+        self._stops = []
+        self._members = []
+        self._tick = 0
+        self._count = 0
+        self._cells = None
+
+    def cover(self, towers, packages=()):
+        """
+        Split the ages outside the range of every tower into stretches, and
+        regroup the convoy packages and any individual packages into them.
+
+        Args:
+            towers: a list of (x_pos, y_pos, radius) tuples of every tower.
+            packages: a list of (age, serial) tuples of packages simulated one
+                      at a time, which join a convoy if outside every range.
+
+        Returns:
+            A tuple of a list of (age, serial) tuples of the convoy packages
+            now in the range of a tower, oldest first, and a set of the
+            serials of the individual packages which joined a convoy.
+        """
+        locations = np.array(self._locations, np.int64)
+        uncovered = np.ones(len(locations), bool)
+        for x_pos, y_pos, radius in towers:
+            # The same integer operations as Factory.closest_to.
+            x_change = locations[:, 0] - to_fixed(x_pos)
+            y_change = locations[:, 1] - to_fixed(y_pos)
+            uncovered &= x_change*x_change + y_change*y_change > \
+                         to_fixed(radius) ** 2
+        # Towers only reach packages after they move. Unless the path ends
+        # within the recorded ages, the last age is kept to hand packages
+        # out at.
+        uncovered[0] = False
+        if self._end is None:
+            uncovered[-1] = False
+        edges = np.flatnonzero(np.diff(np.concatenate( \
+            ([0], uncovered.astype(np.int8), [0]))))
+        self._stretch[:] = -1
+        self._stops = []
+        for index, (start, stop) in enumerate(zip(edges[::2], edges[1::2])):
+            self._stretch[start:stop] = index
+            self._stops.append(int(stop))
+        # Members are regrouped oldest first so every convoy stays in order.
+        members = [(spawn_tick, serial, False) for convoy in self._members \
+                   for spawn_tick, serial in convoy] + \
+                  [(self._tick - age, serial, True) for age, serial in packages]
+        members.sort()
+        self._members = [collections.deque() for _ in self._stops]
+        self._count = 0
+        released = []
+        joined = set()
+        for spawn_tick, serial, individual in members:
+            age = self._tick - spawn_tick
+            if self.add(age, serial):
+                if individual:
+                    joined.add(serial)
+            elif not individual:
+                released.append((age, serial))
+        return (released, joined)
+
+    def add(self, age, serial):
+        """
+        Add a package to the convoy of its age, if it is outside the range
+        of every tower.
+
+        Args:
+            age: an int representing the age of the package.
+            serial: an int representing the serial of the package.
+
+        Returns:
+            A bool telling whether the package joined a convoy.
+        """
+        if age >= len(self._stretch) or self._stretch[age] < 0:
+            return False
+        self._members[self._stretch[age]].append((self._tick - age, serial))
+        self._count += 1
+        return True
+
+    def advance(self):
+        """
+        Age every convoy package by a tick.
+
+        Returns:
+            A tuple of a list of (age, serial) tuples of the packages leaving
+            into the range of a tower, and a list of (age, serial) tuples of
+            the packages which reached the end of the path.
+        """
+        self._tick += 1
+        released = []
+        failed = []
+        for stop, convoy in zip(self._stops, self._members):
+            while convoy and self._tick - convoy[0][0] >= stop:
+                spawn_tick, serial = convoy.popleft()
+                self._count -= 1
+                if stop == self._end:
+                    failed.append((self._tick - spawn_tick, serial))
+                else:
+                    released.append((self._tick - spawn_tick, serial))
+        return (released, failed)
+
+    def package(self, age, serial):
+        """
+        Returns a Package instance with the state of a package of an age.
+
+        Args:
+            age: an int representing the age of the package.
+            serial: an int representing the serial of the package.
+        """
+        location = self._locations[age]
+        package = Package(self._path[0][0], self._path[0][1], \
+                          self._path[self._waypoints[age]:])
+        # pylint: disable=protected-access
+        package._location = location
+        package.rect.center = (location[0] >> FIXED_SHIFT, \
+                               location[1] >> FIXED_SHIFT)
+        package.serial = serial
+        package.age = age
+        return package
+
+    def location(self, age):
+        """
+        Returns the location tuple of a package of an age in pixels.
+
+        Args:
+            age: an int representing the age of the package.
+        """
+        location = self._locations[age]
+        return (location[0] / FIXED_ONE, location[1] / FIXED_ONE)
+
+    def blits(self, spacing=1):
+        """
+        Returns a list of (surface, Rect) tuples of the convoy packages to
+        draw.
+
+        Args:
+            spacing: an int representing the fewest pixels of path between
+                     packages drawn, as packages closer than that overlap.
+        """
+        surf = box_surface()
+        found = []
+        for convoy in self._members:
+            last = None
+            for spawn_tick, _ in convoy:
+                if last is None or spawn_tick - last >= spacing:
+                    location = self._locations[self._tick - spawn_tick]
+                    found.append((surf, surf.get_rect(center=( \
+                        location[0] >> FIXED_SHIFT, \
+                        location[1] >> FIXED_SHIFT))))
+                    last = spawn_tick
+        return found
+
+    def _index_ages(self):
+        """
+        Record the ranges of ages spent in every cell of the board.
+        """
+        cells = np.array(self._locations, np.int64) >> FIXED_SHIFT
+        cells //= self.INDEX_CELL
+        starts = np.flatnonzero(np.any(np.diff(cells, axis=0) != 0, axis=1))
+        starts = np.concatenate(([0], starts + 1))
+        stops = np.concatenate((starts[1:], [len(cells)]))
+        self._cells = collections.defaultdict(list)
+        for start, stop in zip(starts.tolist(), stops.tolist()):
+            self._cells[tuple(cells[start].tolist())].append((start, stop))
+
+    def blits_in(self, area, spacing=1):
+        """
+        Returns a list of (surface, Rect) tuples of the convoy packages
+        centered in an area to draw.
+
+        Only the packages of the ages whose locations pass through the cells
+        of the area are looked at, so the cost follows the packages near the
+        area rather than every convoy package on the board.
+
+        Args:
+            area: a pygame Rect of the board area.
+            spacing: an int representing the fewest pixels of path between
+                     packages drawn, as packages closer than that overlap.
+        """
+        if self._cells is None:
+            self._index_ages()
+        cell = self.INDEX_CELL
+        runs = []
+        for column in range(area.left // cell, (area.right - 1) // cell + 1):
+            for row in range(area.top // cell, (area.bottom - 1) // cell + 1):
+                runs += self._cells.get((column, row), ())
+        # Join overlapping and touching age ranges, youngest first.
+        runs.sort()
+        ranges = []
+        for start, stop in runs:
+            if ranges and start <= ranges[-1][1]:
+                ranges[-1][1] = max(ranges[-1][1], stop)
+            else:
+                ranges.append([start, stop])
+        surf = box_surface()
+        found = []
+        for convoy in self._members:
+            if not convoy:
+                continue
+            # Members are oldest first, so the packages of an age range are
+            # the ones spawned within the matching range of ticks.
+            for start, stop in reversed(ranges):
+                first = bisect.bisect_left(convoy, (self._tick - stop + 1,))
+                end = bisect.bisect_left(convoy, (self._tick - start + 1,))
+                last = None
+                for index in range(first, end):
+                    spawn_tick = convoy[index][0]
+                    if last is not None and spawn_tick - last < spacing:
+                        continue
+                    last = spawn_tick
+                    location = self._locations[self._tick - spawn_tick]
+                    center = (location[0] >> FIXED_SHIFT, \
+                              location[1] >> FIXED_SHIFT)
+                    if area.collidepoint(center):
+                        found.append((surf, surf.get_rect(center=center)))
+        return found
+
+    def members(self):
+        """
+        Returns a list of (age, serial) tuples of every convoy package.
+        """
+        return [(self._tick - spawn_tick, serial) \
+                for convoy in self._members for spawn_tick, serial in convoy]
+
+    def __len__(self):
+        """
+        Returns the number of packages in every convoy.
+        """
+        return self._count
+
+# Kinds of ChangeJournal records.
+SPAWNED = 0
+MOVED = 1
+PACKED = 2
+EXITED = 3
+TOWER_PLACED = 4
+TOWER_REMOVED = 5
+TOWER_ANIMATING = 6
+TOWER_IDLE = 7
+MONEY_CHANGED = 8
+PACKED_CHANGED = 9
+FAILED_CHANGED = 10
+
+# The layout of a ChangeJournal record. Which fields are used depends on the
+# kind:
+#     SPAWNED, EXITED: the package serial and location.
+#     MOVED: the number of packages on the gameboard in value, as every
+#            package moves one step along the path each tick.
+#     PACKED: the package serial and location, and the tower serial in value.
+#     TOWER_PLACED: the tower serial and location, and its radius in value.
+#     TOWER_REMOVED, TOWER_ANIMATING, TOWER_IDLE: the tower serial and
+#                                                 location.
+#     MONEY_CHANGED, PACKED_CHANGED, FAILED_CHANGED: the change in value.
+JOURNAL_RECORD = np.dtype([("tick", np.int64), ("kind", np.uint8), \
+                           ("serial", np.int64), ("x_pos", np.float64), \
+                           ("y_pos", np.float64), ("value", np.int64)])
+
+class ChangeJournal():
+    """
+    A preallocated ring buffer of the changes to a gameboard, so consumers
+    read what changed since they last looked instead of scanning every
+    package and tower.
+
+    Records are never removed. Once the buffer is full the oldest records
+    are overwritten, and a reader which fell that far behind is told how
+    many records it missed so it can rescan the gameboard.
+
+    Attributes:
+        _records: a JOURNAL_RECORD array holding the newest records.
+        _written: an int counting every record written.
+        _tick: an int representing the tick records are stamped with.
+        _counters: a list of the money, packed and failed counts at the end
+                   of the previous tick.
+    """
+    def __init__(self, capacity=65536, counters=(0, 0, 0)):
+        """
+        Preallocate the record buffer.
+
+        Args:
+            capacity: an int representing the most records kept.
+            counters: a tuple of the starting money, packed and failed
+                      counts.
         """
-        self._frames = frames
-        self._current_frame = 0
-        self._animating = False
-        self._location = [x_pos,y_pos]
-        self._rate = rate - 1
-        self._radius = radius
-        self._ready = False
+        self._records = np.zeros(capacity, JOURNAL_RECORD)
+        self._written = 0
         self._tick = 0
+        self._counters = list(counters)
 
-        super().__init__()
-        self._surf = self._frames[self._current_frame].convert_alpha()
-        self._rect = self._surf.get_rect(center = self._location)
+    # pylint: disable=too-many-arguments
+    def record(self, kind, serial=-1, x_pos=0.0, y_pos=0.0, value=0):
+        """
+        Write a record stamped with the current tick.
 
-    def update_frame(self):
+        Args:
+            kind: an int representing the kind of the record.
+            serial: an int representing the serial of the package or tower.
+            x_pos: a float representing the x-axis location of the change.
+            y_pos: a float representing the y-axis location of the change.
+            value: an int whose meaning depends on the kind.
+        """
+        self._records[self._written % len(self._records)] = \
+            (self._tick, kind, serial, x_pos, y_pos, value)
+        self._written += 1
+
+    def end_tick(self, money, packed, failed):
         """
-        Update the sprite of the robot to the next animation frame.
+        Record the changes to the counters and start the next tick.
+
+        Args:
+            money: an int representing the money available.
+            packed: an int representing the packages packed so far.
+            failed: an int representing the packages failed so far.
+        """
+        for index, (kind, count) in enumerate(((MONEY_CHANGED, money), \
+                                               (PACKED_CHANGED, packed), \
+                                               (FAILED_CHANGED, failed))):
+            if count != self._counters[index]:
+                self.record(kind, value=count - self._counters[index])
+                self._counters[index] = count
+        self._tick += 1
+
+    def subscribe(self):
+        """
+        Returns a JournalReader reading the records written from now on.
         """
-        self._current_frame = 1.5 * self._tick / (self._rate/(FRAME_COUNT))
-        if self._current_frame > (FRAME_COUNT - 1):
-            self._current_frame = FRAME_COUNT - 1
-        self._surf = self._frames[int(self._current_frame)].convert_alpha()
-        if self._current_frame >= len(self._frames)-1:
-            self._current_frame = 0
-            self._surf = self._frames[self._current_frame].convert_alpha()
-            self._animating = False
+        return JournalReader(self)
 
-    def animate(self):
+    def read(self, cursor):
         """
-        Change _animating attribute to True.
+        Read every record written since a cursor.
+
+        Args:
+            cursor: an int representing the number of records written when
+                    the reader last read.
+
+        Returns:
+            A tuple of a JOURNAL_RECORD array copy of the records still
+            held, oldest first, and an int representing the records missed
+            because they were overwritten.
+        """
+        capacity = len(self._records)
+        missed = max(0, self._written - capacity - cursor)
+        start = (cursor + missed) % capacity
+        count = self._written - cursor - missed
+        if start + count <= capacity:
+            records = self._records[start:start + count].copy()
+        else:
+            records = np.concatenate((self._records[start:], \
+                self._records[:start + count - capacity]))
+        return (records, missed)
+
+    @property
+    def written(self):
+        """
+        Returns the number of records written.
         """
-        self._animating = True
+        return self._written
 
-    def ready_reset(self):
+    @property
+    def tick(self):
         """
-        Reset the ready state of the tower to false and reset tick
+        Returns the tick new records are stamped with.
         """
-        self._ready = False
-        self._tick = 0
+        return self._tick
 
-    def update_ready(self):
+class JournalReader():
+    """
+    A subscriber to a ChangeJournal, with its own cursor.
+
+    Attributes:
+        _journal: the ChangeJournal instance read.
+        _cursor: an int representing the records written when last read.
+    """
+    def __init__(self, journal):
         """
-        Update ready state based off of Tower rate.
+        Start reading at the end of the journal.
+
+        Args:
+            journal: a ChangeJournal instance.
         """
-        if self._tick >= self._rate:
-            self._ready = True
-        self._tick += 1
+        self._journal = journal
+        self._cursor = journal.written
 
-    def update(self):
+    def read(self):
         """
-        Update all conditions of the Tower instance.
+        Read the records written since the last read.
+
+        Returns:
+            A tuple of a JOURNAL_RECORD array of the new records, oldest
+            first, and an int representing the records missed because the
+            reader fell more than the journal capacity behind.
         """
-        self.update_ready()
-        if self._animating:
-            self.update_frame()
+        records, missed = self._journal.read(self._cursor)
+        self._cursor = self._journal.written
+        return (records, missed)
 
-    # All of the properties created here
     @property
-    def ready(self):
+    def pending(self):
         """
-        Returns True is wait function is running, False otherwise.
+        Returns the number of records written since the last read.
         """
-        return self._ready
+        return self._journal.written - self._cursor
 
-    @property
-    def animating(self):
+class LeakHistogram():
+    """
+    Counts how far along their route packages got before a tower packed them
+    or they failed, in segments of a fixed distance, so the stretches
+    letting packages through can be found.
+
+    Packages move a pixel per tick, so their age is the distance they
+    traveled. Only two counters change per finished package, and the
+    packages entering and leaking out of every segment are derived from them
+    when asked for.
+
+    Attributes:
+        _segment: an int representing the length of a segment in pixels.
+        _caught: an int array of the packages packed in each segment.
+        _exited: an int array of the packages which failed in each segment.
+        _segments: an int representing the segments counted in so far.
+    """
+    def __init__(self, segment=50):
         """
-        Returns animating status.
+        Initialize empty counters.
+
+        Args:
+            segment: an int representing the length of a segment in pixels.
         """
-        return self._animating
+        self._segment = segment
+        self._caught = np.zeros(16, np.int64)
+        self._exited = np.zeros(16, np.int64)
+        self._segments = 0
 
-    @property
-    def location(self):
+    def record(self, age, caught):
         """
-        Returns location of the package.
+        Count a finished package.
+
+        Args:
+            age: an int representing the age of the package.
+            caught: a bool telling whether a tower packed the package,
+                    rather than it failing.
+        """
+        segment = age // self._segment
+        if segment >= len(self._caught):
+            grown = max(2 * len(self._caught), segment + 1)
+            self._caught = np.concatenate( \
+                (self._caught, np.zeros(grown - len(self._caught), np.int64)))
+            self._exited = np.concatenate( \
+                (self._exited, np.zeros(grown - len(self._exited), np.int64)))
+        if caught:
+            self._caught[segment] += 1
+        else:
+            self._exited[segment] += 1
+        self._segments = max(self._segments, segment + 1)
+
+    def entered(self):
         """
-        return self._location
+        Returns an int array of the finished packages which reached each
+        segment.
+        """
+        finished = self.caught + self.exited
+        return finished[::-1].cumsum()[::-1]
 
-    @property
-    def rate(self):
+    def leaked(self):
         """
-        Returns rate of the tower's package processing.
+        Returns an int array of the finished packages which reached each
+        segment and were not packed in it.
         """
-        return self._rate
+        return self.entered() - self.caught
 
     @property
-    def radius(self):
+    def segment(self):
         """
-        Returns active radius of the tower.
+        Returns the length of a segment in pixels.
         """
-        return self._radius
+        return self._segment
 
     @property
-    def surf(self):
+    def caught(self):
         """
-        Returns the surface of the tower.
+        Returns an int array of the packages packed in each segment.
         """
-        return self._surf
+        return self._caught[:self._segments].copy()
 
     @property
-    def rect(self):
+    def exited(self):
         """
-        Returns the pixel position of the tower.
+        Returns an int array of the packages which failed in each segment.
         """
-        return self._rect
+        return self._exited[:self._segments].copy()
+
+# Waypoints of the path drawn on the factory floor.
+FACTORY_PATH = [(0,84), (675,84), (675,213), (112,213), \
+                (112,366), (675,366), (675,526), (0,526)]
 
 class Factory():
     """
@@ -273,6 +1526,8 @@ class Factory():
     Attributes:
         _packages: a pygame Group of the generated Package instances.
         _robots: a pygame Group of the generated Tower instances.
+        _tower_state: the TowerState instance holding the state of every
+                      Tower instance in _robots.
         _path: a list of tuples of ints which represent waypoints for Package
                instances to follow.
         _packed: an integer which represents the number of Package instances
@@ -282,74 +1537,342 @@ class Factory():
                  processed by a Tower instance.
         _money: an int which represents the amount of money available to the
                 user.
+        _size: a tuple of ints of the width and height of the board in pixels.
+        _package_index: a SpatialGrid of the Package instances, or None.
+        _tower_index: a SpatialGrid of the Tower instances, or None.
+        _convoys: the Convoys instance of the packages outside the range of
+                  every tower, or None.
+        _journal: the ChangeJournal instance recording every change, or None.
+        _flow_field: the FlowField instance packages follow to the end of the
+                     path around towers, or None when they follow the path.
+        _leaks: the LeakHistogram instance of where packages were packed or
+                failed, or None.
     """
-    def __init__(self,starting_money):
+    # pylint: disable=too-many-arguments
+    def __init__(self,starting_money,path=None,size=(800,600),index_cell=None,
+                 convoys=False,journal=None,flow_cell=None,leak_segment=None):
         """
         Initializes factory floor gameboard.
 
         Args:
             starting_money: an integer which represents the money that the user
                             has available at the beginning of the game.
+            path: a list of tuples of ints which represent waypoints for
+                  Package instances to follow, or None for the factory path.
+            size: a tuple of ints of the width and height of the board in
+                  pixels.
+            index_cell: an int representing the cell size of spatial indexes
+                        kept of the packages and towers, or None to keep no
+                        index.
+            convoys: a bool telling whether packages outside the range of
+                     every tower are advanced in convoys rather than one at
+                     a time.
+            journal: an int representing the most records the change
+                     journal keeps, or None to keep no journal.
+            flow_cell: an int representing the tile size of a flow field
+                       which packages follow from the start to the end of
+                       the path, with every tower blocking its tile, or None
+                       for packages to follow the path waypoints.
+            leak_segment: an int representing the segment length of a leak
+                          histogram kept of where packages were packed or
+                          failed, or None to keep no histogram.
+
+        Raises:
+            ValueError: if convoys are combined with a flow field, as convoys
+                        need every package to follow the same path.
         """
+        if convoys and flow_cell is not None:
+            raise ValueError("convoys need packages to follow the path")
         self._packages = pygame.sprite.Group()
         self._robots = pygame.sprite.Group()
+        self._tower_state = TowerState()
 
-        self._path = [(0,84), (675,84), (675,213), (112,213), \
-                      (112,366), (675,366), (675,526), (0,526)]
+        if path is None:
+            path = FACTORY_PATH
+        self._path = list(path)
         self._packed = 0
         self._failed = 0
         self._money = starting_money
+        self._size = size
+        self._package_index = None
+        self._tower_index = None
+        if index_cell is not None:
+            self._package_index = SpatialGrid(index_cell)
+            self._tower_index = SpatialGrid(index_cell)
+        self._journal = None
+        if journal is not None:
+            self._journal = ChangeJournal(journal, (starting_money, 0, 0))
+        self._flow_field = None
+        if flow_cell is not None:
+            self._flow_field = FlowField(size, self._path[-1], flow_cell)
+        self._leaks = None
+        if leak_segment is not None:
+            self._leaks = LeakHistogram(leak_segment)
+        self._convoys = None
+        if convoys:
+            self._convoys = Convoys(self._path)
+            self.cover_convoys()
 
-    def main(self):
+    # pylint: disable=too-many-arguments
+    def main(self, generator=None, monitors=(), view=None, dispatcher=None,
+             controller=None, idle_after=30):
         """
         Run main game loop.
-        """
-        controller = game_control.MouseControl(self)
-        clock = pygame.time.Clock()
-        gen_rate = 200
-        generator = ExponentialGenerator(self, gen_rate, self._path, 0.9)
-        view = game_view.PyGameView(self)
+
+        Once nothing has changed on screen for idle_after frames, the loop
+        sleeps until the next package is due or an event arrives, and then
+        renders at full rate again.
+
+        Args:
+            generator: a Generator instance which feeds packages onto the
+                       gameboard, or None to use the default
+                       ExponentialGenerator.
+            monitors: a sequence of Monitor instances which observe the game
+                      after every tick.
+            view: a View instance which draws the gameboard, or None to use a
+                  PyGameView.
+            dispatcher: an EventDispatcher instance with extra handlers, such
+                        as keyboard shortcuts, or None.
+            controller: a MouseControl instance placing and removing towers,
+                        or None for one without a camera.
+            idle_after: an int representing the quiescent frames before the
+                        loop sleeps, or None to never sleep.
+        """
+        if dispatcher is None:
+            dispatcher = game_control.EventDispatcher()
+        if controller is None:
+            controller = game_control.MouseControl(self)
+        controller.register(dispatcher)
         running = True
-        while running:
-            for event in pygame.event.get():
-                # pylint: disable=no-member
-                if event.type == pygame.locals.QUIT:
+
+        def quit_game(_event):
+            nonlocal running
+            running = False
+        # pylint: disable=no-member
+        dispatcher.register(pygame.locals.QUIT, quit_game)
+
+        clock = pygame.time.Clock()
+        if generator is None:
+            gen_rate = 200
+            generator = ExponentialGenerator(self, gen_rate, self._path, 0.9)
+        if view is None:
+            view = game_view.PyGameView(self)
+        quiet = 0
+        woken = []
+        try:
+            while running:
+                # Drain the event queue once, applying input before the tick
+                # so it shows up in this frame.
+                dispatcher.dispatch(woken + pygame.event.get())
+                # Update all of the game objects
+                start = time.perf_counter()
+                self.tick(generator)
+                view.draw()
+                tick_time = time.perf_counter() - start
+                for monitor in monitors:
+                    monitor.update(generator, tick_time)
+                clock.tick(60)
+                if self._failed == 10:
                     running = False
-            # Update all of the game objects
-            generator.update()
-            self.update_packages()
-            self.update_robots()
-            view.draw()
-            controller.control()
-            clock.tick(60)
-            if self._failed == 10:
-                running = False
+                quiet = quiet + 1 if self.quiescent() else 0
+                woken = []
+                if running and idle_after is not None and \
+                        quiet >= idle_after:
+                    woken = self.idle(generator, monitors)
+        finally:
+            for monitor in monitors:
+                monitor.close()
+
+    def quiescent(self):
+        """
+        Returns whether nothing on the gameboard changes on screen until the
+        next package is spawned, as there are no packages and no tower is
+        animating.
+        """
+        state = self._tower_state
+        return self.package_count == 0 and \
+               not state.animating[:len(state)].any()
+
+    def idle(self, generator, monitors=(), frame_time=1/60):
+        """
+        Sleep until the tick before the next package is spawned or until an
+        event arrives, then catch the model and monitors up on the ticks
+        slept through, so game time is unchanged.
+
+        Args:
+            generator: a Generator instance which feeds packages onto the
+                       gameboard.
+            monitors: a sequence of Monitor instances which observe the game
+                      after every tick.
+            frame_time: a float representing the seconds of a frame.
+
+        Returns:
+            A list of the pygame Events which ended the sleep, to dispatch.
+        """
+        ticks = generator.ticks_until_spawn()
+        # The tick spawning a package is run and drawn as usual.
+        limit = None if ticks is None else ticks - 1
+        if limit == 0:
+            return []
+        start = time.perf_counter()
+        if limit is None:
+            event = pygame.event.wait()
+        else:
+            event = pygame.event.wait(int(limit * frame_time * 1000))
+        slept = round((time.perf_counter() - start) / frame_time)
+        if limit is not None:
+            slept = min(slept, limit)
+        for _ in range(slept):
+            self.tick(generator)
+            for monitor in monitors:
+                monitor.update(generator, 0.0)
+        # pylint: disable=no-member
+        if event.type == pygame.NOEVENT:
+            return []
+        return [event]
+
+    def tick(self, generator):
+        """
+        Advance the gameboard by a single game tick.
+
+        Args:
+            generator: a Generator instance which feeds packages onto the
+                       gameboard.
+        """
+        generator.update()
+        self.update_packages()
+        self.update_robots()
+        if self._journal is not None:
+            self._journal.end_tick(self._money, self._packed, self._failed)
+
+    def simulate(self, generator, ticks):
+        """
+        Run the game headless, without drawing or input, until it is lost or
+        a number of ticks have passed.
+
+        Args:
+            generator: a Generator instance which feeds packages onto the
+                       gameboard.
+            ticks: an int representing the most game ticks to run.
+
+        Returns:
+            An int representing the number of game ticks run.
+        """
+        for tick in range(ticks):
+            self.tick(generator)
+            if self._failed >= 10:
+                return tick + 1
+        return ticks
 
     def update_robots(self):
         """
-        Check if Package instances are within range of a given Tower instance,
-        and update all Tower instances for which a Package instance is within
-        range.
-        """
-        for robot in self._robots:
-            if robot.ready:
-                closest_package = self.closest_to(robot)
-                if closest_package is not None:
-                    closest_package.kill()
-                    robot.animate()
-                    self._packed += 1
-                    self._money += 25
-                    robot.ready_reset()
-            robot.update()
+        Check if Package instances are within range of a ready Tower instance,
+        then advance every Tower instance at once.
+        """
+        state = self._tower_state
+        journal = self._journal
+        state.count_busy()
+        for slot in state.ready_slots():
+            robot = state.tower(slot)
+            closest_package = self.closest_to(robot)
+            if closest_package is None:
+                state.idle_ticks[slot] += 1
+            else:
+                state.packed[slot] += 1
+                if self._leaks is not None:
+                    self._leaks.record(closest_package.age, True)
+                closest_package.kill()
+                if self._package_index is not None:
+                    self._package_index.remove(closest_package)
+                if journal is not None:
+                    journal.record(PACKED, closest_package.serial, \
+                                   *closest_package.location, robot.serial)
+                    if not robot.animating:
+                        journal.record(TOWER_ANIMATING, robot.serial, \
+                                       *robot.location)
+                robot.animate()
+                self._packed += 1
+                self._money += 25
+                robot.ready_reset()
+        if journal is None:
+            state.update()
+            return
+        animating = state.animating[:len(state)].copy()
+        state.update()
+        for slot in np.flatnonzero(animating & ~state.animating[:len(state)]):
+            robot = state.tower(slot)
+            journal.record(TOWER_IDLE, robot.serial, *robot.location)
 
     def update_packages(self):
         """
         Check validity of Package instance, update position of all packages.
         """
+        index = self._package_index
+        convoys = self._convoys
+        journal = self._journal
+        released = []
+        if convoys is not None:
+            released, failed = convoys.advance()
+            self._failed += len(failed)
+            if self._leaks is not None:
+                for age, _ in failed:
+                    self._leaks.record(age, False)
+            if journal is not None:
+                for age, serial in failed:
+                    journal.record(EXITED, serial, \
+                                   *convoys.location(age - 1))
         for package in self._packages:
             if package.move() is False:
                 package.kill()
                 self._failed += 1
+                if index is not None:
+                    index.remove(package)
+                if self._leaks is not None:
+                    self._leaks.record(package.age, False)
+                if journal is not None:
+                    journal.record(EXITED, package.serial, *package.location)
+            elif convoys is not None and \
+                    convoys.add(package.age, package.serial):
+                package.kill()
+                if index is not None:
+                    index.remove(package)
+            elif index is not None:
+                index.update(package)
+        # Packages leaving convoys have already been moved by advance.
+        self.release_convoys(released)
+        if journal is not None:
+            journal.record(MOVED, value=self.package_count)
+
+    def cover_convoys(self):
+        """
+        Regroup packages into convoys after towers were placed or removed.
+        """
+        towers = [(tower.location[0], tower.location[1], tower.radius) \
+                  for tower in self._robots]
+        released, joined = self._convoys.cover(towers, \
+            [(package.age, package.serial) for package in self._packages])
+        for package in self._packages.sprites():
+            if package.serial in joined:
+                package.kill()
+                if self._package_index is not None:
+                    self._package_index.remove(package)
+        self.release_convoys(released)
+
+    def release_convoys(self, released):
+        """
+        Put packages leaving convoys back on the gameboard one at a time.
+
+        Args:
+            released: a list of (age, serial) tuples of the packages.
+        """
+        if not released:
+            return
+        packages = [self._convoys.package(age, serial) \
+                    for age, serial in released]
+        self._packages.add(*packages)
+        if self._package_index is not None:
+            for package in packages:
+                self._package_index.update(package)
 
     def generate_tower(self,x_pos,y_pos,rate,radius):
         """
@@ -365,15 +1888,72 @@ class Factory():
             radius: an int which represents how far a package can be before it
                     is packed & removed by the Tower instance.
         """
-        if self._money >= 100:
-            self._robots.add(Tower(x_pos,y_pos,rate,radius,TOWER_FRAMES_Y))
-            self._money += -100
+        if self._money >= TOWER_COST:
+            if self._flow_field is not None:
+                tile = self._flow_field.tile(x_pos, y_pos)
+                if not self.block_tile(tile):
+                    return
+                x_pos, y_pos = self._flow_field.center(tile)
+            tower = Tower(x_pos,y_pos,rate,radius,TOWER_FRAMES_Y, \
+                          self._tower_state)
+            self._robots.add(tower)
+            if self._tower_index is not None:
+                self._tower_index.update(tower)
+            if self._journal is not None:
+                self._journal.record(TOWER_PLACED, tower.serial, \
+                                     *tower.location, radius)
+            self._money -= TOWER_COST
+            if self._convoys is not None:
+                self.cover_convoys()
+
+    def block_tile(self, tile):
+        """
+        Block a tile of the flow field for a tower, unless a package is on
+        it or heading to it, or blocking it cuts the start of the path or a
+        package off from the end.
+
+        Args:
+            tile: an int representing the tile of the flow field.
+
+        Returns:
+            A bool telling whether the tile was blocked.
+        """
+        field = self._flow_field
+        keep = {field.tile(*self._path[0])}
+        for package in self._packages:
+            keep.add(package.target)
+            keep.add(field.tile(*package.rect.center))
+        return field.block(tile, keep)
 
     def generate_package(self, path):
         """
         Create a package at the start of the path
         """
-        self._packages.add(Package(path[0][0],path[0][1],path))
+        self.generate_packages(path, 1)
+
+    def generate_packages(self, path, count):
+        """
+        Create a batch of packages at the start of the path.
+
+        Args:
+            path: a list of tuples of ints which represent the coordinates
+                  for the route the packages will take.
+            count: an int representing the number of packages to create.
+        """
+        if self._flow_field is not None:
+            packages = [FlowPackage(path[0][0], path[0][1], self._flow_field) \
+                        for _ in range(count)]
+        else:
+            packages = [Package(path[0][0], path[0][1], path) \
+                        for _ in range(count)]
+        self._packages.add(*packages)
+        if self._package_index is not None:
+            for package in packages:
+                self._package_index.update(package)
+        if self._journal is not None:
+            for package in packages:
+                self._journal.record(SPAWNED, package.serial, \
+                                     *package.location)
 
     def closest_to(self,robot):
         """
@@ -386,12 +1966,23 @@ class Factory():
             closest_package: The closest Package instance in range, else None.
         """
         closest_package = None
-        closest_distance = float("inf")
+        closest_distance = None
+        robot_x = to_fixed(robot.location[0])
+        robot_y = to_fixed(robot.location[1])
+        # Squared fixed point distances are compared, which are exact.
+        limit = to_fixed(robot.radius) ** 2
         for package in self._packages:
-            distance = ((package.location[0] - robot.location[0])**2 + \
-                       (package.location[1] - robot.location[1])**2)**(1/2)
-            if distance <= robot.radius:
-                if distance < closest_distance:
+            package_x, package_y = package.fixed
+            x_change = package_x - robot_x
+            y_change = package_y - robot_y
+            distance = x_change*x_change + y_change*y_change
+            if distance <= limit:
+                # Ties go to the oldest package, which packages leaving
+                # convoys do not come first in iteration for.
+                if closest_package is None or \
+                        distance < closest_distance or \
+                        (distance == closest_distance and \
+                         package.serial < closest_package.serial):
                     closest_package = package
                     closest_distance = distance
         return closest_package
@@ -404,8 +1995,16 @@ class Factory():
         Args:
             tower: a Tower instance.
         """
-        self._money += 100
+        self._money += TOWER_COST
         tower.kill()
+        if self._flow_field is not None:
+            self._flow_field.unblock(self._flow_field.tile(*tower.location))
+        if self._tower_index is not None:
+            self._tower_index.remove(tower)
+        if self._journal is not None:
+            self._journal.record(TOWER_REMOVED, tower.serial, *tower.location)
+        if self._convoys is not None:
+            self.cover_convoys()
 
     # All of the properties created here
     @property
@@ -422,6 +2021,74 @@ class Factory():
         """
         return self._robots
 
+    @property
+    def size(self):
+        """
+        Returns the width and height of the board in pixels.
+        """
+        return self._size
+
+    @property
+    def package_count(self):
+        """
+        Returns the number of packages on the gameboard, in convoys or not.
+        """
+        # len of a Group copies its sprite list, so count its dict instead.
+        count = len(self._packages.spritedict)
+        if self._convoys is None:
+            return count
+        return count + len(self._convoys)
+
+    @property
+    def convoys(self):
+        """
+        Returns the Convoys instance of the gameboard, or None.
+        """
+        return self._convoys
+
+    @property
+    def flow_field(self):
+        """
+        Returns the FlowField instance packages follow, or None.
+        """
+        return self._flow_field
+
+    @property
+    def leaks(self):
+        """
+        Returns the LeakHistogram instance of where packages were packed or
+        failed, or None.
+        """
+        return self._leaks
+
+    @property
+    def journal(self):
+        """
+        Returns the ChangeJournal instance of the gameboard, or None.
+        """
+        return self._journal
+
+    @property
+    def package_index(self):
+        """
+        Returns the SpatialGrid of the Package instances, or None.
+        """
+        return self._package_index
+
+    @property
+    def tower_index(self):
+        """
+        Returns the SpatialGrid of the Tower instances, or None.
+        """
+        return self._tower_index
+
+    @property
+    def tower_state(self):
+        """
+        Returns the TowerState instance of the Tower instances.
+        """
+        return self._tower_state
+
     @property
     def money(self):
         """
@@ -487,6 +2154,13 @@ class Generator():
         if self._tick_count % self._gen_rate == 0:
             self._factory.generate_package(self._path)
 
+    def ticks_until_spawn(self):
+        """
+        Returns the number of updates until one spawns a package, or None
+        if none ever will.
+        """
+        return self._gen_rate - self._tick_count % self._gen_rate
+
     # All of the properties created here
     @property
     def tick_count(self):
@@ -495,6 +2169,13 @@ class Generator():
         """
         return self._tick_count
 
+    @property
+    def gen_rate(self):
+        """
+        Returns the number of game ticks needed to generate a package.
+        """
+        return self._gen_rate
+
 class ExponentialGenerator(Generator):
     """
     A generator which exponentially increases the rate at which it produces
@@ -530,3 +2211,208 @@ class ExponentialGenerator(Generator):
             if self._gen_rate >= 30:
                 self._gen_rate *= self._proportion
             self._tick_count = 0
+
+    def ticks_until_spawn(self):
+        """
+        Returns the number of updates until one spawns a package.
+        """
+        return max(1, math.ceil(self._gen_rate - self._tick_count))
+
+class PoissonGenerator(Generator):
+    """
+    A generator whose packages arrive as a Poisson process.
+
+    Arrival times are drawn from an exponential distribution with a mean of
+    _gen_rate ticks, so a _gen_rate below one spawns several packages per
+    tick.
+
+    Attributes:
+        _random: a Random instance used to draw arrival times.
+        _next_arrival: a float representing the tick of the next arrival.
+    """
+    def __init__(self, factory, gen_rate, path, seed=None):
+        """
+        Initialize the random source and draw the first arrival.
+
+        Args:
+            factory: a Factory instance.
+            gen_rate: a float representing the mean number of game ticks
+                      between two packages.
+            path: a list of tuples of ints which represent the coordinates
+                  for the route a package will take.
+            seed: an optional seed making the arrivals reproducible.
+        """
+        super().__init__(factory, gen_rate, path)
+        self._random = random.Random(seed)
+        self._next_arrival = self._random.expovariate(1 / gen_rate)
+
+    def update(self):
+        """
+        Increment _tick_count and generate every package which arrived
+        during the tick in a single batch.
+        """
+        self._tick_count += 1
+        count = 0
+        while self._next_arrival <= self._tick_count:
+            count += 1
+            self._next_arrival += self._random.expovariate(1 / self._gen_rate)
+        if count:
+            self._factory.generate_packages(self._path, count)
+
+    def ticks_until_spawn(self):
+        """
+        Returns the number of updates until one spawns a package.
+        """
+        return max(1, math.ceil(self._next_arrival - self._tick_count))
+
+class BurstGenerator(Generator):
+    """
+    A generator which alternates between bursts of packages and quiet
+    periods.
+
+    Attributes:
+        _on_ticks: an int representing the length of a burst in ticks.
+        _off_ticks: an int representing the length of a quiet period in
+                    ticks.
+        _batch: an int representing the number of packages generated at once
+                during a burst.
+    """
+    # pylint: disable=too-many-arguments
+    def __init__(self, factory, gen_rate, path, on_ticks, off_ticks, batch=1):
+        """
+        Initialize the burst and quiet period lengths.
+
+        Args:
+            factory: a Factory instance.
+            gen_rate: an integer representing the number of game ticks needed
+                      to generate a batch during a burst.
+            path: a list of tuples of ints which represent the coordinates
+                  for the route a package will take.
+            on_ticks: an int representing the length of a burst in ticks.
+            off_ticks: an int representing the length of a quiet period in
+                       ticks.
+            batch: an int representing the number of packages generated at
+                   once during a burst.
+        """
+        super().__init__(factory, gen_rate, path)
+        self._on_ticks = on_ticks
+        self._off_ticks = off_ticks
+        self._batch = batch
+
+    def update(self):
+        """
+        Increment _tick_count and generate a batch of packages at every
+        _gen_rate interval of a burst.
+        """
+        self._tick_count += 1
+        phase = self._tick_count % (self._on_ticks + self._off_ticks)
+        if phase < self._on_ticks and phase % self._gen_rate == 0:
+            self._factory.generate_packages(self._path, self._batch)
+
+    def ticks_until_spawn(self):
+        """
+        Returns the number of updates until one spawns a package, or None
+        if none ever will.
+        """
+        period = self._on_ticks + self._off_ticks
+        for ticks in range(1, period + 1):
+            phase = (self._tick_count + ticks) % period
+            if phase < self._on_ticks and phase % self._gen_rate == 0:
+                return ticks
+        return None
+
+# Binary trace records: a little-endian unsigned spawn tick and count.
+TRACE_RECORD = struct.Struct("<II")
+
+def read_trace(trace_path, chunk_records=4096):
+    """
+    Lazily read (tick, count) spawn records from a trace file.
+
+    CSV traces hold one "tick" or "tick,count" row per line, where lines
+    which do not start with a number (headers, comments) are skipped. Any
+    other file is read as packed TRACE_RECORD structs.
+
+    Args:
+        trace_path: a string representing the location of the trace file.
+        chunk_records: an int representing how many binary records are read
+                       from disk at once.
+
+    Yields:
+        Tuples of ints holding a spawn tick and the packages spawned then.
+    """
+    if str(trace_path).endswith(".csv"):
+        with open(trace_path, encoding="utf-8") as trace:
+            for line in trace:
+                fields = line.strip().split(",")
+                if not fields[0].strip().isdigit():
+                    continue
+                count = int(fields[1]) if len(fields) > 1 else 1
+                yield (int(fields[0]), count)
+    else:
+        with open(trace_path, "rb") as trace:
+            while True:
+                data = trace.read(chunk_records * TRACE_RECORD.size)
+                if not data:
+                    break
+                yield from TRACE_RECORD.iter_unpack(data)
+
+class TraceGenerator(Generator):
+    """
+    A generator which replays the spawn ticks of a trace file.
+
+    The trace is streamed from disk as the game runs, so traces larger than
+    memory can be replayed. Spawn ticks must not decrease.
+
+    Attributes:
+        _records: an iterator of (tick, count) tuples read from the trace.
+        _pending: the next (tick, count) tuple to replay, or None once the
+                  trace is exhausted.
+    """
+    def __init__(self, factory, path, trace_path):
+        """
+        Open the trace and read its first record.
+
+        Args:
+            factory: a Factory instance.
+            path: a list of tuples of ints which represent the coordinates
+                  for the route a package will take.
+            trace_path: a string representing the location of the trace
+                        file, read with read_trace.
+        """
+        super().__init__(factory, 0, path)
+        self._records = read_trace(trace_path)
+        self._pending = next(self._records, None)
+
+    def update(self):
+        """
+        Increment _tick_count and generate every package the trace spawns
+        at this tick in a single batch.
+        """
+        self._tick_count += 1
+        count = 0
+        last_tick = None
+        while self._pending is not None and \
+                self._pending[0] <= self._tick_count:
+            last_tick = self._pending[0]
+            count += self._pending[1]
+            self._pending = next(self._records, None)
+        if count:
+            self._factory.generate_packages(self._path, count)
+        if self._pending is not None and last_tick is not None:
+            self._gen_rate = self._pending[0] - last_tick
+
+    def ticks_until_spawn(self):
+        """
+        Returns the number of updates until one spawns a package, or None
+        once the trace is exhausted.
+        """
+        if self._pending is None:
+            return None
+        return max(1, self._pending[0] - self._tick_count)
+
+    @property
+    def exhausted(self):
+        """
+        Returns True once every record of the trace has been replayed.
+        """
+        return self._pending is None
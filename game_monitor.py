@@ -0,0 +1,387 @@
+"""
+Logisti-Co game monitors.
+"""
+from abc import ABC, abstractmethod
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import os
+import struct
+import threading
+import time
+
+# Metrics published by TelemetryMonitor in the form (name, type, help).
+METRICS = [
+    ("logistico_packed_total", "counter",
+     "Packages packed by towers."),
+    ("logistico_failed_total", "counter",
+     "Packages which reached the end of the path."),
+    ("logistico_money", "gauge",
+     "Money available to the player."),
+    ("logistico_packages", "gauge",
+     "Packages currently on the gameboard."),
+    ("logistico_towers", "gauge",
+     "Towers currently on the gameboard."),
+    ("logistico_tick_duration_seconds", "gauge",
+     "Seconds spent updating and drawing the last tick."),
+    ("logistico_spawn_interval_ticks", "gauge",
+     "Game ticks needed by the generator to spawn a package."),
+    ("logistico_quality_level", "gauge",
+     "Quality level of the frame governor, 0 being full quality."),
+    ("logistico_gc_pause_seconds", "gauge",
+     "Seconds garbage collections paused the last tick."),
+    ("logistico_gc_idle_collections_total", "counter",
+     "Full garbage collections run after frames with time to spare."),
+]
+
+# Ring buffer file layout: a header holding a magic string, the layout
+# version, the number of metrics per record, the record capacity and the
+# next slot to write, followed by fixed-size records of a timestamp and one
+# double per metric. Bump RING_VERSION whenever the layout changes in any
+# other way than adding metrics, which the metric count already tells apart.
+RING_HEADER = struct.Struct("<4sHHII")
+RING_RECORD = struct.Struct("<d" + "d" * len(METRICS))
+RING_MAGIC = b"LGCO"
+RING_VERSION = 1
+
+
+class Monitor(ABC):
+    """
+    Observe Logisti Co. game while it runs.
+
+    Attributes:
+        _gameboard: the active Factory instance.
+    """
+
+    def __init__(self, gameboard):
+        """
+        Initialize gameboard.
+
+        Args:
+            gameboard: a Factory instance.
+        """
+        self._gameboard = gameboard
+
+    @property
+    def gameboard(self):
+        """
+        Return the Factory instance being observed by this monitor.
+        """
+        return self._gameboard
+
+    @abstractmethod
+    def update(self, generator, tick_time):
+        """
+        Observe the gameboard after a game tick.
+
+        Args:
+            generator: the Generator instance feeding the gameboard.
+            tick_time: a float representing the seconds spent updating and
+                       drawing the tick.
+        """
+
+    def close(self):
+        """
+        Release anything held by the monitor once the game is over.
+        """
+
+
+class TelemetryMonitor(Monitor):
+    """
+    A monitor which samples game counters and gauges every tick and hands
+    them to exporters.
+
+    Attributes:
+        _samples: a dict mapping metric names to their latest value.
+        _exporters: a list of exporter instances which publish the samples.
+        _governor: an optional FrameGovernor instance whose quality level is
+                   sampled.
+        _gc_manager: an optional GCManager instance whose pauses are
+                     sampled.
+    """
+
+    def __init__(self, gameboard, exporters=(), governor=None, gc_manager=None):
+        """
+        Initialize samples and exporters.
+
+        Args:
+            gameboard: a Factory instance.
+            exporters: a sequence of exporters with export(samples) and
+                       close() methods.
+            governor: an optional FrameGovernor instance whose quality level
+                      is sampled.
+            gc_manager: an optional GCManager instance whose pauses are
+                        sampled, which should be updated before this
+                        monitor.
+        """
+        super().__init__(gameboard)
+        self._governor = governor
+        self._gc_manager = gc_manager
+        self._samples = {name: 0 for name, _, _ in METRICS}
+        self._exporters = list(exporters)
+        for exporter in self._exporters:
+            exporter.attach(self)
+
+    def update(self, generator, tick_time):
+        """
+        Sample the gameboard and pass the samples on to every exporter.
+
+        Args:
+            generator: the Generator instance feeding the gameboard.
+            tick_time: a float representing the seconds spent updating and
+                       drawing the tick.
+        """
+        # Build a new dict rather than mutating the old one so exporter
+        # threads always read a consistent sample.
+        self._samples = {
+            "logistico_packed_total": self._gameboard.packed,
+            "logistico_failed_total": self._gameboard.failed,
+            "logistico_money": self._gameboard.money,
+            "logistico_packages": self._gameboard.package_count,
+            "logistico_towers": len(self._gameboard.robots),
+            "logistico_tick_duration_seconds": tick_time,
+            "logistico_spawn_interval_ticks": generator.gen_rate,
+            "logistico_quality_level": 0 if self._governor is None \
+                                       else self._governor.level,
+            "logistico_gc_pause_seconds": 0 if self._gc_manager is None \
+                                          else self._gc_manager.last_pause,
+            "logistico_gc_idle_collections_total": 0 \
+                if self._gc_manager is None \
+                else self._gc_manager.idle_collections,
+        }
+        for exporter in self._exporters:
+            exporter.export(self._samples)
+
+    def close(self):
+        """
+        Close every exporter.
+        """
+        for exporter in self._exporters:
+            exporter.close()
+
+    @property
+    def samples(self):
+        """
+        Returns the dict of the latest metric samples.
+        """
+        return self._samples
+
+
+def prometheus_text(samples):
+    """
+    Format metric samples in the Prometheus text exposition format.
+
+    Args:
+        samples: a dict mapping metric names to values.
+
+    Returns:
+        A string holding the HELP, TYPE and value lines of every metric.
+    """
+    lines = []
+    for name, metric_type, help_text in METRICS:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        lines.append(f"{name} {samples.get(name, 0)}")
+    return "\n".join(lines) + "\n"
+
+
+class PrometheusExporter():
+    """
+    Publish telemetry samples on a localhost HTTP endpoint.
+
+    The endpoint is served from a daemon thread which formats the latest
+    samples only when scraped, so the game tick never waits on a client.
+
+    Attributes:
+        _telemetry: the TelemetryMonitor instance being exported.
+        _server: a ThreadingHTTPServer instance serving /metrics.
+        _thread: the Thread instance running the server.
+    """
+
+    def __init__(self, port=9464, host="127.0.0.1"):
+        """
+        Start the HTTP server.
+
+        Args:
+            port: an int representing the port to listen on, or 0 to let the
+                  operating system pick one.
+            host: a string representing the address to bind to.
+        """
+        self._telemetry = None
+        exporter = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            """
+            Answer scrapes of the /metrics path.
+            """
+            # pylint: disable=invalid-name
+            def do_GET(self):
+                """
+                Send the latest samples in Prometheus text format.
+                """
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = prometheus_text(exporter.samples).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type",
+                                 "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            # pylint: disable=redefined-builtin
+            def log_message(self, format, *args):
+                """
+                Silence the default per-request logging.
+                """
+
+        self._server = ThreadingHTTPServer((host, port), MetricsHandler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        daemon=True)
+        self._thread.start()
+
+    def attach(self, telemetry):
+        """
+        Attach the exporter to a TelemetryMonitor.
+
+        Args:
+            telemetry: a TelemetryMonitor instance.
+        """
+        self._telemetry = telemetry
+
+    def export(self, samples):
+        """
+        Nothing to do per tick, scrapes read the samples directly.
+
+        Args:
+            samples: a dict mapping metric names to values.
+        """
+
+    def close(self):
+        """
+        Stop the HTTP server.
+        """
+        self._server.shutdown()
+        self._server.server_close()
+
+    @property
+    def samples(self):
+        """
+        Returns the latest samples of the attached TelemetryMonitor.
+        """
+        if self._telemetry is None:
+            return {}
+        return self._telemetry.samples
+
+    @property
+    def port(self):
+        """
+        Returns the port the HTTP server is listening on.
+        """
+        return self._server.server_address[1]
+
+
+class RingBufferExporter():
+    """
+    Append telemetry samples to a fixed-size ring buffer file.
+
+    Attributes:
+        _file: the binary file object of the ring buffer.
+        _capacity: an int representing the number of records the file holds
+                   before the oldest ones are overwritten.
+        _interval: an int representing the number of ticks between records.
+        _next: an int representing the slot of the next record.
+        _tick: an int representing the number of samples seen so far.
+    """
+
+    def __init__(self, path, capacity=100000, interval=60):
+        """
+        Create the ring buffer file.
+
+        Args:
+            path: a string representing the location of the file.
+            capacity: an int representing the number of records to keep.
+            interval: an int representing the number of ticks between
+                      records.
+        """
+        self._file = open(path, "w+b")  # pylint: disable=consider-using-with
+        self._capacity = capacity
+        self._interval = interval
+        self._next = 0
+        self._tick = 0
+        self._file.write(RING_HEADER.pack(RING_MAGIC, RING_VERSION, \
+                                          len(METRICS), capacity, 0))
+        self._file.truncate(RING_HEADER.size + capacity * RING_RECORD.size)
+        self._file.flush()
+
+    def attach(self, telemetry):
+        """
+        Nothing to attach, records are written from export.
+
+        Args:
+            telemetry: a TelemetryMonitor instance.
+        """
+
+    def export(self, samples):
+        """
+        Write a record every _interval samples.
+
+        Args:
+            samples: a dict mapping metric names to values.
+        """
+        self._tick += 1
+        if self._tick % self._interval != 0:
+            return
+        record = RING_RECORD.pack(time.time(), \
+            *[float(samples.get(name, 0)) for name, _, _ in METRICS])
+        fileno = self._file.fileno()
+        os.pwrite(fileno, record, \
+                  RING_HEADER.size + self._next * RING_RECORD.size)
+        self._next = (self._next + 1) % self._capacity
+        os.pwrite(fileno, RING_HEADER.pack(RING_MAGIC, RING_VERSION, \
+                                           len(METRICS), self._capacity, \
+                                           self._next), 0)
+
+    def close(self):
+        """
+        Close the ring buffer file.
+        """
+        self._file.close()
+
+
+def read_ring_buffer(path):
+    """
+    Read the records of a ring buffer file in chronological order.
+
+    Args:
+        path: a string representing the location of the file.
+
+    Returns:
+        A list of dicts mapping "timestamp" and metric names to values.
+
+    Raises:
+        ValueError: if the file is not a ring buffer, or was written with a
+                    different layout version or set of metrics.
+    """
+    with open(path, "rb") as ring:
+        magic, version, metrics, capacity, next_slot = RING_HEADER.unpack( \
+            ring.read(RING_HEADER.size))
+        if magic != RING_MAGIC:
+            raise ValueError(f"{path} is not a telemetry ring buffer")
+        if version != RING_VERSION or metrics != len(METRICS):
+            raise ValueError(f"{path} holds layout version {version} with " \
+                             f"{metrics} metrics, expected version " \
+                             f"{RING_VERSION} with {len(METRICS)}")
+        data = ring.read(capacity * RING_RECORD.size)
+    records = []
+    for index in range(capacity):
+        slot = (next_slot + index) % capacity
+        values = RING_RECORD.unpack_from(data, slot * RING_RECORD.size)
+        # Slots that were never written are all zero.
+        if values[0] == 0:
+            continue
+        record = {"timestamp": values[0]}
+        for (name, _, _), value in zip(METRICS, values[1:]):
+            record[name] = value
+        records.append(record)
+    return records
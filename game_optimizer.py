@@ -0,0 +1,339 @@
+"""
+Logisti-Co tower layout optimizer.
+"""
+from concurrent.futures import ProcessPoolExecutor
+import random
+import numpy as np
+import game_model as gm
+from game_cache import ResultCache, cache_key
+
+
+def path_samples(path):
+    """
+    Sample a path at every pixel of arc length, which is where a package is
+    found at every game tick.
+
+    Args:
+        path: a list of tuples of ints which represent waypoints.
+
+    Returns:
+        A float array of shape (samples, 2) holding the sampled points.
+    """
+    points = [np.array([path[0]], np.float64)]
+    for start, end in zip(path, path[1:]):
+        start = np.array(start, np.float64)
+        end = np.array(end, np.float64)
+        length = int(np.ceil(np.hypot(*(end - start))))
+        if length == 0:
+            continue
+        steps = np.arange(1, length + 1)[:, None] / length
+        points.append(start + steps * (end - start))
+    return np.concatenate(points)
+
+
+def spawn_interval(gen_rate, proportion):
+    """
+    Returns the interval in ticks an ExponentialGenerator settles on.
+
+    Args:
+        gen_rate: an int representing the initial ticks between packages.
+        proportion: a float representing the factor of exponential decay.
+    """
+    while gen_rate >= 30 and proportion < 1:
+        gen_rate *= proportion
+    return gen_rate
+
+
+# pylint: disable=too-many-arguments
+def layout_inputs(path, layout, rate, radius, profile, ticks):
+    """
+    Returns a dict of every input of a layout simulation, to key a
+    ResultCache with.
+
+    Args:
+        path: a list of tuples of ints which represent waypoints.
+        layout: a list of tuples of ints representing tower locations.
+        rate: an int representing the rate of every tower.
+        radius: an int representing the radius of every tower.
+        profile: a tuple of the gen_rate and proportion of the
+                 ExponentialGenerator feeding the gameboard.
+        ticks: an int representing the most game ticks to simulate.
+    """
+    # Layout order decides tower slots, so it is kept.
+    return {"engine": "simulate_layout", "path": path, "layout": layout, \
+            "rate": rate, "radius": radius, "profile": profile, \
+            "ticks": ticks}
+
+
+# pylint: disable=too-many-arguments
+def simulate_layout(path, layout, rate, radius, profile, ticks, cache_dir=None):
+    """
+    Simulate a tower layout headless.
+
+    Args:
+        path: a list of tuples of ints which represent waypoints.
+        layout: a list of tuples of ints representing tower locations.
+        rate: an int representing the rate of every tower.
+        radius: an int representing the radius of every tower.
+        profile: a tuple of the gen_rate and proportion of the
+                 ExponentialGenerator feeding the gameboard.
+        ticks: an int representing the most game ticks to simulate.
+        cache_dir: a string representing the directory of a ResultCache to
+                   reuse earlier outcomes from, or None.
+
+    Returns:
+        A tuple of ints holding the ticks survived, packed and failed counts.
+    """
+    def run():
+        factory = gm.Factory(gm.TOWER_COST * len(layout), path)
+        for location in layout:
+            factory.generate_tower(location[0], location[1], rate, radius)
+        generator = gm.ExponentialGenerator(factory, profile[0], path, \
+                                            profile[1])
+        survived = factory.simulate(generator, ticks)
+        return (survived, factory.packed, factory.failed)
+
+    if cache_dir is None:
+        return run()
+    return tuple(ResultCache(cache_dir).get_or_compute( \
+        layout_inputs(path, layout, rate, radius, profile, ticks), run))
+
+
+class LayoutOptimizer():
+    """
+    Propose tower layouts for a path from the coverage every candidate
+    position has of the path.
+
+    Layouts are scored with a flow model: packages arrive at 1/interval per
+    tick, and every tower, in the order packages reach it, packs up to one
+    package per rate ticks, scaled down when packages are rarely in range.
+
+    Attributes:
+        _path: a list of tuples of ints which represent waypoints.
+        _rate: an int representing the rate of every tower.
+        _radius: an int representing the radius of every tower.
+        _profile: a tuple of the gen_rate and proportion of the
+                  ExponentialGenerator feeding the gameboard.
+        _candidates: an int array of shape (candidates, 2) of the positions a
+                     tower may be placed at.
+        _coverage: a bool array of shape (candidates, samples) telling which
+                   path samples each candidate covers.
+        _start: an int array of the first path sample each candidate covers.
+        _catch: a float array of the packages per tick each candidate packs
+                with the whole flow still ahead of it.
+        _flow: a float representing the arriving packages per tick.
+        _cache_dir: a string representing the directory of a ResultCache of
+                    simulated layouts, or None.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, path, rate, radius, profile, size=(800, 600), step=20,
+                 cache_dir=None):
+        """
+        Precompute the coverage of every candidate position.
+
+        Args:
+            path: a list of tuples of ints which represent waypoints.
+            rate: an int representing the rate of every tower.
+            radius: an int representing the radius of every tower.
+            profile: a tuple of the gen_rate and proportion of the
+                     ExponentialGenerator feeding the gameboard.
+            size: a tuple of ints of the width and height of the board.
+            step: an int representing the pixels between candidate positions.
+            cache_dir: a string representing the directory of a ResultCache
+                       of simulated layouts, or None.
+        """
+        self._path = path
+        self._cache_dir = cache_dir
+        self._rate = rate
+        self._radius = radius
+        self._profile = profile
+        x_grid, y_grid = np.meshgrid(np.arange(step // 2, size[0], step), \
+                                     np.arange(step // 2, size[1], step))
+        self._candidates = np.stack((x_grid.ravel(), y_grid.ravel()), axis=1)
+        samples = path_samples(path)
+        offsets = self._candidates[:, None, :] - samples[None, :, :]
+        self._coverage = (offsets ** 2).sum(axis=2) <= radius ** 2
+        self._start = np.where(self._coverage.any(axis=1), \
+                               self._coverage.argmax(axis=1), len(samples))
+        self._flow = 1 / spawn_interval(*profile)
+        dwell = self._coverage.sum(axis=1)
+        # A tower packs at most one package every (rate - 1) ticks, and only
+        # has a target for the share of time a package is in range.
+        self._catch = np.minimum(1, dwell * self._flow) / max(rate - 1, 1)
+
+    def scores(self, layout):
+        """
+        Score every candidate as an addition to a layout.
+
+        Args:
+            layout: a list of candidate indices already placed.
+
+        Returns:
+            A float array of the fraction of packages packed by the layout
+            with each candidate added, or -1 for candidates already placed,
+            as towers are not stacked.
+        """
+        remaining = np.full(len(self._candidates), self._flow)
+        applied = np.zeros(len(self._candidates), bool)
+        for index in sorted(layout, key=lambda index: self._start[index]):
+            # Candidates reached before this tower take their share first.
+            ahead = ~applied & (self._start < self._start[index])
+            remaining -= np.where(ahead, \
+                                  np.minimum(remaining, self._catch), 0)
+            applied |= ahead
+            remaining -= np.minimum(remaining, self._catch[index])
+        remaining -= np.where(~applied, np.minimum(remaining, self._catch), 0)
+        scores = 1 - remaining / self._flow
+        scores[list(layout)] = -1
+        return scores
+
+    def score(self, layout):
+        """
+        Returns the fraction of packages a layout is expected to pack.
+
+        Args:
+            layout: a non-empty list of candidate indices.
+        """
+        return float(self.scores(layout[:-1])[layout[-1]])
+
+    def greedy(self, count, rng=None, choices=1):
+        """
+        Build a layout by repeatedly adding the best scoring candidate.
+
+        Args:
+            count: an int representing the number of towers to place.
+            rng: an optional Random instance picking among the best choices
+                 candidates, to diversify restarts.
+            choices: an int representing how many of the best candidates rng
+                     picks from.
+
+        Returns:
+            A list of candidate indices.
+        """
+        layout = []
+        for _ in range(count):
+            scores = self.scores(layout)
+            if rng is None or choices == 1:
+                layout.append(int(scores.argmax()))
+            else:
+                best = np.argpartition(-scores, choices)[:choices]
+                layout.append(int(rng.choice(best)))
+        return layout
+
+    def local_search(self, layout, rounds=10):
+        """
+        Improve a layout by moving one tower at a time to the candidate which
+        scores best in its place.
+
+        Args:
+            layout: a list of candidate indices.
+            rounds: an int representing the most passes over the layout.
+
+        Returns:
+            A tuple of the improved list of candidate indices and its score.
+        """
+        layout = list(layout)
+        best = self.score(layout) if layout else 0.0
+        for _ in range(rounds):
+            improved = False
+            for position in range(len(layout)):
+                rest = layout[:position] + layout[position + 1:]
+                scores = self.scores(rest)
+                candidate = int(scores.argmax())
+                if scores[candidate] > best + 1e-12:
+                    layout = rest[:position] + [candidate] + rest[position:]
+                    best = float(scores[candidate])
+                    improved = True
+            if not improved:
+                break
+        return (layout, best)
+
+    def locations(self, layout):
+        """
+        Returns a list of tuples of ints of the positions of a layout.
+
+        Args:
+            layout: a list of candidate indices.
+        """
+        return [tuple(int(value) for value in self._candidates[index]) \
+                for index in layout]
+
+    # pylint: disable=too-many-arguments
+    def propose(self, budget, restarts=4, finalists=3, ticks=6000, seed=0,
+                workers=None):
+        """
+        Propose the best tower layout for a budget.
+
+        Greedy and randomized greedy layouts are refined by local search, and
+        the best scoring finalists are confirmed by headless simulations run
+        in parallel processes, unless their outcome is already cached.
+
+        Args:
+            budget: an int representing the money available for towers.
+            restarts: an int representing the number of randomized greedy
+                      layouts tried besides the plain greedy one.
+            finalists: an int representing the number of layouts simulated.
+            ticks: an int representing the most game ticks simulated.
+            seed: an int seeding the randomized restarts.
+            workers: an int representing the number of simulation processes,
+                     or None for one per core.
+
+        Returns:
+            A tuple of the best list of tower locations and its simulated
+            (survived, packed, failed) tuple.
+        """
+        count = budget // gm.TOWER_COST
+        if count == 0:
+            return ([], simulate_layout(self._path, [], self._rate, \
+                                        self._radius, self._profile, ticks, \
+                                        self._cache_dir))
+        rng = random.Random(seed)
+        found = {}
+        for restart in range(restarts + 1):
+            start = self.greedy(count, rng, 1 if restart == 0 else 3)
+            layout, score = self.local_search(start)
+            found[tuple(sorted(layout))] = score
+        ranked = sorted(found, key=found.get, reverse=True)[:finalists]
+        layouts = [self.locations(layout) for layout in ranked]
+        results = [None] * len(layouts)
+        if self._cache_dir is not None:
+            # Only layouts missing from the cache are simulated again.
+            cache = ResultCache(self._cache_dir)
+            for index, layout in enumerate(layouts):
+                cached = cache.get(cache_key(layout_inputs(self._path, \
+                    layout, self._rate, self._radius, self._profile, ticks)))
+                if cached is not None:
+                    results[index] = tuple(cached)
+        missing = [index for index, result in enumerate(results) \
+                   if result is None]
+        if missing:
+            with ProcessPoolExecutor(workers) as executor:
+                simulated = executor.map(simulate_layout, \
+                    [self._path] * len(missing), \
+                    [layouts[index] for index in missing], \
+                    [self._rate] * len(missing), \
+                    [self._radius] * len(missing), \
+                    [self._profile] * len(missing), [ticks] * len(missing), \
+                    [self._cache_dir] * len(missing))
+                for index, result in zip(missing, simulated):
+                    results[index] = result
+        # Prefer the layout surviving longest, then the one packing most.
+        best = max(range(len(layouts)), \
+                   key=lambda index: (results[index][0], results[index][1], \
+                                      -results[index][2]))
+        return (layouts[best], results[best])
+
+    @property
+    def candidates(self):
+        """
+        Returns the int array of candidate positions.
+        """
+        return self._candidates
+
+    @property
+    def coverage(self):
+        """
+        Returns the bool array of the path samples each candidate covers.
+        """
+        return self._coverage
@@ -0,0 +1,340 @@
+"""
+Logisti-Co tower placement preview.
+"""
+import collections
+import threading
+import numpy as np
+import pygame
+from game_monitor import Monitor
+from game_optimizer import path_samples
+from game_view import VisualText
+
+# Colors of the preview: the range of the tower, the path only it would
+# cover and the path other towers already cover.
+RANGE_COLOR = (255, 255, 255, 50)
+COVERED_COLOR = (90, 230, 90, 255)
+OVERLAP_COLOR = (240, 160, 40, 255)
+
+# The coverage of a tower placed at the center of a grid cell.
+#     key: the (column, row, radius, towers) tuple the coverage was computed
+#          for.
+#     center: a tuple of ints of the board position of the tower.
+#     covered: an int representing the path pixels in range of the tower.
+#     overlap: an int representing the covered path pixels other towers
+#              already reach.
+#     surface: a Surface of the range and covered path, drawn centered on
+#              the tower.
+Coverage = collections.namedtuple("Coverage", \
+    ["key", "center", "covered", "overlap", "surface"])
+
+
+class PlacementPreview(Monitor):
+    """
+    A monitor which previews what a tower placed at the cursor would cover,
+    computed on a worker thread.
+
+    Every tick the cell under the cursor is handed to the worker, which
+    computes the path pixels a tower there would reach and how many of them
+    other towers reach already. Results are memoized per cell, radius and
+    set of towers, and path masks per tower position and radius, so moving
+    over cells seen before costs nothing. The view draws the latest finished
+    preview and never waits for the worker.
+
+    With a Camera, the cursor is mapped to the board through it and the
+    preview is scaled and placed on the screen the same way, cropped to the
+    viewport. Only boards whose packages follow the fixed path can be
+    previewed, as packages on a flow field route around the towers.
+
+    Attributes:
+        _radius: an int representing the radius of the tower placed.
+        _rate: an int representing the rate of the tower placed.
+        _cell: an int representing the width and height of a cell in pixels.
+        _capacity: an int representing the most results and masks memoized.
+        _camera: the Camera instance the board is shown through, or None.
+        _scaled: a tuple of the Coverage tuple and zoom the preview surface
+                 was last scaled for and the scaled Surface, or None.
+        _samples: a float array of shape (samples, 2) of the path at every
+                  pixel of arc length.
+        _masks: an OrderedDict mapping (x_pos, y_pos, radius) tuples to bool
+                arrays of the path samples in range, least recently used
+                first.
+        _results: an OrderedDict mapping keys to Coverage tuples, least
+                  recently used first.
+        _flow: a float representing the packages arriving per tick.
+        _target: the key of the cell under the cursor, or None when it is
+                 off the board.
+        _wanted: the key the worker should compute next, or None.
+        _busy: a bool telling whether the worker is computing a preview.
+        _latest: the latest finished Coverage tuple, or None.
+        _shown: the Coverage tuple and flow _text was rendered for.
+        _computed: an int counting the results computed rather than found.
+        _running: a bool telling whether the worker should keep running.
+        _condition: a threading Condition guarding _target, _wanted, _busy
+                    and _latest.
+        _thread: the worker Thread instance.
+        _text: a VisualText showing the coverage estimate.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, gameboard, radius=100, rate=300, cell=20,
+                 capacity=4096, camera=None):
+        """
+        Sample the path and start the worker thread.
+
+        Args:
+            gameboard: a Factory instance.
+            radius: an int representing the radius of the tower placed.
+            rate: an int representing the rate of the tower placed.
+            cell: an int representing the width and height of a cell in
+                  pixels.
+            capacity: an int representing the most results and masks
+                      memoized.
+            camera: a Camera instance the board is shown through, or None
+                    when the board is drawn at the top left of the screen.
+
+        Raises:
+            ValueError: if packages on the gameboard follow a flow field.
+        """
+        super().__init__(gameboard)
+        if gameboard.flow_field is not None:
+            raise ValueError("PlacementPreview needs packages to follow " \
+                             "the fixed path, not a flow field")
+        self._radius = radius
+        self._rate = rate
+        self._cell = cell
+        self._capacity = capacity
+        self._camera = camera
+        self._scaled = None
+        self._samples = path_samples(gameboard.path)
+        self._masks = collections.OrderedDict()
+        self._results = collections.OrderedDict()
+        self._flow = 0.0
+        self._target = None
+        self._wanted = None
+        self._busy = False
+        self._latest = None
+        self._shown = None
+        self._computed = 0
+        self._running = True
+        self._condition = threading.Condition()
+        self._text = VisualText("", (850, 170), 20)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def update(self, generator, tick_time):
+        """
+        Ask for the preview of the cell under the cursor.
+
+        Args:
+            generator: the Generator instance feeding the gameboard.
+            tick_time: a float representing the seconds spent updating and
+                       drawing the tick.
+        """
+        self._flow = 1 / max(generator.gen_rate, 1)
+        self.request(self.board_pos(pygame.mouse.get_pos()))
+
+    def board_pos(self, mouse_pos):
+        """
+        Returns a tuple of ints of the board position under the cursor, or
+        None when the cursor is outside of the camera viewport.
+
+        Args:
+            mouse_pos: a tuple of ints of the screen position of the cursor.
+        """
+        if self._camera is None:
+            return mouse_pos
+        if not self._camera.viewport.collidepoint(mouse_pos):
+            return None
+        return self._camera.to_world(mouse_pos)
+
+    def request(self, pos):
+        """
+        Ask the worker for the preview of the cell at a board position,
+        replacing any request it has not started yet.
+
+        Args:
+            pos: a tuple of ints of the board position, or None to clear the
+                 preview.
+        """
+        width, height = self._gameboard.size
+        key = None
+        if pos is not None and 0 <= pos[0] < width and 0 <= pos[1] < height:
+            towers = tuple((tower.location[0], tower.location[1], \
+                            tower.radius) for tower in self._gameboard.robots)
+            key = (pos[0] // self._cell, pos[1] // self._cell, self._radius, \
+                   towers)
+        with self._condition:
+            if key == self._target:
+                return
+            self._target = key
+            self._wanted = key
+            if key is None:
+                self._latest = None
+            else:
+                self._condition.notify_all()
+
+    def _run(self):
+        """
+        Compute requested previews until closed.
+        """
+        while True:
+            with self._condition:
+                while self._running and self._wanted is None:
+                    self._condition.wait()
+                if not self._running:
+                    return
+                key = self._wanted
+                self._wanted = None
+                self._busy = True
+            coverage = self.coverage(key)
+            with self._condition:
+                # A cursor which left the board since shows no preview.
+                if self._target is not None:
+                    self._latest = coverage
+                self._busy = False
+                self._condition.notify_all()
+
+    def mask(self, x_pos, y_pos, radius):
+        """
+        Returns a bool array of the path samples in range of a position.
+
+        Args:
+            x_pos: a number representing the x-axis position in pixels.
+            y_pos: a number representing the y-axis position in pixels.
+            radius: a number representing the range in pixels.
+        """
+        key = (x_pos, y_pos, radius)
+        mask = self._masks.get(key)
+        if mask is None:
+            offsets = self._samples - np.array([x_pos, y_pos], np.float64)
+            mask = (offsets ** 2).sum(axis=1) <= radius ** 2
+            self._masks[key] = mask
+            if len(self._masks) > self._capacity:
+                self._masks.popitem(last=False)
+        else:
+            self._masks.move_to_end(key)
+        return mask
+
+    def coverage(self, key):
+        """
+        Returns the Coverage tuple of a key, computing it if not memoized.
+
+        Args:
+            key: a (column, row, radius, towers) tuple, towers being a tuple
+                 of (x_pos, y_pos, radius) tuples of every tower.
+        """
+        found = self._results.get(key)
+        if found is not None:
+            self._results.move_to_end(key)
+            return found
+        column, row, radius, towers = key
+        center = (column * self._cell + self._cell // 2, \
+                  row * self._cell + self._cell // 2)
+        mask = self.mask(center[0], center[1], radius)
+        others = np.zeros(len(self._samples), bool)
+        for x_pos, y_pos, tower_radius in towers:
+            others |= self.mask(x_pos, y_pos, tower_radius)
+        overlap = mask & others
+        surface = pygame.Surface((2 * radius + 1, 2 * radius + 1), \
+                                 pygame.SRCALPHA)
+        pygame.draw.circle(surface, RANGE_COLOR, (radius, radius), radius)
+        origin = np.array(center) - radius
+        for color, chosen in ((COVERED_COLOR, mask & ~others), \
+                              (OVERLAP_COLOR, overlap)):
+            for x_pos, y_pos in (self._samples[chosen] - origin).astype(int):
+                surface.fill(color, (x_pos - 1, y_pos - 1, 3, 3))
+        found = Coverage(key, center, int(mask.sum()), int(overlap.sum()), \
+                         surface)
+        self._results[key] = found
+        if len(self._results) > self._capacity:
+            self._results.popitem(last=False)
+        self._computed += 1
+        return found
+
+    def per_minute(self, coverage):
+        """
+        Returns a float estimating the packages per minute a tower with a
+        coverage would pack at the current flow.
+
+        Packages on path other towers already reach are left to them, and a
+        tower packs at most one package every rate ticks, only while a
+        package is in range.
+
+        Args:
+            coverage: a Coverage tuple.
+        """
+        fresh = coverage.covered - coverage.overlap
+        catch = min(1, fresh * self._flow) / max(self._rate - 1, 1)
+        return 3600 * min(catch, self._flow)
+
+    def blits(self):
+        """
+        Returns a list of (surface, position) tuples of the latest finished
+        preview, or an empty list when there is none.
+        """
+        latest = self._latest
+        if latest is None:
+            return []
+        if self._shown != (latest, self._flow):
+            share = 0 if latest.covered == 0 \
+                    else 100 * latest.overlap // latest.covered
+            self._text.update(f"Covers {latest.covered}px, {share}% " \
+                              f"shared, {self.per_minute(latest):.1f}/min")
+            self._shown = (latest, self._flow)
+        radius = latest.key[2]
+        corner = (latest.center[0] - radius, latest.center[1] - radius)
+        text = (self._text.text, self._text.location)
+        camera = self._camera
+        if camera is None:
+            return [(latest.surface, corner), text]
+        if self._scaled is None or \
+                self._scaled[:2] != (latest, camera.zoom):
+            size = (max(1, camera.scale(latest.surface.get_width())), \
+                    max(1, camera.scale(latest.surface.get_height())))
+            self._scaled = (latest, camera.zoom, \
+                            pygame.transform.scale(latest.surface, size))
+        surface = self._scaled[2]
+        rect = surface.get_rect(topleft=camera.to_screen(corner))
+        shown = rect.clip(camera.viewport)
+        if not shown.width or not shown.height:
+            return [text]
+        return [(surface.subsurface(shown.move(-rect.x, -rect.y)), \
+                 shown.topleft), text]
+
+    def wait(self, timeout=None):
+        """
+        Wait for the worker to finish the latest request.
+
+        Args:
+            timeout: a float representing the most seconds to wait, or None.
+
+        Returns:
+            The latest Coverage tuple, or None.
+        """
+        with self._condition:
+            self._condition.wait_for( \
+                lambda: self._wanted is None and not self._busy, timeout)
+            return self._latest
+
+    def close(self):
+        """
+        Stop the worker thread.
+        """
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        self._thread.join()
+
+    @property
+    def latest(self):
+        """
+        Returns the latest finished Coverage tuple, or None.
+        """
+        return self._latest
+
+    @property
+    def computed(self):
+        """
+        Returns the number of previews computed rather than memoized.
+        """
+        return self._computed
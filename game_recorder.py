@@ -0,0 +1,210 @@
+"""
+Logisti-Co game statistics recorder.
+"""
+from array import array
+import numpy as np
+from game_monitor import Monitor
+
+# Statistics recorded every tick.
+FIELDS = ["money", "packed", "failed", "packages", "spawn_interval"]
+
+
+class StatsRecorder(Monitor):
+    """
+    A monitor which records game statistics every tick into preallocated
+    typed arrays.
+
+    Recent ticks are kept at full resolution. Whenever the raw arrays fill
+    up, their older half is downsampled into buckets holding the min, max
+    and mean of every statistic. Whenever the buckets fill up, neighbouring
+    buckets are merged, so older data keeps an ever coarser resolution in a
+    fixed amount of memory.
+
+    Attributes:
+        _capacity: an int representing the number of raw ticks kept.
+        _raw: a list of array("d") instances, one per field.
+        _size: an int representing the number of raw ticks recorded.
+        _first_tick: an int representing the tick of the first raw sample.
+        _bucket: an int representing the ticks per bucket.
+        _bucket_capacity: an int representing the number of buckets kept.
+        _buckets: a float array of shape (buckets, fields, 3) holding the min,
+                  max and mean of every field in every bucket.
+        _bucket_ticks: an int array of the first tick of every bucket.
+        _bucket_counts: an int array of the ticks in every bucket.
+        _bucket_size: an int representing the number of buckets in use.
+        _dump_path: an optional string representing where the recording is
+                    written when the game ends.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, gameboard, capacity=8192, bucket=32,
+                 bucket_capacity=4096, dump_path=None):
+        """
+        Preallocate the raw and bucket arrays.
+
+        Args:
+            gameboard: a Factory instance.
+            capacity: a power of two representing the number of raw ticks
+                      kept.
+            bucket: a power of two representing the ticks per bucket.
+            bucket_capacity: an int of at least 2 representing the number of
+                             buckets kept.
+            dump_path: an optional string representing where the recording
+                       is written when the game ends.
+
+        Raises:
+            ValueError: if bucket_capacity is less than 2.
+        """
+        super().__init__(gameboard)
+        if bucket_capacity < 2:
+            raise ValueError("bucket_capacity must be at least 2")
+        self._dump_path = dump_path
+        self._capacity = capacity
+        self._raw = [array("d", bytes(8 * capacity)) for _ in FIELDS]
+        self._size = 0
+        self._first_tick = 0
+        self._bucket = bucket
+        self._bucket_capacity = bucket_capacity
+        self._buckets = np.zeros((bucket_capacity, len(FIELDS), 3))
+        self._bucket_ticks = np.zeros(bucket_capacity, np.int64)
+        self._bucket_counts = np.zeros(bucket_capacity, np.int64)
+        self._bucket_size = 0
+
+    def update(self, generator, tick_time):
+        """
+        Record the statistics of the tick.
+
+        Args:
+            generator: the Generator instance feeding the gameboard.
+            tick_time: a float representing the seconds spent updating and
+                       drawing the tick.
+        """
+        gameboard = self._gameboard
+        self.record(gameboard.money, gameboard.packed, gameboard.failed, \
+                    gameboard.package_count, generator.gen_rate)
+
+    def close(self):
+        """
+        Write the recording to _dump_path, if given.
+        """
+        if self._dump_path is not None:
+            self.dump(self._dump_path)
+
+    # pylint: disable=too-many-arguments
+    def record(self, money, packed, failed, packages, spawn_interval):
+        """
+        Record a tick of statistics.
+
+        Args:
+            money: an int representing the money available to the player.
+            packed: an int representing the packages packed so far.
+            failed: an int representing the packages failed so far.
+            packages: an int representing the live packages.
+            spawn_interval: a float representing the ticks between spawns.
+        """
+        index = self._size
+        if index == self._capacity:
+            self._downsample()
+            index = self._size
+        raw = self._raw
+        raw[0][index] = money
+        raw[1][index] = packed
+        raw[2][index] = failed
+        raw[3][index] = packages
+        raw[4][index] = spawn_interval
+        self._size = index + 1
+
+    def _downsample(self):
+        """
+        Move the older half of the raw ticks into buckets.
+        """
+        half = self._capacity // 2
+        # Every merge halves the buckets in use and the buckets the raw ticks
+        # take up, so merge until both fit. Once buckets are coarser than
+        # half the raw ticks, each downsample adds a single bucket.
+        while self._bucket_size + half // min(self._bucket, half) > \
+                self._bucket_capacity:
+            self._merge_buckets()
+        width = min(self._bucket, half)
+        count = half // width
+        span = slice(self._bucket_size, self._bucket_size + count)
+        for field, raw in enumerate(self._raw):
+            values = np.frombuffer(raw, np.float64)
+            older = values[:half].reshape(count, width)
+            self._buckets[span, field, 0] = older.min(axis=1)
+            self._buckets[span, field, 1] = older.max(axis=1)
+            self._buckets[span, field, 2] = older.mean(axis=1)
+            values[:half] = values[half:]
+        self._bucket_ticks[span] = self._first_tick + np.arange(count) * width
+        self._bucket_counts[span] = width
+        self._bucket_size += count
+        self._first_tick += half
+        self._size -= half
+
+    def _merge_buckets(self):
+        """
+        Halve the resolution of the buckets by merging neighbouring pairs.
+        """
+        pairs = self._bucket_size // 2
+        even = self._buckets[0:2 * pairs:2]
+        odd = self._buckets[1:2 * pairs:2]
+        even_counts = self._bucket_counts[0:2 * pairs:2, None]
+        odd_counts = self._bucket_counts[1:2 * pairs:2, None]
+        merged = np.empty_like(even)
+        merged[:, :, 0] = np.minimum(even[:, :, 0], odd[:, :, 0])
+        merged[:, :, 1] = np.maximum(even[:, :, 1], odd[:, :, 1])
+        merged[:, :, 2] = (even[:, :, 2] * even_counts + \
+                           odd[:, :, 2] * odd_counts) / \
+                          (even_counts + odd_counts)
+        self._buckets[:pairs] = merged
+        self._bucket_ticks[:pairs] = self._bucket_ticks[0:2 * pairs:2]
+        self._bucket_counts[:pairs] = even_counts[:, 0] + odd_counts[:, 0]
+        # An odd bucket out is kept as it is.
+        if self._bucket_size % 2:
+            last = self._bucket_size - 1
+            self._buckets[pairs] = self._buckets[last]
+            self._bucket_ticks[pairs] = self._bucket_ticks[last]
+            self._bucket_counts[pairs] = self._bucket_counts[last]
+            pairs += 1
+        self._bucket_size = pairs
+        self._bucket *= 2
+
+    def raw(self):
+        """
+        Returns a tuple of the int array of the raw ticks and a dict mapping
+        field names to float arrays of their raw values.
+        """
+        ticks = self._first_tick + np.arange(self._size)
+        return (ticks, {name: np.frombuffer(raw, np.float64) \
+                              [:self._size].copy() \
+                        for name, raw in zip(FIELDS, self._raw)})
+
+    def buckets(self):
+        """
+        Returns a tuple of the int array of the first tick of every bucket
+        and a float array of shape (buckets, fields, 3) of their min, max and
+        mean.
+        """
+        return (self._bucket_ticks[:self._bucket_size].copy(), \
+                self._buckets[:self._bucket_size].copy())
+
+    def dump(self, path):
+        """
+        Write the recording to a compressed NPZ file.
+
+        Args:
+            path: a string representing the location of the file.
+        """
+        ticks, values = self.raw()
+        bucket_ticks, buckets = self.buckets()
+        np.savez_compressed(path, fields=np.array(FIELDS), ticks=ticks, \
+            raw=np.stack([values[name] for name in FIELDS]), \
+            bucket_ticks=bucket_ticks, buckets=buckets, \
+            bucket_counts=self._bucket_counts[:self._bucket_size])
+
+    @property
+    def bucket(self):
+        """
+        Returns the number of ticks per bucket.
+        """
+        return self._bucket
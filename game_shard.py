@@ -0,0 +1,534 @@
+"""
+Logisti-Co sharded multi-process engine.
+"""
+import math
+import multiprocessing
+from multiprocessing import shared_memory
+import numpy as np
+import pygame
+import game_model as gm
+
+# Commands written to the control array for the workers.
+STOP = 0
+TICK = 1
+
+
+def path_length(path):
+    """
+    Returns the arc length of a path in pixels.
+
+    Args:
+        path: a list of tuples of ints which represent waypoints.
+    """
+    return sum(math.dist(start, end) for start, end in zip(path, path[1:]))
+
+
+class SharedArrays():
+    """
+    A set of NumPy arrays living in shared memory blocks, so every process
+    attaching to them sees the same data.
+
+    Attributes:
+        _specs: a dict mapping array names to (block name, shape, dtype str)
+                tuples.
+        _blocks: a list of the SharedMemory instances holding the arrays.
+        _owner: a bool telling whether the blocks were created here, and are
+                to be unlinked when closed.
+        arrays: a dict mapping array names to the NumPy arrays.
+    """
+
+    def __init__(self, layout=None, specs=None):
+        """
+        Create new blocks for a layout, or attach to existing blocks.
+
+        Args:
+            layout: a dict mapping array names to (shape, dtype) tuples of
+                    arrays to create zeroed, or None.
+            specs: the specs of an existing SharedArrays instance to attach
+                   to, or None.
+        """
+        self._owner = specs is None
+        self._blocks = []
+        self._specs = {}
+        self.arrays = {}
+        if self._owner:
+            for name, (shape, dtype) in layout.items():
+                dtype = np.dtype(dtype)
+                size = max(1, int(np.prod(shape)) * dtype.itemsize)
+                block = shared_memory.SharedMemory(create=True, size=size)
+                self._specs[name] = (block.name, shape, dtype.str)
+                self._attach(name, block)
+                self.arrays[name][...] = 0
+        else:
+            for name, spec in specs.items():
+                self._specs[name] = spec
+                self._attach(name, shared_memory.SharedMemory(name=spec[0]))
+
+    def _attach(self, name, block):
+        """
+        Wrap a block in a NumPy array.
+
+        Args:
+            name: a string representing the name of the array.
+            block: the SharedMemory instance holding the array.
+        """
+        self._blocks.append(block)
+        _, shape, dtype = self._specs[name]
+        self.arrays[name] = np.ndarray(shape, dtype, buffer=block.buf)
+
+    def close(self):
+        """
+        Detach from the blocks, and free them if they were created here.
+        """
+        self.arrays = {}
+        for block in self._blocks:
+            block.close()
+            if self._owner:
+                block.unlink()
+        self._blocks = []
+
+    @property
+    def specs(self):
+        """
+        Returns the dict of specs other processes attach with.
+        """
+        return self._specs
+
+
+def move_packages(arrays, path, block):
+    """
+    Move the live packages of a block of slots one tick along the path,
+    exactly as Package.move does.
+
+    Args:
+        arrays: the dict of shared package arrays.
+        path: an int array of shape (waypoints, 2) of the path in fixed
+              point.
+        block: a slice of the package slots to move.
+
+    Returns:
+        An int representing the packages which reached the end of the path.
+    """
+    alive = arrays["alive"][block].astype(bool)
+    x_pos = arrays["x"][block]
+    y_pos = arrays["y"][block]
+    waypoint = arrays["waypoint"][block]
+    arrays["traveled"][block] += 1
+    # Move onto the next waypoint if exactly on it. Packages which ended
+    # keep a waypoint past the path.
+    target = path[np.minimum(waypoint, len(path) - 1)]
+    reached = alive & (x_pos == target[:, 0]) & (y_pos == target[:, 1])
+    waypoint += reached
+    ended = alive & (waypoint == len(path))
+    alive &= ~ended
+    arrays["alive"][block] = alive
+    target = path[np.minimum(waypoint, len(path) - 1)]
+    x_change = target[:, 0] - x_pos
+    y_change = target[:, 1] - y_pos
+    squared = x_change*x_change + y_change*y_change
+    near = alive & (squared <= gm.FIXED_ONE * gm.FIXED_ONE)
+    x_pos[near] = target[near, 0]
+    y_pos[near] = target[near, 1]
+    far = alive & ~near
+    distance = gm.isqrt_array(squared[far])
+    # NumPy floor division of int64 rounds as Python's does.
+    x_pos[far] += (x_change[far] << gm.FIXED_SHIFT) // distance
+    y_pos[far] += (y_change[far] << gm.FIXED_SHIFT) // distance
+    return int(ended.sum())
+
+
+def nearest_packages(arrays, block, towers, limit):
+    """
+    Find the closest live packages of a block within range of every tower,
+    exactly as Factory.closest_to measures them.
+
+    Args:
+        arrays: the dict of shared package arrays.
+        block: a slice of the package slots to search.
+        towers: an int array of shape (towers, 3) of the x, y and radius of
+                the towers in fixed point.
+        limit: an int representing the most packages kept per tower.
+
+    Returns:
+        A list with a tuple of an int array of slots and an int array of
+        squared fixed point distances per tower, closest first, slots
+        breaking ties.
+    """
+    slots = np.flatnonzero(arrays["alive"][block]) + block.start
+    x_pos = arrays["x"][slots]
+    y_pos = arrays["y"][slots]
+    found = []
+    for tower_x, tower_y, radius in towers:
+        x_change = x_pos - tower_x
+        y_change = y_pos - tower_y
+        distance = x_change*x_change + y_change*y_change
+        in_range = np.flatnonzero(distance <= radius * radius)
+        order = np.argsort(distance[in_range], kind="stable")[:limit]
+        found.append((slots[in_range[order]], distance[in_range[order]]))
+    return found
+
+
+def shard_blocks(traveled, bounds):
+    """
+    Returns an int array of the first package slot owned by every shard,
+    followed by the slots in use.
+
+    Packages live in slots in the order they were spawned and all move one
+    pixel per tick, so the slots whose traveled distance falls in the arc
+    length range of a shard are contiguous, the shard owning the end of the
+    path coming first.
+
+    Args:
+        traveled: an int array of the traveled distance of every slot in use.
+        bounds: a float array of the arc length bounds of every shard.
+    """
+    # Traveled distances fall with the slot, so search their negation.
+    return np.searchsorted(-traveled, -bounds[::-1], "right")
+
+
+def shard_tick(shard, arrays, path):
+    """
+    Run a tick of a shard: move the packages in its arc length range, then
+    collect the closest of them to every ready tower.
+
+    Args:
+        shard: an int representing the index of the shard.
+        arrays: the dict of shared arrays.
+        path: an int array of shape (waypoints, 2) of the path in fixed
+              point.
+    """
+    ready, limit = int(arrays["control"][1]), int(arrays["control"][2])
+    # Shards are numbered from the start of the path, blocks from the end.
+    blocks = arrays["blocks"]
+    block = slice(int(blocks[len(blocks) - 2 - shard]), \
+                  int(blocks[len(blocks) - 1 - shard]))
+    arrays["failed"][shard] = move_packages(arrays, path, block)
+    found = nearest_packages(arrays, block, arrays["towers"][:ready], limit)
+    for tower, (slots, distances) in enumerate(found):
+        arrays["found"][shard, tower] = len(slots)
+        arrays["found_slots"][shard, tower, :len(slots)] = slots
+        arrays["found_distances"][shard, tower, :len(slots)] = distances
+
+
+def shard_worker(shard, specs, path, barrier):
+    """
+    Run a shard in a worker process until told to stop, with every tick
+    between two waits on the barrier shared with the coordinator.
+
+    Args:
+        shard: an int representing the index of the shard.
+        specs: the specs of the SharedArrays to attach to.
+        path: a list of tuples of ints which represent waypoints.
+        barrier: the Barrier instance shared with the coordinator.
+    """
+    shared = SharedArrays(specs=specs)
+    path = np.array(path, np.int64) << gm.FIXED_SHIFT
+    try:
+        while True:
+            barrier.wait()
+            if shared.arrays["control"][0] == STOP:
+                return
+            shard_tick(shard, shared.arrays, path)
+            barrier.wait()
+    finally:
+        shared.close()
+
+
+class ShardedFactory():
+    """
+    A headless gameboard for extreme loads, which splits the path into
+    contiguous arc length ranges each owned by a worker process.
+
+    Package state lives in shared memory arrays. Each tick, every worker
+    moves the packages in its range and collects the closest of them to
+    every ready tower, then the coordinator hands packages to towers in the
+    same order Factory does. A package is handed off to the next worker once
+    its traveled distance crosses into the next range. packed, failed and
+    money match a Factory fed by the same generator.
+
+    Attributes:
+        _path: a list of tuples of ints which represent waypoints.
+        _bounds: a float array of the arc length bounds of every shard.
+        _workers: a list of the worker Process instances.
+        _barrier: the Barrier instance synchronizing every tick.
+        _shared: the SharedArrays instance of the package and tower arrays.
+        _count: an int representing the package slots in use.
+        _capacity: an int representing the package slots available.
+        _max_towers: an int representing the most ready towers per tick.
+        _robots: a pygame Group of the placed Tower instances.
+        _tower_state: the TowerState instance of the Tower instances.
+        _packed: an int representing the packages packed by towers.
+        _failed: an int representing the packages which reached the end of
+                 the path.
+        _money: an int representing the money available to the player.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, starting_money, path=None, workers=2,
+                 capacity=1 << 17, max_towers=64):
+        """
+        Create the shared arrays and start the workers.
+
+        Args:
+            starting_money: an int representing the starting money.
+            path: a list of tuples of ints which represent waypoints, or None
+                  for the factory path.
+            workers: an int representing the number of worker processes.
+            capacity: an int representing the most live packages.
+            max_towers: an int representing the most ready towers per tick.
+        """
+        self._path = list(gm.FACTORY_PATH if path is None else path)
+        self._capacity = capacity
+        self._max_towers = max_towers
+        self._count = 0
+        self._robots = pygame.sprite.Group()
+        self._tower_state = gm.TowerState()
+        self._packed = 0
+        self._failed = 0
+        self._money = starting_money
+        self._shared = SharedArrays({
+            "control": ((3,), np.int64),
+            "blocks": ((workers + 1,), np.int64),
+            "x": ((capacity,), np.int64),
+            "y": ((capacity,), np.int64),
+            "waypoint": ((capacity,), np.int64),
+            "traveled": ((capacity,), np.int64),
+            "alive": ((capacity,), np.uint8),
+            "towers": ((max_towers, 3), np.int64),
+            "failed": ((workers,), np.int64),
+            "found": ((workers, max_towers), np.int64),
+            "found_slots": ((workers, max_towers, max_towers), np.int64),
+            "found_distances": ((workers, max_towers, max_towers), \
+                                np.int64),
+        })
+        self._bounds = np.linspace(0, path_length(self._path), workers + 1)
+        self._bounds[-1] = np.inf
+        self._barrier = multiprocessing.Barrier(workers + 1)
+        self._workers = [multiprocessing.Process(target=shard_worker, \
+            args=(shard, self._shared.specs, self._path, self._barrier), \
+            daemon=True) \
+            for shard in range(workers)]
+        for worker in self._workers:
+            worker.start()
+
+    def close(self):
+        """
+        Stop the workers and free the shared arrays.
+        """
+        if self._workers:
+            self._shared.arrays["control"][0] = STOP
+            self._barrier.wait()
+            for worker in self._workers:
+                worker.join()
+            self._workers = []
+            self._shared.close()
+
+    def tick(self, generator):
+        """
+        Advance the gameboard by a single game tick.
+
+        Args:
+            generator: a Generator instance which feeds packages onto the
+                       gameboard.
+        """
+        generator.update()
+        arrays = self._shared.arrays
+        state = self._tower_state
+        ready = state.ready_slots()
+        if len(ready) > self._max_towers:
+            raise RuntimeError(f"more than {self._max_towers} towers are " \
+                               "ready in one tick")
+        towers = arrays["towers"]
+        for index, slot in enumerate(ready):
+            towers[index] = (gm.to_fixed(state.x_pos[slot]), \
+                             gm.to_fixed(state.y_pos[slot]), \
+                             gm.to_fixed(state.radius[slot]))
+        arrays["blocks"][:] = shard_blocks(arrays["traveled"][:self._count], \
+                                           self._bounds)
+        arrays["control"][:] = (TICK, len(ready), len(ready))
+        self._barrier.wait()
+        self._barrier.wait()
+        self._failed += int(arrays["failed"].sum())
+        self.update_robots(ready)
+
+    def update_robots(self, ready):
+        """
+        Hand every ready tower the closest package not taken by a tower
+        before it, then advance every tower at once.
+
+        Args:
+            ready: an int array of the slots of the ready towers.
+        """
+        arrays = self._shared.arrays
+        state = self._tower_state
+        state.count_busy()
+        taken = set()
+        for index, slot in enumerate(ready):
+            best = None
+            for shard in range(len(self._workers)):
+                found = arrays["found"][shard, index]
+                slots = arrays["found_slots"][shard, index, :found]
+                distances = arrays["found_distances"][shard, index, :found]
+                for package, distance in zip(slots.tolist(), \
+                                             distances.tolist()):
+                    if package not in taken:
+                        if best is None or (distance, package) < best:
+                            best = (distance, package)
+                        break
+            if best is None:
+                state.idle_ticks[slot] += 1
+            else:
+                state.packed[slot] += 1
+                taken.add(best[1])
+                arrays["alive"][best[1]] = 0
+                robot = state.tower(slot)
+                robot.animate()
+                self._packed += 1
+                self._money += 25
+                robot.ready_reset()
+        state.update()
+
+    def simulate(self, generator, ticks):
+        """
+        Run the game until it is lost or a number of ticks have passed.
+
+        Args:
+            generator: a Generator instance which feeds packages onto the
+                       gameboard.
+            ticks: an int representing the most game ticks to run.
+
+        Returns:
+            An int representing the number of game ticks run.
+        """
+        for tick in range(ticks):
+            self.tick(generator)
+            if self._failed >= 10:
+                return tick + 1
+        return ticks
+
+    def generate_tower(self, x_pos, y_pos, rate, radius):
+        """
+        Create a tower given a positional input.
+
+        Args:
+            x_pos: an int representing the x-axis location of the tower.
+            y_pos: an int representing the y-axis location of the tower.
+            rate: an int which represents how many ticks a tower will take to
+                  wait after processing a package.
+            radius: an int which represents how far a package can be before it
+                    is packed & removed by the Tower instance.
+        """
+        if self._money >= 100:
+            self._robots.add(gm.Tower(x_pos, y_pos, rate, radius, \
+                                      gm.TOWER_FRAMES_Y, self._tower_state))
+            self._money += -100
+
+    def remove_tower(self, tower):
+        """
+        Remove the tower from gameplay, and refund the player.
+
+        Args:
+            tower: a Tower instance.
+        """
+        self._money += 100
+        tower.kill()
+
+    def generate_package(self, path):
+        """
+        Create a package at the start of the path.
+        """
+        self.generate_packages(path, 1)
+
+    def generate_packages(self, path, count):
+        """
+        Create a batch of packages at the start of the path.
+
+        Args:
+            path: a list of tuples of ints which represent the coordinates
+                  for the route the packages will take.
+            count: an int representing the number of packages to create.
+        """
+        if self._count + count > self._capacity:
+            self._compact()
+            if self._count + count > self._capacity:
+                raise RuntimeError(f"more than {self._capacity} packages " \
+                                   "are live")
+        arrays = self._shared.arrays
+        new = slice(self._count, self._count + count)
+        arrays["x"][new] = gm.to_fixed(path[0][0])
+        arrays["y"][new] = gm.to_fixed(path[0][1])
+        arrays["waypoint"][new] = 0
+        arrays["traveled"][new] = 0
+        arrays["alive"][new] = 1
+        self._count += count
+
+    def _compact(self):
+        """
+        Move the live packages to the front of the arrays, keeping their
+        order.
+        """
+        arrays = self._shared.arrays
+        live = np.flatnonzero(arrays["alive"][:self._count])
+        for name in ("x", "y", "waypoint", "traveled", "alive"):
+            arrays[name][:len(live)] = arrays[name][live]
+        self._count = len(live)
+
+    def locations(self):
+        """
+        Returns a float array of shape (packages, 2) of the locations in
+        pixels of the live packages in the order they were spawned.
+        """
+        arrays = self._shared.arrays
+        live = np.flatnonzero(arrays["alive"][:self._count])
+        return np.stack((arrays["x"][live], arrays["y"][live]), \
+                        axis=1) / gm.FIXED_ONE
+
+    @property
+    def path(self):
+        """
+        Returns the list of waypoints packages follow.
+        """
+        return self._path
+
+    @property
+    def robots(self):
+        """
+        Returns the Group of placed Tower instances.
+        """
+        return self._robots
+
+    @property
+    def tower_state(self):
+        """
+        Returns the TowerState instance holding the state and counters of
+        every tower.
+        """
+        return self._tower_state
+
+    @property
+    def money(self):
+        """
+        Returns the money available to the player.
+        """
+        return self._money
+
+    @property
+    def packed(self):
+        """
+        Returns the number of packages packed by towers.
+        """
+        return self._packed
+
+    @property
+    def failed(self):
+        """
+        Returns the number of packages which reached the end of the path.
+        """
+        return self._failed
+
+    @property
+    def workers(self):
+        """
+        Returns the number of worker processes.
+        """
+        return len(self._workers)
@@ -0,0 +1,633 @@
+"""
+Logisti-Co spectator server and client.
+
+Spectators receive newline delimited JSON batches. Each batch is a list of
+per-tick messages, which are either keyframes holding the whole state:
+
+    {"t": tick, "key": true, "path": [[x, y], ...],
+     "packages": [[serial, age], ...],
+     "towers": [[serial, x, y, frame], ...], "hud": [packed, lives, money]}
+
+or deltas against the previous message:
+
+    {"t": tick, "spawned": [[serial, age], ...], "removed": [serial, ...],
+     "towers": [[serial, x, y, frame], ...], "removed_towers": [serial, ...],
+     "hud": [packed, lives, money]}
+
+where tick is the game tick. Every package follows the path one fixed point
+step per tick, so a package is only sent once, with its age, and spectators
+replay its moves until it is removed. Deltas only carry the keys which
+changed.
+"""
+import asyncio
+import json
+import socket
+import threading
+import numpy as np
+import pygame
+import game_model as gm
+import game_view as gv
+from game_monitor import Monitor
+
+
+def board_summary(gameboard):
+    """
+    Capture the towers and HUD spectators see.
+
+    Args:
+        gameboard: a Factory instance.
+
+    Returns:
+        A tuple of a dict mapping tower serials to (x, y, frame) tuples and a
+        list of the packed, lives and money HUD values.
+    """
+    towers = {tower.serial: (tower.location[0], tower.location[1], \
+                             tower.frame) for tower in gameboard.robots}
+    hud = [gameboard.packed, 10 - gameboard.failed, gameboard.money]
+    return (towers, hud)
+
+
+def board_state(gameboard):
+    """
+    Capture the whole state spectators see.
+
+    Args:
+        gameboard: a Factory instance.
+
+    Returns:
+        A tuple of a dict mapping package serials to their ages, a dict
+        mapping tower serials to (x, y, frame) tuples and a list of the
+        packed, lives and money HUD values.
+    """
+    packages = {package.serial: package.age \
+                for package in gameboard.packages}
+    if gameboard.convoys is not None:
+        for age, serial in gameboard.convoys.members():
+            packages[serial] = age
+    return (packages, *board_summary(gameboard))
+
+
+def keyframe(tick, path, state):
+    """
+    Build a keyframe message.
+
+    Args:
+        tick: an int representing the game tick.
+        path: a list of tuples of ints which represent the waypoints every
+              package follows.
+        state: a tuple returned by board_state.
+
+    Returns:
+        A dict holding the whole state.
+    """
+    packages, towers, hud = state
+    return {"t": tick, "key": True, "path": [list(point) for point in path],
+            "packages": [[serial, age] for serial, age in packages.items()],
+            "towers": [[serial, *tower] for serial, tower in towers.items()],
+            "hud": hud}
+
+
+def delta(tick, records, previous, summary):
+    """
+    Build a delta message.
+
+    Args:
+        tick: an int representing the game tick.
+        records: a JOURNAL_RECORD array of the changes since the previous
+                 message.
+        previous: the tuple returned by board_summary for the previous
+                  message.
+        summary: the tuple returned by board_summary on this tick.
+
+    Returns:
+        A dict holding what changed since the previous message.
+    """
+    message = {"t": tick}
+    kinds = records["kind"]
+    spawned = records[kinds == gm.SPAWNED]
+    if len(spawned):
+        message["spawned"] = np.stack((spawned["serial"], \
+                                       tick - spawned["tick"]), 1).tolist()
+    removed = records["serial"][(kinds == gm.PACKED) | (kinds == gm.EXITED)]
+    if len(removed):
+        message["removed"] = removed.tolist()
+    before, after = previous[0], summary[0]
+    towers = [[serial, *tower] for serial, tower in after.items() \
+              if before.get(serial) != tower]
+    if towers:
+        message["towers"] = towers
+    removed_towers = [serial for serial in before if serial not in after]
+    if removed_towers:
+        message["removed_towers"] = removed_towers
+    if previous[1] != summary[1]:
+        message["hud"] = summary[1]
+    return message
+
+
+class Spectator():
+    """
+    A connected spectator with its own bounded queue of batches.
+
+    When the queue is full the spectator misses batches, and is sent a
+    keyframe as soon as there is room again.
+
+    Attributes:
+        queue: an asyncio Queue of encoded batches waiting to be written.
+        resync: a bool telling whether the spectator needs a keyframe.
+        dropped: an int counting the batches the spectator missed.
+    """
+
+    def __init__(self, max_queue):
+        """
+        Initialize the queue and ask for a keyframe.
+
+        Args:
+            max_queue: an int representing the most batches queued.
+        """
+        self.queue = asyncio.Queue(max_queue)
+        self.resync = True
+        self.dropped = 0
+
+    def offer(self, deltas, keyframe_batch):
+        """
+        Queue the next batch without waiting.
+
+        Args:
+            deltas: a bytes batch of the deltas of the latest ticks.
+            keyframe_batch: a bytes batch holding a keyframe of the latest
+                            tick, or None when none was captured, in which
+                            case a spectator needing one waits for the
+                            next batch.
+        """
+        try:
+            if self.resync:
+                if keyframe_batch is None:
+                    return
+                self.queue.put_nowait(keyframe_batch)
+                self.resync = False
+            else:
+                self.queue.put_nowait(deltas)
+        except asyncio.QueueFull:
+            self.resync = True
+            self.dropped += 1
+
+
+class SpectatorServer(Monitor):
+    """
+    A monitor which streams the game to spectators over TCP.
+
+    The server runs an asyncio event loop in a daemon thread. The game tick
+    only reads the changes recorded in the change journal of the gameboard
+    and hands them over every _batch_ticks ticks, so a slow spectator never
+    blocks the tick. Nothing is captured while no spectator is connected,
+    and the whole board is only scanned for keyframes.
+
+    Attributes:
+        _keyframe_interval: an int representing the ticks between keyframes
+                            sent to every spectator.
+        _batch_ticks: an int representing the ticks sent per batch.
+        _max_queue: an int representing the most batches queued for a
+                    spectator.
+        _tick: an int representing the number of ticks seen so far.
+        _reader: the JournalReader of the changes since the previous
+                 message, or None while no spectator is connected.
+        _previous: the board_summary tuple of the previous message.
+        _pending: a list of the messages of the current batch.
+        _spectators: a set of the connected Spectator instances.
+        _loop: the asyncio event loop of the server thread.
+        _server: the asyncio Server instance.
+        _thread: the Thread instance running _loop.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, gameboard, port=0, host="127.0.0.1",
+                 keyframe_interval=300, batch_ticks=2, max_queue=32):
+        """
+        Start the server thread.
+
+        Args:
+            gameboard: a Factory instance created with a journal, whose
+                       packages follow its path.
+            port: an int representing the port to listen on, or 0 to let the
+                  operating system pick one.
+            host: a string representing the address to bind to.
+            keyframe_interval: an int representing the ticks between
+                               keyframes sent to every spectator.
+            batch_ticks: an int representing the ticks sent per batch.
+            max_queue: an int representing the most batches queued for a
+                       spectator.
+
+        Raises:
+            ValueError: if the gameboard keeps no journal, or its packages
+                        follow a flow field.
+        """
+        super().__init__(gameboard)
+        if gameboard.journal is None:
+            raise ValueError("SpectatorServer needs a Factory with a " \
+                             "journal, pass journal to Factory")
+        if gameboard.flow_field is not None:
+            raise ValueError("SpectatorServer needs packages to follow the " \
+                             "path, not a flow field")
+        self._keyframe_interval = keyframe_interval
+        self._batch_ticks = batch_ticks
+        self._max_queue = max_queue
+        self._tick = 0
+        self._reader = None
+        self._previous = ({}, None)
+        self._pending = []
+        self._spectators = set()
+        self._loop = asyncio.new_event_loop()
+        self._server = None
+        started = threading.Event()
+        self._thread = threading.Thread(target=self._run, \
+                                        args=(host, port, started), daemon=True)
+        self._thread.start()
+        started.wait()
+
+    def _run(self, host, port, started):
+        """
+        Run the event loop of the server thread.
+
+        Args:
+            host: a string representing the address to bind to.
+            port: an int representing the port to listen on.
+            started: a threading Event set once the server listens.
+        """
+        asyncio.set_event_loop(self._loop)
+        self._server = self._loop.run_until_complete( \
+            asyncio.start_server(self._serve, host, port))
+        started.set()
+        self._loop.run_forever()
+        self._server.close()
+        # Spectators stuck writing to a stalled connection are cancelled.
+        tasks = asyncio.all_tasks(self._loop)
+        for task in tasks:
+            task.cancel()
+        self._loop.run_until_complete( \
+            asyncio.gather(*tasks, return_exceptions=True))
+        self._loop.close()
+
+    async def _serve(self, _reader, writer):
+        """
+        Write queued batches to a spectator until it disconnects.
+
+        Args:
+            _reader: the asyncio StreamReader of the connection.
+            writer: the asyncio StreamWriter of the connection.
+        """
+        spectator = Spectator(self._max_queue)
+        self._spectators.add(spectator)
+        try:
+            while True:
+                batch = await spectator.queue.get()
+                if batch is None:
+                    break
+                writer.write(batch)
+                await writer.drain()
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self._spectators.discard(spectator)
+            writer.close()
+
+    def update(self, generator, tick_time):
+        """
+        Add the changes of the tick to the batch, and hand the batch over to
+        the server thread every _batch_ticks ticks.
+
+        Args:
+            generator: the Generator instance feeding the gameboard.
+            tick_time: a float representing the seconds spent updating and
+                       drawing the tick.
+        """
+        self._tick += 1
+        if not self._spectators:
+            self._reader = None
+            self._pending = []
+            return
+        gameboard = self._gameboard
+        tick = gameboard.journal.tick
+        # Deltas follow on from the first message after spectators joined,
+        # and from any records missed, so those are keyframes.
+        joined = self._reader is None
+        if joined:
+            self._reader = gameboard.journal.subscribe()
+        records, missed = self._reader.read()
+        if joined or missed or self._tick % self._keyframe_interval == 0:
+            state = board_state(gameboard)
+            self._pending.append(keyframe(tick, gameboard.path, state))
+            summary = state[1:]
+        else:
+            summary = board_summary(gameboard)
+            self._pending.append(delta(tick, records, self._previous, \
+                                       summary))
+        self._previous = summary
+        if len(self._pending) >= self._batch_ticks:
+            key = None
+            # Only spectators which joined or missed batches need a
+            # keyframe of their own.
+            if any(spectator.resync for spectator in list(self._spectators)):
+                key = keyframe(tick, gameboard.path, board_state(gameboard))
+            self._loop.call_soon_threadsafe(self._broadcast, self._pending, \
+                                            key)
+            self._pending = []
+
+    def _broadcast(self, messages, key):
+        """
+        Encode a batch and offer it to every spectator, on the server thread.
+
+        Args:
+            messages: a list of the messages of the batch.
+            key: a keyframe message of the last tick of the batch, or None
+                 when no spectator needed one.
+        """
+        if not self._spectators:
+            return
+        deltas = (json.dumps(messages, separators=(",", ":")) + "\n") \
+            .encode("utf-8")
+        keyframe_batch = None
+        if key is not None:
+            keyframe_batch = (json.dumps([key], separators=(",", ":")) + \
+                              "\n").encode("utf-8")
+        for spectator in list(self._spectators):
+            spectator.offer(deltas, keyframe_batch)
+
+    def close(self):
+        """
+        Disconnect every spectator and stop the server thread.
+        """
+        def stop():
+            for spectator in self._spectators:
+                try:
+                    spectator.queue.put_nowait(None)
+                except asyncio.QueueFull:
+                    pass
+            self._loop.stop()
+        self._loop.call_soon_threadsafe(stop)
+        self._thread.join()
+
+    @property
+    def port(self):
+        """
+        Returns the port the server is listening on.
+        """
+        return self._server.sockets[0].getsockname()[1]
+
+    @property
+    def spectators(self):
+        """
+        Returns the number of connected spectators.
+        """
+        return len(self._spectators)
+
+
+class Trajectory():
+    """
+    The pixel centers of a package at every age along a path, replayed with
+    the fixed point steps of Package.move and recorded as they are first
+    asked for.
+
+    Attributes:
+        _probe: the Package instance stepped along the path.
+        _centers: a list of the center tuple at every recorded age.
+        _finished: a bool telling whether the probe reached the end of the
+                   path.
+    """
+
+    def __init__(self, path):
+        """
+        Place the probe at the start of the path.
+
+        Args:
+            path: a list of waypoints of the path.
+        """
+        self._probe = gm.Package(path[0][0], path[0][1], \
+                                 [tuple(point) for point in path])
+        self._centers = [self._probe.rect.center]
+        self._finished = False
+
+    def center(self, age):
+        """
+        Returns a tuple of ints of the center of a package of an age.
+
+        Args:
+            age: an int representing the age of the package.
+        """
+        while age >= len(self._centers) and not self._finished:
+            if self._probe.move() is False:
+                self._finished = True
+            else:
+                self._centers.append(self._probe.rect.center)
+        return self._centers[min(age, len(self._centers) - 1)]
+
+
+class MirrorBoard():
+    """
+    A copy of the spectated state, rebuilt from the stream.
+
+    Attributes:
+        tick: an int representing the game tick of the last message applied.
+        synced: a bool telling whether a keyframe has been applied.
+        spawns: a dict mapping package serials to the tick they spawned at.
+        towers: a dict mapping tower serials to (x, y, frame) tuples.
+        hud: a list of the packed, lives and money HUD values.
+        _path: the list of waypoints packages follow, or None.
+        _trajectory: the Trajectory instance of _path, or None.
+    """
+
+    def __init__(self):
+        """
+        Initialize an empty mirror.
+        """
+        self.tick = 0
+        self.synced = False
+        self.spawns = {}
+        self.towers = {}
+        self.hud = [0, 10, 0]
+        self._path = None
+        self._trajectory = None
+
+    def apply(self, message):
+        """
+        Apply a keyframe or delta message.
+
+        Args:
+            message: a dict decoded from the stream.
+        """
+        tick = message["t"]
+        if message.get("key"):
+            self.spawns = {}
+            self.towers = {}
+            self.synced = True
+            if message["path"] != self._path:
+                self._path = message["path"]
+                self._trajectory = Trajectory(self._path)
+            spawned = message["packages"]
+        elif not self.synced:
+            return
+        else:
+            spawned = message.get("spawned", ())
+        for serial, age in spawned:
+            self.spawns[serial] = tick - age
+        for serial, x_pos, y_pos, frame in message.get("towers", ()):
+            self.towers[serial] = (x_pos, y_pos, frame)
+        for serial in message.get("removed", ()):
+            self.spawns.pop(serial, None)
+        for serial in message.get("removed_towers", ()):
+            self.towers.pop(serial, None)
+        if "hud" in message:
+            self.hud = message["hud"]
+        self.tick = tick
+
+    @property
+    def packages(self):
+        """
+        Returns a dict mapping package serials to their (x, y) centers at
+        the last tick applied.
+        """
+        if self._trajectory is None:
+            return {}
+        return {serial: self._trajectory.center(self.tick - spawn) \
+                for serial, spawn in self.spawns.items()}
+
+
+class SpectatorClient():
+    """
+    Follow a SpectatorServer stream into a MirrorBoard from a daemon thread.
+
+    Attributes:
+        _socket: the connected socket.
+        _mirror: the MirrorBoard instance being kept up to date.
+        lock: a threading Lock held while the mirror is changed.
+        _thread: the Thread instance reading the stream.
+    """
+
+    def __init__(self, port, host="127.0.0.1"):
+        """
+        Connect to the server and start reading.
+
+        Args:
+            port: an int representing the port of the server.
+            host: a string representing the address of the server.
+        """
+        self._socket = socket.create_connection((host, port))
+        self._mirror = MirrorBoard()
+        self.lock = threading.Lock()
+        self._thread = threading.Thread(target=self._read, daemon=True)
+        self._thread.start()
+
+    def _read(self):
+        """
+        Apply every batch of the stream to the mirror.
+        """
+        with self._socket.makefile("r", encoding="utf-8") as stream:
+            try:
+                for line in stream:
+                    messages = json.loads(line)
+                    with self.lock:
+                        for message in messages:
+                            self._mirror.apply(message)
+            except (OSError, ValueError):
+                pass
+
+    def close(self):
+        """
+        Disconnect from the server.
+        """
+        try:
+            self._socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._socket.close()
+        self._thread.join()
+
+    @property
+    def mirror(self):
+        """
+        Returns the MirrorBoard instance kept up to date.
+        """
+        return self._mirror
+
+
+class SpectatorView(gv.View):
+    """
+    A thin viewer drawing a spectated game from a SpectatorClient.
+
+    Attributes:
+        _screen: the Surface drawn on, the display by default.
+        _background: the image of the factory floor.
+        _menu: the image behind the HUD.
+        _box: the surface of a package.
+        _hud: a list of the VisualText instances of the HUD.
+    """
+
+    def __init__(self, gameboard, screen=None):
+        """
+        Initialize SpectatorView.
+
+        Args:
+            gameboard: a SpectatorClient instance.
+            screen: an optional Surface to draw on instead of a new display.
+        """
+        super().__init__(gameboard)
+        if screen is None:
+            screen = pygame.display.set_mode([1100, 600])
+        self._screen = screen
+        self._background = pygame.image.load( \
+            "./game_assets/factory_path/Map1.png")
+        self._menu = pygame.image.load( \
+            "./game_assets/factory_path/menu_back.png")
+        self._box = gm.box_surface()
+        self._hud = [gv.VisualText("Successes: ", (850, 20), 30),
+                     gv.VisualText("Lives: ", (850, 70), 30),
+                     gv.VisualText("Money: ", (850, 120), 30)]
+
+    def draw(self):
+        """
+        Draw the latest mirrored state.
+        """
+        with self._gameboard.lock:
+            mirror = self._gameboard.mirror
+            packages = list(mirror.packages.values())
+            towers = list(mirror.towers.values())
+            hud = list(mirror.hud)
+        box = self._box.get_rect()
+        self._screen.blits(((self._background, (0, 0)), \
+                            (self._menu, (800, 0))), False)
+        self._screen.blits([(self._box, box.move(x_pos - box.width // 2, \
+                                                 y_pos - box.height // 2)) \
+                            for x_pos, y_pos in packages], False)
+        blits = []
+        for x_pos, y_pos, frame in towers:
+            surf = gm.TOWER_FRAMES_Y[frame]
+            blits.append((surf, surf.get_rect(center=(x_pos, y_pos))))
+        self._screen.blits(blits, False)
+        for text, value in zip(self._hud, hud):
+            text.update(value)
+        self._screen.blits([(text.text, text.location) \
+                            for text in self._hud], False)
+        if self._screen is pygame.display.get_surface():
+            pygame.display.flip()
+
+
+def watch(port, host="127.0.0.1"):
+    """
+    Watch a spectated game in a window until it is closed.
+
+    Args:
+        port: an int representing the port of the server.
+        host: a string representing the address of the server.
+    """
+    client = SpectatorClient(port, host)
+    view = SpectatorView(client)
+    clock = pygame.time.Clock()
+    try:
+        # The whole queue is drained every frame, as events left in it
+        # fill it up and leave the window unresponsive.
+        # pylint: disable=no-member
+        while not any(event.type == pygame.QUIT \
+                      for event in pygame.event.get()):
+            view.draw()
+            clock.tick(60)
+    finally:
+        client.close()
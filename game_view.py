@@ -3,9 +3,15 @@ Logisti-Co game view.
 """
 from abc import ABC, abstractmethod
 import pygame
+# pylint: disable=no-name-in-module
+from pygame._sdl2 import video
 # pylint: disable=no-member
 pygame.init()
 
+# Fewest pixels of path between convoy packages drawn, as boxes closer than
+# that overlap.
+CONVOY_SPACING = 2
+
 class View(ABC):
     """
     View Logisti Co. game.
@@ -41,25 +47,71 @@ class PyGameView(View):
     """
     A PyGame viewer for Logisti Co.
 
+    Sprites are submitted one layer at a time with a single Surface.blits
+    call rather than one blit call per sprite. An optional FrameGovernor can
+    make the view hold tower animation frames, the HUD and the package layer
+    for several frames while frames run over budget.
+
     Attributes:
         _screen: the PyGame Display instance.
+        _background: the image of the factory floor.
+        _menu: the image behind the HUD.
+        _return_rects: a bool telling whether blits should return the Rect
+                       instances of the drawn sprites.
+        _governor: an optional FrameGovernor instance choosing which layers
+                   are held.
+        _frame: an int counting the frames drawn.
+        _scene: a Surface holding the floor and packages while the package
+                layer is held, or None.
+        _scene_frame: an int representing the frame _scene was drawn at.
+        _package_rects: the Rect instances of the last drawn packages.
+        _towers: the list of (surface, Rect) tuples of the last drawn towers.
+        _tower_serials: a list of the serials of the towers in _towers.
+        _tower_frame: an int representing the frame _towers was built at.
+        _hud_frame: an int representing the frame the HUD was refreshed at.
         _successful_packages: a VisualText which shows the number of packages
                               that Tower instances have handled.
         _lives: a VisualText which shows the number of lives the player has
                 left.
         _available_towers: a VisualText which shows the number of Tower
                            instances available to be placed.
+        _overlays: a list of objects whose blits method returns (surface,
+                   position) tuples drawn over the board and HUD, such as a
+                   LatencyTracer or PlacementPreview.
     """
 
-    def __init__(self, gameboard):
+    def __init__(self, gameboard, return_rects=False, governor=None,
+                 overlays=()):
         """
         Initialize PyGameView
 
         Args:
             gameboard: a Factory instance.
+            return_rects: a bool telling whether blits should return the Rect
+                          instances of the drawn sprites.
+            governor: an optional FrameGovernor instance choosing which
+                      layers are held.
+            overlays: a sequence of objects whose blits method returns
+                      (surface, position) tuples drawn over the board and
+                      HUD.
         """
         super().__init__(gameboard)
+        self._overlays = list(overlays)
         self._screen = pygame.display.set_mode([1100, 600])
+        self._background = pygame.image.load( \
+            "./game_assets/factory_path/Map1.png").convert()
+        self._menu = pygame.image.load( \
+            "./game_assets/factory_path/menu_back.png").convert()
+        self._return_rects = return_rects
+        self._governor = governor
+        self._frame = 0
+        self._scene = None
+        self._scene_frame = 0
+        self._package_rects = []
+        self._towers = []
+        self._tower_serials = []
+        self._tower_frame = 0
+        self._hud_frame = 0
         self._successful_packages = VisualText("Successes: ", (850, 20), 30)
         self._lives = VisualText("Lives: ", (850, 70), 30)
         self._available_towers = VisualText("Money: ", (850, 120), 30)
@@ -67,27 +119,222 @@ class PyGameView(View):
     def draw(self):
         """
         Updates the view to include background image, packages, and towers.
+
+        Returns:
+            A list of the Rect instances of the drawn packages and towers if
+            _return_rects is True, else None.
         """
-        background = pygame.image.load("./game_assets/factory_path/Map1.png")
-        menu = pygame.image.load("./game_assets/factory_path/menu_back.png")
-        self._screen.blit(background, (0, 0))
-        self._screen.blit(menu, (800, 0))
-        for package in self._gameboard.packages:
-            self._screen.blit(package.surf, package.rect)
+        self._frame += 1
+        if self._governor is None:
+            tower_stride, hud_interval, package_stride = (1, 1, 1)
+        else:
+            tower_stride = self._governor.tower_stride
+            hud_interval = self._governor.hud_interval
+            package_stride = self._governor.package_stride
 
-        for tower in self._gameboard.robots:
-            self._screen.blit(tower.surf, tower.rect)
-
-        self._successful_packages.update(self._gameboard.packed)
-        self._lives.update(10 - self._gameboard.failed)
-        self._available_towers.update(self._gameboard.money)
-        self._screen.blit(self._successful_packages.text, \
-                          self._successful_packages.location)
-        self._screen.blit(self._lives.text, \
-                          self._lives.location)
-        self._screen.blit(self._available_towers.text, \
-                          self._available_towers.location)
+        self._screen.blit(self._menu, (800, 0))
+        if package_stride == 1:
+            self._screen.blit(self._background, (0, 0))
+            self._package_rects = self._screen.blits( \
+                self.package_blits(), self._return_rects)
+        else:
+            if self._scene is None or \
+                    self._frame - self._scene_frame >= package_stride:
+                if self._scene is None:
+                    self._scene = self._background.copy()
+                self._scene.blit(self._background, (0, 0))
+                self._package_rects = self._scene.blits( \
+                    self.package_blits(), self._return_rects)
+                self._scene_frame = self._frame
+            self._screen.blit(self._scene, (0, 0))
+
+        robots = self._gameboard.robots.sprites()
+        # Placed or removed towers are always shown straight away, even when
+        # a removal and a placement leave the number of towers unchanged.
+        serials = [tower.serial for tower in robots]
+        if self._frame - self._tower_frame >= tower_stride or \
+                serials != self._tower_serials:
+            self._towers = [(tower.surf, tower.rect) for tower in robots]
+            self._tower_serials = serials
+            self._tower_frame = self._frame
+        tower_rects = self._screen.blits(self._towers, self._return_rects)
+
+        if self._frame - self._hud_frame >= hud_interval:
+            self._successful_packages.update(self._gameboard.packed)
+            self._lives.update(10 - self._gameboard.failed)
+            self._available_towers.update(self._gameboard.money)
+            self._hud_frame = self._frame
+        self._screen.blits([(text.text, text.location) \
+                            for text in self.hud_texts], False)
+        for overlay in self._overlays:
+            self._screen.blits(overlay.blits(), False)
         pygame.display.flip()
+        if self._return_rects:
+            return self._package_rects + tower_rects
+        return None
+
+    def package_blits(self):
+        """
+        Returns a list of (surface, Rect) tuples of every package, packages
+        in convoys being drawn at least CONVOY_SPACING pixels apart.
+        """
+        blits = [(package.surf, package.rect) \
+                 for package in self._gameboard.packages.sprites()]
+        convoys = self._gameboard.convoys
+        if convoys is not None:
+            blits += convoys.blits(CONVOY_SPACING)
+        return blits
+
+    @property
+    def hud_texts(self):
+        """
+        Returns the list of VisualText instances drawn on the HUD.
+        """
+        return [self._successful_packages, self._lives, \
+                self._available_towers]
+
+class SDL2View(View):
+    """
+    A viewer for Logisti Co. which draws with the SDL2 renderer.
+
+    The background, menu and sprite frames are uploaded once as Textures and
+    drawn with renderer copies instead of software Surface blits. Overlay
+    surfaces are uploaded when they first show up and reused for as long as
+    the overlay keeps returning them.
+
+    Attributes:
+        _window: the pygame._sdl2 Window instance.
+        _renderer: the pygame._sdl2 Renderer instance of _window.
+        _background: a Texture of the factory floor.
+        _menu: a Texture of the image behind the HUD.
+        _textures: a dict mapping the ids of sprite surfaces to tuples of the
+                   surface and its Texture.
+        _hud: a list of [VisualText, shown value, Texture] lists for the HUD.
+        _overlays: a list of objects whose blits method returns (surface,
+                   position) tuples drawn over the board and HUD, such as a
+                   LatencyTracer or PlacementPreview.
+        _overlay_textures: a dict mapping the ids of the overlay surfaces
+                           drawn last frame to tuples of the surface and its
+                           Texture.
+    """
+
+    def __init__(self, gameboard, software=False, hidden=False, overlays=()):
+        """
+        Initialize SDL2View.
+
+        Args:
+            gameboard: a Factory instance.
+            software: a bool telling whether to use SDL's software renderer
+                      rather than a GPU accelerated one.
+            hidden: a bool telling whether to keep the window hidden.
+            overlays: a sequence of objects whose blits method returns
+                      (surface, position) tuples drawn over the board and
+                      HUD. Their surfaces must not be modified once returned.
+        """
+        super().__init__(gameboard)
+        self._overlays = list(overlays)
+        self._overlay_textures = {}
+        self._window = video.Window("Logisti-Co", size=(1100, 600), \
+                                    hidden=hidden)
+        self._renderer = video.Renderer(self._window, \
+                                        accelerated=0 if software else -1)
+        self._background = video.Texture.from_surface(self._renderer, \
+            pygame.image.load("./game_assets/factory_path/Map1.png"))
+        self._menu = video.Texture.from_surface(self._renderer, \
+            pygame.image.load("./game_assets/factory_path/menu_back.png"))
+        self._textures = {}
+        self._hud = [[VisualText("Successes: ", (850, 20), 30), None, None],
+                     [VisualText("Lives: ", (850, 70), 30), None, None],
+                     [VisualText("Money: ", (850, 120), 30), None, None]]
+
+    def texture(self, surf):
+        """
+        Return the Texture of a sprite surface, uploading it the first time
+        the surface is seen.
+
+        Args:
+            surf: a pygame Surface instance which is not modified afterwards.
+
+        Returns:
+            The pygame._sdl2 Texture instance of surf.
+        """
+        entry = self._textures.get(id(surf))
+        if entry is None:
+            # Keep the surface alive so its id cannot be reused.
+            entry = (surf, video.Texture.from_surface(self._renderer, surf))
+            self._textures[id(surf)] = entry
+        return entry[1]
+
+    def draw(self):
+        """
+        Updates the view to include background image, packages, and towers.
+        """
+        self._renderer.clear()
+        self._background.draw(dstrect=(0, 0))
+        self._menu.draw(dstrect=(800, 0))
+        for package in self._gameboard.packages:
+            self.texture(package.surf).draw(dstrect=package.rect)
+        if self._gameboard.convoys is not None:
+            for surf, rect in self._gameboard.convoys.blits(CONVOY_SPACING):
+                self.texture(surf).draw(dstrect=rect)
+        for tower in self._gameboard.robots:
+            self.texture(tower.frames[tower.frame]).draw(dstrect=tower.rect)
+
+        values = [self._gameboard.packed, 10 - self._gameboard.failed, \
+                  self._gameboard.money]
+        for entry, value in zip(self._hud, values):
+            # Only upload a new HUD texture when its value has changed.
+            if entry[1] != value:
+                entry[0].update(value)
+                entry[1] = value
+                entry[2] = video.Texture.from_surface(self._renderer, \
+                                                      entry[0].text)
+            entry[2].draw(dstrect=entry[0].location)
+
+        # Overlays replace their surfaces when they change, so only the
+        # textures of the surfaces still shown are kept.
+        shown = {}
+        for overlay in self._overlays:
+            for surf, position in overlay.blits():
+                entry = self._overlay_textures.get(id(surf)) or \
+                        shown.get(id(surf))
+                if entry is None:
+                    entry = (surf, video.Texture.from_surface(self._renderer, \
+                                                              surf))
+                shown[id(surf)] = entry
+                entry[1].draw(dstrect=(position, surf.get_size()))
+        self._overlay_textures = shown
+        self._renderer.present()
+
+    def to_surface(self):
+        """
+        Read the last presented frame back into a Surface.
+
+        Returns:
+            A pygame Surface instance holding the rendered frame.
+        """
+        return self._renderer.to_surface()
+
+    @property
+    def hud_texts(self):
+        """
+        Returns the list of VisualText instances drawn on the HUD.
+        """
+        return [entry[0] for entry in self._hud]
+
+    @property
+    def textures(self):
+        """
+        Returns the number of sprite Textures uploaded so far.
+        """
+        return len(self._textures)
+
+    @property
+    def overlay_textures(self):
+        """
+        Returns the number of overlay Textures kept from the last frame.
+        """
+        return len(self._overlay_textures)
 
 class VisualText():
     """
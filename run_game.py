@@ -1,7 +1,105 @@
 """
 Run Logisti Co. game.
 """
+import argparse
+import game_camera as gcam
+import game_control as gc
+import game_export as gex
+import game_gc as ggc
+import game_heatmap as gheat
+import game_latency as glat
 import game_model as gm
+import game_preview as gprev
+import game_view as gv
+import game_spectator as gs
 
-fac = gm.Factory(100)
-fac.main()
+parser = argparse.ArgumentParser(description="Play Logisti Co.")
+parser.add_argument("--renderer", choices=["surface", "sdl2"], \
+                    default="surface", help="the rendering backend to use")
+parser.add_argument("--serve", type=int, metavar="PORT", \
+                    help="stream the game to spectators on this port")
+parser.add_argument("--camera", action="store_true", \
+                    help="show the board through a scrolling, zooming camera")
+parser.add_argument("--convoys", action="store_true", \
+                    help="advance packages outside tower range in convoys")
+parser.add_argument("--maze", action="store_true", \
+                    help="let towers block tiles and packages route around")
+parser.add_argument("--latency", metavar="LOG", \
+                    help="trace click latency to the overlay and a CSV log")
+parser.add_argument("--preview", action="store_true", \
+                    help="preview the coverage of a tower at the cursor")
+parser.add_argument("--heatmap", metavar="REPORT", \
+                    help="show tower utilization and path leaks, and write " \
+                         "them to a JSON report at game end")
+parser.add_argument("--export", metavar="PATH", \
+                    help="render headless to PNG images in PATH, or to a " \
+                         "raw RGB24 stream if PATH ends in .rgb")
+parser.add_argument("--frames", type=int, default=3600, \
+                    help="the game ticks to run when exporting")
+parser.add_argument("--skip", type=int, default=1, \
+                    help="the ticks advanced per frame exported")
+parser.add_argument("--watch", metavar="HOST:PORT", \
+                    help="watch a game streamed from another machine")
+args = parser.parse_args()
+if args.renderer == "sdl2" and args.camera:
+    parser.error("--camera draws with --renderer surface only")
+if args.serve is not None and args.maze:
+    parser.error("--serve needs the fixed path, packages route around " \
+                 "towers with --maze")
+if args.heatmap is not None and args.maze:
+    parser.error("--heatmap measures leaks along the fixed path, packages " \
+                 "route around towers with --maze")
+if args.preview and args.maze:
+    parser.error("--preview needs the fixed path, packages route around " \
+                 "towers with --maze")
+
+if args.watch:
+    watch_host, watch_port = args.watch.rsplit(":", 1)
+    gs.watch(int(watch_port), watch_host)
+elif args.export:
+    fac = gm.Factory(100, convoys=args.convoys, \
+                     flow_cell=20 if args.maze else None)
+    export_format = "raw" if args.export.endswith(".rgb") else "png"
+    view = gex.OffscreenView(fac, gex.FrameEncoder(args.export, \
+                                                   export_format), args.skip)
+    try:
+        gex.export(fac, gm.ExponentialGenerator(fac, 200, fac.path, 0.9), \
+                   view, args.frames)
+    finally:
+        view.close()
+else:
+    fac = gm.Factory(100, index_cell=64 if args.camera else None, \
+                     convoys=args.convoys, \
+                     flow_cell=20 if args.maze else None, \
+                     leak_segment=50 if args.heatmap else None, \
+                     journal=65536 if args.serve is not None else None)
+    camera = gcam.Camera(fac.size) if args.camera else None
+    tracer = None
+    # The tracer comes first, as it takes the frame as presented when
+    # updated.
+    monitors = []
+    if args.latency is not None:
+        tracer = glat.LatencyTracer(fac, log_path=args.latency)
+        monitors.append(tracer)
+    if args.heatmap is not None:
+        monitors.append(gheat.TowerHeatmap(fac, args.heatmap, \
+                                           camera=camera))
+    if args.preview:
+        monitors.append(gprev.PlacementPreview(fac, camera=camera))
+    overlays = list(monitors)
+    dispatcher = gc.EventDispatcher(tracer)
+    controller = None
+    if camera is not None:
+        view = gcam.CameraView(fac, camera, overlays=overlays)
+        gc.CameraControl(fac, camera).register(dispatcher)
+        controller = gc.MouseControl(fac, camera)
+    elif args.renderer == "sdl2":
+        view = gv.SDL2View(fac, overlays=overlays)
+    else:
+        view = gv.PyGameView(fac, overlays=overlays)
+    # Assets, frames and fonts are loaded by now, so they are frozen.
+    monitors.append(ggc.GCManager(fac))
+    if args.serve is not None:
+        monitors.append(gs.SpectatorServer(fac, args.serve, "0.0.0.0"))
+    fac.main(monitors=monitors, view=view, dispatcher=dispatcher, \
+             controller=controller)
@@ -0,0 +1,126 @@
+"""
+Test Logisti-Co simulation result cache functions.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import os
+import time
+import pytest
+import game_cache as gcache
+import game_model as gm
+import game_optimizer as go
+
+key_cases = [
+    # Form: (inputs, other_inputs, version, other_version, expected_equal)
+    # Test that key order does not change the key.
+    ({"a": 1, "b": [1, 2]}, {"b": [1, 2], "a": 1}, "v1", "v1", True),
+    # Test that tuples and lists of the same values share a key.
+    ({"path": [(0, 1), (2, 3)]}, {"path": [[0, 1], [2, 3]]}, "v1", "v1", \
+     True),
+    # Test that any changed input changes the key.
+    ({"seed": 1}, {"seed": 2}, "v1", "v1", False),
+    # Test that a new code version changes the key.
+    ({"seed": 1}, {"seed": 1}, "v1", "v2", False),
+]
+
+@pytest.mark.parametrize("inputs,other_inputs,version,other_version," \
+                         "expected_equal", key_cases)
+def test_cache_key(inputs, other_inputs, version, other_version, \
+                   expected_equal):
+    """
+    Test that keys are canonical hashes of the inputs and code version.
+
+    Args:
+        inputs: a dict of simulation inputs.
+        other_inputs: a dict of simulation inputs to compare with.
+        version: a string of the code version of inputs.
+        other_version: a string of the code version of other_inputs.
+        expected_equal: a bool telling whether the keys should be equal.
+    """
+    assert (gcache.cache_key(inputs, version) == \
+            gcache.cache_key(other_inputs, other_version)) == expected_equal
+
+
+def test_get_or_compute(tmp_path):
+    """
+    Test that results are computed once and then read back.
+    """
+    cache = gcache.ResultCache(str(tmp_path))
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return [1, 2, 3]
+
+    assert cache.get_or_compute({"seed": 1}, compute) == [1, 2, 3]
+    assert cache.get_or_compute({"seed": 1}, compute) == [1, 2, 3]
+    assert len(calls) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert not [name for name in os.listdir(tmp_path) \
+                if name.endswith(".tmp")]
+
+
+def test_lru_eviction(tmp_path):
+    """
+    Test that the least recently used entries are evicted first once the
+    cache outgrows its cap.
+    """
+    cache = gcache.ResultCache(str(tmp_path), max_bytes=1000)
+    for index in range(5):
+        cache.put(f"key{index}", "x" * 100)
+        # Keep modification times apart on coarse filesystems.
+        os.utime(os.path.join(tmp_path, f"key{index}.json"), \
+                 (time.time() - 100 + index, time.time() - 100 + index))
+    assert cache.get("key0") is not None
+    for index in range(5, 10):
+        cache.put(f"key{index}", "x" * 100)
+    assert cache.size() <= 1000
+    assert cache.get("key0") is not None
+    assert cache.get("key1") is None
+    assert cache.get("key9") is not None
+
+
+def write_entries(directory, start):
+    """
+    Write overlapping cache entries from a worker process.
+
+    Args:
+        directory: a string representing the cache directory.
+        start: an int representing the first entry written.
+    """
+    cache = gcache.ResultCache(directory, max_bytes=20000)
+    for index in range(start, start + 200):
+        cache.put(f"key{index % 150}", {"index": index % 150, \
+                                        "padding": "x" * 50})
+
+
+def test_concurrent_writers(tmp_path):
+    """
+    Test that writers in a process pool never leave a partial entry.
+    """
+    with ProcessPoolExecutor(4) as executor:
+        list(executor.map(write_entries, [str(tmp_path)] * 4, \
+                          [0, 50, 100, 150]))
+    cache = gcache.ResultCache(str(tmp_path))
+    for name in os.listdir(tmp_path):
+        assert name.endswith(".json")
+        index = int(name[3:-5])
+        assert cache.get(f"key{index}") == {"index": index, \
+                                            "padding": "x" * 50}
+
+
+def test_cached_layout(tmp_path):
+    """
+    Test that a cached layout simulation matches a fresh one and is served
+    from the cache when repeated.
+    """
+    layout = [(300, 150), (400, 300)]
+    fresh = go.simulate_layout(gm.FACTORY_PATH, layout, 300, 100, \
+                               (100, 0.9), 3000)
+    first = go.simulate_layout(gm.FACTORY_PATH, layout, 300, 100, \
+                               (100, 0.9), 3000, str(tmp_path))
+    assert first == fresh
+    cache = gcache.ResultCache(str(tmp_path))
+    key = gcache.cache_key(go.layout_inputs(gm.FACTORY_PATH, layout, 300, \
+                                            100, (100, 0.9), 3000))
+    assert tuple(cache.get(key)) == fresh
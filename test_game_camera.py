@@ -0,0 +1,163 @@
+"""
+Test Logisti-Co scrolling camera functions.
+"""
+
+import pytest
+import pygame
+import game_model as gm
+import game_camera as gcam
+import game_control as gc
+from test_helper_classes import EventTest
+
+# pylint: disable=no-member
+pygame.init()
+
+
+camera_cases = [
+    # Form: (pan, zoom_steps, screen_pos, expected_world_pos)
+    # Test that an unmoved camera maps the screen onto the board one to one.
+    ((0, 0), 0, (100, 50), (100, 50)),
+    # Test that panning shifts the board under the screen.
+    ((300, 200), 0, (100, 50), (400, 250)),
+    # Test that the camera cannot scroll past the top left of the board.
+    ((-500, -500), 0, (100, 50), (100, 50)),
+    # Test that the camera cannot scroll past the bottom right of the board.
+    ((5000, 5000), 0, (0, 0), (1600, 1200)),
+    # Test that zooming in around the top left halves board distances.
+    ((0, 0), 3, (250, 250), (128, 128)),
+]
+
+@pytest.mark.parametrize("pan,zoom_steps,screen_pos,expected_world_pos", \
+                         camera_cases)
+def test_camera_to_world(pan, zoom_steps, screen_pos, expected_world_pos):
+    """
+    Test that screen positions map to the expected board positions.
+
+    Args:
+        pan: a tuple of ints of the screen pixels panned.
+        zoom_steps: an int representing the wheel steps zoomed at (0, 0).
+        screen_pos: a tuple of ints of a screen position.
+        expected_world_pos: a tuple of ints of the expected board position.
+    """
+    camera = gcam.Camera((2400, 1800))
+    camera.pan(*pan)
+    camera.zoom_by(zoom_steps, (0, 0))
+    assert camera.to_world(screen_pos) == expected_world_pos
+
+
+def test_camera_round_trip():
+    """
+    Test that board positions come back from a trip to the screen within the
+    board pixels a screen pixel spans, at any zoom.
+    """
+    camera = gcam.Camera((4000, 4000))
+    camera.pan(1234, 567)
+    for steps in (-4, -1, 2, 5):
+        camera.zoom_by(steps)
+        tolerance = 1 + 1 / camera.zoom
+        for pos in ((1500, 900), (1600, 1000)):
+            back = camera.to_world(camera.to_screen(pos))
+            assert abs(back[0] - pos[0]) <= tolerance
+            assert abs(back[1] - pos[1]) <= tolerance
+
+
+def test_zoom_keeps_anchor():
+    """
+    Test that zooming keeps the board point under the mouse still.
+    """
+    camera = gcam.Camera((4000, 4000), x_pos=1000, y_pos=1000)
+    before = camera.to_world((400, 300))
+    camera.zoom_by(2, (400, 300))
+    assert abs(camera.to_world((400, 300))[0] - before[0]) <= 1
+    assert abs(camera.to_world((400, 300))[1] - before[1]) <= 1
+    camera.zoom_by(-100)
+    assert camera.zoom == gcam.MIN_ZOOM
+
+
+@pytest.mark.parametrize("zoom_steps", [0, 1, -2])
+def test_tiles_cover_viewport(zoom_steps):
+    """
+    Test that the visible tiles cover the viewport without gaps or overlaps.
+
+    Args:
+        zoom_steps: an int representing the wheel steps zoomed.
+    """
+    image = pygame.Surface((1000, 700))
+    background = gcam.TiledBackground(image, 128)
+    camera = gcam.Camera((1000, 700), (0, 0, 300, 200))
+    camera.pan(123, 77)
+    camera.zoom_by(zoom_steps)
+    covered = pygame.Surface((300, 200))
+    covered.fill((0, 0, 0))
+    area = 0
+    for surf, pos in background.blits(camera):
+        rect = surf.get_rect(topleft=pos)
+        area += rect.clip(pygame.Rect(0, 0, 300, 200)).width * \
+                rect.clip(pygame.Rect(0, 0, 300, 200)).height
+        covered.fill((255, 255, 255), rect)
+    assert pygame.mask.from_threshold(covered, (255, 255, 255), \
+                                      (1, 1, 1)).count() == 300 * 200
+    assert area == 300 * 200
+
+
+def test_view_culls_offscreen_sprites():
+    """
+    Test that the camera view only draws sprites near the viewport.
+    """
+    factory = gm.Factory(999999999, size=(8000, 6000), index_cell=64)
+    factory.generate_packages(factory.path, 20)
+    for column in range(40):
+        for row in range(30):
+            factory.generate_tower(column * 200 + 100, row * 200 + 100, 10, 10)
+    camera = gcam.Camera(factory.size)
+    view = gcam.CameraView(factory, camera)
+    view.draw()
+    assert 20 < view.drawn < 20 + 40
+    camera.pan(4000, 3000)
+    view.draw()
+    assert view.drawn < 40
+
+
+def test_view_needs_index():
+    """
+    Test that the camera view refuses a gameboard without spatial indexes.
+    """
+    factory = gm.Factory(100)
+    with pytest.raises(ValueError):
+        gcam.CameraView(factory, gcam.Camera(factory.size))
+
+
+click_cases = [
+    # Form: (pan, click_pos, button, expected_tower)
+    # Test that a click places a tower at the board position under it.
+    ((1000, 500), (100, 100), 1, (1100, 600)),
+    # Test that a click beside the viewport places nothing.
+    ((1000, 500), (900, 100), 1, None),
+    # Test that a click beyond the old 800x600 board is accepted.
+    ((3000, 3000), (700, 500), 1, (3700, 3500)),
+]
+
+@pytest.mark.parametrize("pan,click_pos,button,expected_tower", click_cases)
+def test_camera_click(pan, click_pos, button, expected_tower):
+    """
+    Test that clicks are mapped through the camera onto the board.
+
+    Args:
+        pan: a tuple of ints of the screen pixels panned.
+        click_pos: a tuple of ints of the screen position clicked.
+        button: an int representing the mouse button pressed.
+        expected_tower: a tuple of ints of the tower placed, or None.
+    """
+    factory = gm.Factory(999999999, size=(4000, 4000), index_cell=64)
+    camera = gcam.Camera(factory.size)
+    camera.pan(*pan)
+    control = gc.MouseControl(factory, camera)
+    control.handle_click(EventTest(pygame.MOUSEBUTTONDOWN, button, click_pos))
+    towers = factory.robots.sprites()
+    if expected_tower is None:
+        assert not towers
+    else:
+        assert [tuple(tower.location) for tower in towers] == [expected_tower]
+        control.handle_click(EventTest(pygame.MOUSEBUTTONDOWN, 3, click_pos))
+        assert not factory.robots
+        assert len(factory.tower_index) == 0
@@ -6,10 +6,12 @@ Test functions
 from pygame.locals import (
     MOUSEBUTTONDOWN,
     KEYDOWN,
+    QUIT,
 )
 
 import pytest
 import pygame
+import game_control as gc
 import game_model as gm
 
 from test_helper_classes import (
@@ -62,8 +64,8 @@ test_place_tower_cases = [
     ([],(0,0),0),
     # Test that a queued click places a tower.
     ([LEFT_CLICK],(1,1),1),
-    # Test that two queued clicks only places one tower.
-    ([LEFT_CLICK,LEFT_CLICK],(1,1),1),
+    # Test that every queued click places a tower.
+    ([LEFT_CLICK,LEFT_CLICK],(1,1),2),
     # Test that RIGHT_CLICK input doesn't place a tower.
     ([RIGHT_CLICK],(0,0),0),
     # Test that clicks outside of display range places no towers.
@@ -132,3 +134,44 @@ def test_remove_tower(events,mouse_pos,tower_removed_count):
     click_update.control()
 
     assert len(factory.robots) == 2-tower_removed_count
+
+def test_dispatch_order():
+    """
+    Test that every event is routed to its handlers in registration order.
+    """
+    dispatcher = gc.EventDispatcher()
+    seen = []
+    dispatcher.register(KEYDOWN, lambda event: seen.append(("first", event)))
+    dispatcher.register(KEYDOWN, lambda event: seen.append(("second", event)))
+    dispatcher.register(QUIT, lambda event: seen.append(("quit", event)))
+    events = [EXTRANEOUS_INPUT, LEFT_CLICK, EventTest(QUIT, 0)]
+    assert dispatcher.dispatch(events) == events
+    assert [name for name, _ in seen] == ["first", "second", "quit"]
+
+def test_dispatch_every_click():
+    """
+    Test that every click in a frame is applied at its own position.
+    """
+    factory = gm.Factory(999999999)
+    dispatcher = gc.EventDispatcher()
+    gc.MouseControl(factory).register(dispatcher)
+    dispatcher.dispatch([EventTest(MOUSEBUTTONDOWN, 1, (100, 100)),
+                         EventTest(MOUSEBUTTONDOWN, 1, (300, 300)),
+                         EXTRANEOUS_INPUT,
+                         EventTest(MOUSEBUTTONDOWN, 3, (100, 100))])
+    assert [tower.location for tower in factory.robots] == [[300, 300]]
+
+def test_dispatch_event_queue():
+    """
+    Test that the event queue is drained once and routed.
+    """
+    pygame.event.clear()
+    factory = gm.Factory(999999999)
+    dispatcher = gc.EventDispatcher()
+    gc.MouseControl(factory).register(dispatcher)
+    for pos in [(10, 10), (20, 20), (30, 30)]:
+        pygame.event.post(pygame.event.Event(MOUSEBUTTONDOWN, button=1, \
+                                             pos=pos))
+    dispatcher.dispatch()
+    assert len(factory.robots) == 3
+    assert pygame.event.peek(MOUSEBUTTONDOWN) is False
@@ -0,0 +1,139 @@
+"""
+Test Logisti-Co training environment functions.
+"""
+
+import numpy as np
+import pytest
+import game_env as ge
+
+
+def test_reset_observation():
+    """
+    Test that reset returns empty rasters of the grid shape and the starting
+    money of every board.
+    """
+    env = ge.FactoryEnv(3, cell=40)
+    obs = env.reset(seed=0)
+    assert env.grid == (15, 20)
+    assert obs["packages"].shape == (3, 15, 20)
+    assert obs["towers"].shape == (3, 15, 20)
+    assert not obs["packages"].any()
+    assert not obs["towers"].any()
+    assert obs["money"].tolist() == [300, 300, 300]
+
+
+action_cases = [
+    # Form: (actions, expected_towers, expected_money)
+    # Test that doing nothing places nothing.
+    ([0], 0, 300),
+    # Test that a place action places a tower and spends its cost.
+    ([("place", 5, 5)], 1, 200),
+    # Test that a cell holds a single tower.
+    ([("place", 5, 5), ("place", 5, 5)], 1, 200),
+    # Test that a remove action refunds the tower.
+    ([("place", 5, 5), ("remove", 5, 5)], 0, 300),
+    # Test that removing from an empty cell does nothing.
+    ([("remove", 5, 5)], 0, 300),
+    # Test that towers cannot be placed without money.
+    ([("place", column, 0) for column in range(5)], 3, 0),
+]
+
+@pytest.mark.parametrize("actions,expected_towers,expected_money", \
+                         action_cases)
+def test_step_actions(actions, expected_towers, expected_money):
+    """
+    Test that place and remove actions change the towers and money.
+
+    Args:
+        actions: a list of 0 or (kind, column, row) tuples applied in turn.
+        expected_towers: an int representing the expected towers placed.
+        expected_money: an int representing the expected money, as nothing is
+                        packed in the first ticks.
+    """
+    env = ge.FactoryEnv(1)
+    env.reset(seed=0)
+    for action in actions:
+        if action != 0:
+            kind, column, row = action
+            action = env.place_action(column, row) if kind == "place" \
+                     else env.remove_action(column, row)
+        obs, _, _, _ = env.step([action])
+    assert obs["towers"].sum() == expected_towers
+    assert len(env.factories[0].robots) == expected_towers
+    assert obs["money"][0] == expected_money
+
+
+def test_package_raster():
+    """
+    Test that the package raster counts every package in its cell.
+    """
+    env = ge.FactoryEnv(2, gen_rate=5)
+    env.reset(seed=1)
+    for _ in range(100):
+        obs, _, _, _ = env.step([0, 0])
+    for board, factory in enumerate(env.factories):
+        assert obs["packages"][board].sum() == len(factory.packages)
+        for package in factory.packages:
+            column = package.rect.center[0] // 40
+            row = package.rect.center[1] // 40
+            assert obs["packages"][board, row, column] > 0
+
+
+def test_seeded_lockstep():
+    """
+    Test that seeded environments replay identically and that lost boards
+    report their game and start over.
+    """
+    results = []
+    for _ in range(2):
+        env = ge.FactoryEnv(4, gen_rate=20, frame_skip=4)
+        obs = env.reset(seed=7)
+        episodes = []
+        rewards = 0
+        for _ in range(1500):
+            obs, reward, dones, infos = env.step(np.zeros(4, int))
+            rewards += reward.sum()
+            episodes += [info["episode"] for done, info in zip(dones, infos) \
+                         if done]
+        ongoing = sum(factory.failed for factory in env.factories)
+        results.append((episodes, rewards, ongoing, obs["packages"].tolist()))
+    assert results[0] == results[1]
+    episodes, rewards, ongoing, _ = results[0]
+    assert episodes
+    assert all(episode["failed"] == 10 for episode in episodes)
+    # Without towers nothing is packed, so rewards only count failures.
+    assert rewards == -10 * len(episodes) - ongoing
+
+
+def test_invalid_actions():
+    """
+    Test that stepping before reset and malformed actions are refused.
+    """
+    env = ge.FactoryEnv(2)
+    with pytest.raises(RuntimeError):
+        env.step([0, 0])
+    with pytest.raises(RuntimeError):
+        env.observe()
+    env.reset(seed=0)
+    with pytest.raises(ValueError):
+        env.step([0])
+    with pytest.raises(ValueError):
+        env.step([0, env.action_count])
+
+
+def test_invalid_action_changes_nothing():
+    """
+    Test that an invalid last action is refused before any board changes,
+    so the boards stay in lockstep.
+    """
+    env = ge.FactoryEnv(2)
+    env.reset(seed=0)
+    with pytest.raises(ValueError):
+        env.step(np.array([env.place_action(5, 5), 10**6]))
+    for factory in env.factories:
+        assert len(factory.robots) == 0
+        assert factory.money == 300
+        assert not factory.packages
+    with pytest.raises(ValueError):
+        env.step([env.place_action(5, 5), -1])
+    assert [len(factory.robots) for factory in env.factories] == [0, 0]
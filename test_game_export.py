@@ -0,0 +1,117 @@
+"""
+Test Logisti-Co offscreen rendering and frame export functions.
+"""
+
+import os
+import pytest
+import pygame
+import game_export as gex
+import game_model as gm
+import game_view as gv
+
+# pylint: disable=no-member
+pygame.init()
+
+
+def make_game():
+    """
+    Returns a tuple of a Factory with a tower and a Generator feeding it.
+    """
+    factory = gm.Factory(1000)
+    factory.generate_tower(310, 110, 300, 100)
+    return factory, gm.Generator(factory, 20, factory.path)
+
+
+export_cases = [
+    # Form: (fmt, skip, region, expected_frames, expected_size)
+    # Test that every frame of a game is written as a PNG image.
+    ("png", 1, None, 12, (1100, 600)),
+    # Test that skipped frames are neither drawn nor written.
+    ("png", 5, None, 3, (1100, 600)),
+    # Test that frames are cropped to the region of interest.
+    ("png", 4, (0, 0, 800, 600), 3, (800, 600)),
+    # Test that a region reaching outside the frame is clipped to it.
+    ("png", 1, (1000, 500, 400, 400), 12, (100, 100)),
+    # Test that every frame of a game is appended to a raw stream.
+    ("raw", 2, (100, 50, 64, 32), 6, (64, 32)),
+]
+
+@pytest.mark.parametrize("fmt,skip,region,expected_frames,expected_size", \
+                         export_cases)
+def test_export(tmp_path, fmt, skip, region, expected_frames, expected_size):
+    """
+    Test that drawn frames are written in order through the encoder.
+
+    Args:
+        tmp_path: the pytest temporary directory fixture.
+        fmt: a string in FORMATS representing the format written.
+        skip: an int representing the frames advanced per frame drawn.
+        region: a rectangle of the part of the frame exported, or None.
+        expected_frames: an int representing the frames expected written.
+        expected_size: a tuple of ints of the expected frame size.
+    """
+    factory, generator = make_game()
+    path = str(tmp_path / "frames")
+    encoder = gex.FrameEncoder(path, fmt, depth=2)
+    view = gex.OffscreenView(factory, encoder, skip, region)
+    assert gex.export(factory, generator, view, 12) == 12
+    view.close()
+    assert view.rendered == encoder.written == expected_frames
+    if fmt == "raw":
+        width, height = expected_size
+        assert os.path.getsize(path) == expected_frames * width * height * 3
+    else:
+        names = sorted(os.listdir(path))
+        assert names == [f"{index:06d}.png" \
+                         for index in range(expected_frames)]
+        image = pygame.image.load(os.path.join(path, names[-1]))
+        assert image.get_size() == expected_size
+
+
+def test_frames_match_pygame_view():
+    """
+    Test that the offscreen view draws the same board as the window does,
+    so the two can stand in for each other in pixel regression tests.
+    """
+    factory, generator = make_game()
+    factory.simulate(generator, 60)
+    offscreen = gex.OffscreenView(factory).draw()
+    gv.PyGameView(factory).draw()
+    window = pygame.display.get_surface().subsurface((0, 0, 800, 600))
+    assert gex.pixel_diff(offscreen.subsurface((0, 0, 800, 600)), \
+                          window) == 0
+
+
+def test_pixel_diff():
+    """
+    Test that replaying a game draws identical frames, and a changed board
+    shows up in the difference.
+    """
+    frames = []
+    for _ in range(2):
+        factory, generator = make_game()
+        view = gex.OffscreenView(factory)
+        gex.export(factory, generator, view, 30)
+        frames.append(view.surface.copy())
+    assert gex.pixel_diff(*frames) == 0
+    factory.generate_tower(600, 400, 300, 100)
+    assert gex.pixel_diff(frames[0], view.draw()) > 0
+    with pytest.raises(ValueError):
+        gex.pixel_diff(frames[0], frames[0].subsurface((0, 0, 10, 10)))
+
+
+def test_encoder_errors(tmp_path):
+    """
+    Test that bad arguments are refused and write errors are raised.
+    """
+    with pytest.raises(ValueError):
+        gex.FrameEncoder(str(tmp_path), "gif")
+    with pytest.raises(ValueError):
+        gex.OffscreenView(gm.Factory(1000), skip=0)
+    with pytest.raises(ValueError):
+        gex.OffscreenView(gm.Factory(1000), region=(1200, 0, 10, 10))
+    encoder = gex.FrameEncoder(str(tmp_path / "frames"))
+    os.rmdir(tmp_path / "frames")
+    encoder.put(0, pygame.Surface((4, 4)))
+    with pytest.raises(pygame.error):
+        encoder.close()
@@ -0,0 +1,111 @@
+"""
+Test Logisti-Co garbage collection pause management functions.
+"""
+
+import gc
+import pytest
+import game_model as gm
+import game_gc as ggc
+import game_monitor as gmon
+
+
+@pytest.fixture(name="manager")
+def fixture_manager():
+    """
+    Yield a GCManager of a fresh gameboard, closed after the test.
+    """
+    factory = gm.Factory(100)
+    manager = ggc.GCManager(factory)
+    yield manager
+    manager.close()
+
+
+def make_due(manager):
+    """
+    Collect the young generations until a full collection is due.
+
+    Args:
+        manager: a GCManager instance.
+    """
+    while not manager.due():
+        gc.collect(1)
+
+
+def test_freeze_and_restore():
+    """
+    Test that startup objects are frozen and full collections held back
+    until the manager is closed.
+    """
+    thresholds = gc.get_threshold()
+    manager = ggc.GCManager(gm.Factory(100))
+    try:
+        assert gc.get_freeze_count() > 0
+        assert gc.get_threshold() == (thresholds[0], thresholds[1], \
+                                      ggc.HELD_THRESHOLD)
+    finally:
+        manager.close()
+    assert gc.get_threshold() == thresholds
+    assert gc.get_freeze_count() == 0
+
+
+def test_records_pauses(manager):
+    """
+    Test that collections during a tick are timed and counted.
+    """
+    generator = gm.Generator(manager.gameboard, 10, manager.gameboard.path)
+    gc.collect(0)
+    gc.collect(1)
+    manager.update(generator, 0.001)
+    assert manager.last_pause > 0
+    assert manager.collections[:2] == [1, 1]
+    manager.update(generator, 0.001)
+    assert manager.last_pause == 0
+    assert manager.max_pause > 0
+
+
+slack_cases = [
+    # Form: (frame_times, expected_idle_collections)
+    # Test that a due collection runs after a frame with time to spare.
+    ([0.001], 1),
+    # Test that a due collection waits while frames are over budget.
+    ([0.030] * 100, 0),
+    # Test that a due collection runs anyway once it waited too long.
+    ([0.030] * 600, 1),
+]
+
+@pytest.mark.parametrize("frame_times,expected_idle_collections", \
+                         slack_cases)
+def test_collects_in_slack(manager, frame_times, expected_idle_collections):
+    """
+    Test that due full collections run in frame slack.
+
+    Args:
+        manager: the GCManager fixture.
+        frame_times: a list of floats of simulated frame times in seconds.
+        expected_idle_collections: an int representing the full collections
+                                   expected to run.
+    """
+    generator = gm.Generator(manager.gameboard, 10, manager.gameboard.path)
+    make_due(manager)
+    for frame_time in frame_times:
+        manager.update(generator, frame_time)
+    assert manager.idle_collections == expected_idle_collections
+    assert manager.due() == (expected_idle_collections == 0)
+    # Collections run in slack are not pauses of a tick.
+    assert manager.collections[2] == 0
+
+
+def test_telemetry_samples_pauses(manager):
+    """
+    Test that the telemetry monitor samples the pauses of the last tick.
+    """
+    generator = gm.Generator(manager.gameboard, 10, manager.gameboard.path)
+    telemetry = gmon.TelemetryMonitor(manager.gameboard, \
+                                      gc_manager=manager)
+    gc.collect(0)
+    manager.update(generator, 0.001)
+    telemetry.update(generator, 0.001)
+    assert manager.last_pause > 0
+    assert telemetry.samples["logistico_gc_pause_seconds"] == \
+           manager.last_pause
+    assert telemetry.samples["logistico_gc_idle_collections_total"] == 0
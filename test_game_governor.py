@@ -0,0 +1,83 @@
+"""
+Test Logisti-Co frame budget governor functions.
+"""
+
+import pytest
+import pygame
+import game_model as gm
+import game_view as gv
+import game_governor as ggov
+
+# pylint: disable=no-member
+pygame.init()
+
+governor_cases = [
+    # Form: (frame_times, expected_level)
+    # Test that frames within budget keep full quality.
+    ([0.010] * 200, 0),
+    # Test that a short spike does not lower quality.
+    ([0.010] * 50 + [0.030] * 3 + [0.010] * 50, 0),
+    # Test that sustained slow frames lower quality one step at a time.
+    ([0.030] * 15, 1),
+    # Test that quality never drops below the lowest level.
+    ([0.030] * 500, len(ggov.QUALITY_LEVELS) - 1),
+    # Test that quality is restored once there is headroom.
+    ([0.030] * 500 + [0.005] * 1000, 0),
+    # Test that frames just under budget do not restore quality.
+    ([0.030] * 13 + [0.015] * 1000, 1),
+]
+
+@pytest.mark.parametrize("frame_times,expected_level", governor_cases)
+def test_governor_level(frame_times, expected_level):
+    """
+    Test that the quality level follows the frame times.
+
+    Args:
+        frame_times: a list of floats of simulated frame times in seconds.
+        expected_level: an int representing the expected quality level.
+    """
+    factory = gm.Factory(999999999)
+    generator = gm.Generator(factory, 5, factory.path)
+    governor = ggov.FrameGovernor(factory)
+    for frame_time in frame_times:
+        governor.update(generator, frame_time)
+    assert governor.level == expected_level
+
+
+def test_view_holds_layers():
+    """
+    Test that the view holds the package layer and HUD at the lowest level,
+    while the model keeps ticking.
+    """
+    factory = gm.Factory(999999999)
+    generator = gm.Generator(factory, 1, factory.path)
+    governor = ggov.FrameGovernor(factory)
+    for _ in range(500):
+        governor.update(generator, 1.0)
+    view = gv.PyGameView(factory, True, governor)
+    drawn = []
+    for _ in range(4):
+        factory.tick(generator)
+        drawn.append(len(view.draw()))
+    # Packages are redrawn every other frame only.
+    assert drawn == [1, 1, 3, 3]
+    assert len(factory.packages) == 4
+
+
+def test_view_shows_replaced_tower():
+    """
+    Test that a tower replacing a removed one is drawn straight away while
+    tower frames are held, though the number of towers is unchanged.
+    """
+    factory = gm.Factory(999999999)
+    factory.generate_tower(100, 100, 30, 50)
+    governor = ggov.FrameGovernor(factory)
+    for _ in range(500):
+        governor.update(gm.Generator(factory, 5, factory.path), 1.0)
+    assert governor.tower_stride > 1
+    view = gv.PyGameView(factory, True, governor)
+    view.draw()
+    factory.remove_tower(factory.robots.sprites()[0])
+    factory.generate_tower(400, 300, 30, 50)
+    tower_rect = view.draw()[-1]
+    assert tower_rect.center == (400, 300)
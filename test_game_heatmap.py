@@ -0,0 +1,142 @@
+"""
+Test Logisti-Co tower utilization and leak heatmap functions.
+"""
+
+import json
+import pytest
+import pygame
+import game_camera as gcam
+import game_heatmap as gheat
+import game_model as gm
+import game_view as gv
+
+# pylint: disable=no-member
+pygame.init()
+
+
+def play(leak_segment=50, ticks=3000, report_path=None, camera=None):
+    """
+    Returns a TowerHeatmap of a game with an idle and a busy tower, run for
+    a number of ticks.
+
+    Args:
+        leak_segment: an int representing the segment length of the leak
+                      histogram, or None.
+        ticks: an int representing the game ticks to run.
+        report_path: a string representing the location of the report, or
+                     None.
+        camera: a Camera instance the board is shown through, or None.
+    """
+    factory = gm.Factory(1000, leak_segment=leak_segment)
+    factory.generate_tower(300, 84, 30, 60)
+    factory.generate_tower(400, 500, 30, 20)
+    heatmap = gheat.TowerHeatmap(factory, report_path, 10, camera)
+    generator = gm.Generator(factory, 10, factory.path)
+    for _ in range(ticks):
+        factory.tick(generator)
+        heatmap.update(generator, 0.001)
+    return heatmap
+
+
+heat_cases = [
+    # Form: (share, expected_color)
+    # Test that a tower never idle is green.
+    (0.0, (0, 255, 0, gheat.HEAT_ALPHA)),
+    # Test that a tower always idle is red.
+    (1.0, (255, 0, 0, gheat.HEAT_ALPHA)),
+    # Test that shares past the ends are clamped.
+    (1.5, (255, 0, 0, gheat.HEAT_ALPHA)),
+]
+
+@pytest.mark.parametrize("share,expected_color", heat_cases)
+def test_heat(share, expected_color):
+    """
+    Test that shares are colored from green to red.
+
+    Args:
+        share: a float of the share colored.
+        expected_color: a tuple of ints of the expected RGBA color.
+    """
+    assert gheat.heat(share) == expected_color
+
+
+def test_overlay_colors():
+    """
+    Test that idle towers and leaking segments are drawn red, and segments
+    where packages are packed greener.
+    """
+    heatmap = play()
+    assert heatmap.blits()
+    view = gv.PyGameView(heatmap.gameboard, overlays=[heatmap])
+    view.draw()
+    screen = pygame.display.get_surface()
+    idle = screen.get_at((400, 500))
+    busy = screen.get_at((300, 84))
+    assert idle.r > idle.g
+    assert busy.g > busy.r
+    # The path past every tower leaks every package reaching it.
+    leaking = screen.get_at((675, 150))
+    assert leaking.r > leaking.g
+
+
+def test_camera_overlay():
+    """
+    Test that the overlay follows the camera, so towers and path stay under
+    their heat once the view is panned and zoomed.
+    """
+    camera = gcam.Camera((800, 600), zoom=2.0, x_pos=250, y_pos=34)
+    heatmap = play(ticks=600, camera=camera)
+    screen = pygame.Surface((1100, 600))
+    screen.blits(heatmap.blits(), False)
+    # The busy tower at (300, 84) is drawn at the screen position of its
+    # board position.
+    busy = screen.get_at(camera.to_screen((300, 84)))
+    assert busy.g > busy.r
+    # Nothing is drawn past the viewport.
+    for surface, position in heatmap.blits():
+        assert camera.viewport.contains(surface.get_rect(topleft=position))
+    assert heatmap.blits() is heatmap.blits()
+
+
+def test_flow_field_leaks_refused():
+    """
+    Test that leaks of packages following a flow field are refused.
+    """
+    with pytest.raises(ValueError):
+        gheat.TowerHeatmap(gm.Factory(1000, flow_cell=20, leak_segment=50))
+
+
+def test_no_overlay_before_refresh():
+    """
+    Test that nothing is drawn until the first redraw.
+    """
+    assert not play(ticks=9).blits()
+
+
+@pytest.mark.parametrize("leak_segment", [50, None])
+def test_report(tmp_path, leak_segment):
+    """
+    Test that the report written at game end holds every tower, including
+    removed ones, and the segments when a leak histogram is kept.
+
+    Args:
+        tmp_path: the pytest temporary directory fixture.
+        leak_segment: an int representing the segment length of the leak
+                      histogram, or None.
+    """
+    path = tmp_path / "report.json"
+    heatmap = play(leak_segment, 1000, str(path))
+    factory = heatmap.gameboard
+    factory.remove_tower(factory.robots.sprites()[1])
+    heatmap.close()
+    report = json.loads(path.read_text(encoding="utf-8"))
+    assert report["ticks"] == 1000
+    assert [(tower["removed"], tower["packed"] > 0) \
+            for tower in report["towers"]] == [(False, True), (True, False)]
+    if leak_segment is None:
+        assert report["segments"] is None
+    else:
+        segments = report["segments"]
+        assert segments["length"] == 50
+        assert sum(segments["caught"]) == factory.packed
+        assert segments["entered"][0] == factory.packed + factory.failed
@@ -0,0 +1,113 @@
+"""
+Test Logisti-Co input latency tracing functions.
+"""
+
+# pylint: disable=no-name-in-module
+from pygame.locals import (
+    MOUSEBUTTONDOWN,
+    KEYDOWN,
+)
+
+import pytest
+import pygame
+import game_control as gc
+import game_latency as glat
+import game_model as gm
+import game_view as gv
+
+# pylint: disable=no-member
+pygame.init()
+
+
+def click(pos, button=1, **stamps):
+    """
+    Returns a pygame MOUSEBUTTONDOWN Event.
+
+    Args:
+        pos: a tuple of ints of the screen position clicked.
+        button: an int representing the mouse button pressed.
+        stamps: extra attributes of the event, such as a timestamp.
+    """
+    return pygame.event.Event(MOUSEBUTTONDOWN, pos=pos, button=button, \
+                              **stamps)
+
+
+trace_cases = [
+    # Form: (events, expected_traced)
+    # Test that nothing is traced without input.
+    ([], 0),
+    # Test that a click is traced.
+    ([click((300, 300))], 1),
+    # Test that untraced event types are ignored.
+    ([pygame.event.Event(KEYDOWN, key=0)], 0),
+    # Test that every click of a frame is traced.
+    ([click((300, 300)), click((500, 300)), click((300, 300), 3)], 3),
+]
+
+@pytest.mark.parametrize("events,expected_traced", trace_cases)
+def test_traces_inputs(events, expected_traced):
+    """
+    Test that clicks are traced from dispatch to presentation in order.
+
+    Args:
+        events: a list of pygame Events dispatched in a frame.
+        expected_traced: an int representing the inputs expected to be
+                         traced.
+    """
+    factory = gm.Factory(1000)
+    tracer = glat.LatencyTracer(factory)
+    dispatcher = gc.EventDispatcher(tracer)
+    gc.MouseControl(factory).register(dispatcher)
+    generator = gm.Generator(factory, 10, factory.path)
+    dispatcher.dispatch(events)
+    assert tracer.traced == 0
+    tracer.update(generator, 0.001)
+    assert tracer.traced == expected_traced
+    if expected_traced:
+        queue, apply, photon = (tracer.percentiles(stage)[0] \
+                                for stage in range(3))
+        assert 0 <= queue <= apply <= photon
+    else:
+        assert tracer.percentiles() is None
+
+
+def test_sdl_timestamp():
+    """
+    Test that events carrying an SDL timestamp are traced from it.
+    """
+    factory = gm.Factory(1000)
+    tracer = glat.LatencyTracer(factory)
+    dispatcher = gc.EventDispatcher(tracer)
+    generator = gm.Generator(factory, 10, factory.path)
+    dispatcher.dispatch([click((300, 300), \
+                               timestamp=pygame.time.get_ticks() - 50)])
+    tracer.update(generator, 0.001)
+    assert tracer.percentiles(0)[0] >= 49
+
+
+def test_overlay_and_log(tmp_path):
+    """
+    Test that the percentiles are drawn on the overlay and every input and
+    the percentiles are logged.
+    """
+    factory = gm.Factory(1000)
+    log_path = tmp_path / "latency.csv"
+    tracer = glat.LatencyTracer(factory, log_path=str(log_path), interval=2)
+    dispatcher = gc.EventDispatcher(tracer)
+    gc.MouseControl(factory).register(dispatcher)
+    view = gv.PyGameView(factory, overlays=[tracer])
+    generator = gm.Generator(factory, 10, factory.path)
+    blank = tracer.texts[0].text
+    for frame in range(4):
+        dispatcher.dispatch([click((100 + 200 * frame, 300))])
+        factory.tick(generator)
+        view.draw()
+        tracer.update(generator, 0.001)
+    assert len(factory.robots) == 4
+    assert tracer.texts[0].text.get_width() > blank.get_width()
+    tracer.close()
+    lines = log_path.read_text(encoding="utf-8").splitlines()
+    assert lines[0] == "type,queue_ms,apply_ms,photon_ms"
+    assert len(lines) == 1 + 4 + 3
+    assert lines[1].startswith("MouseButtonDown,")
+    assert lines[-1].startswith("# photon p50=")
@@ -0,0 +1,76 @@
+"""
+Test Logisti-Co memory instrumentation functions.
+"""
+
+import pytest
+import pygame
+import game_model as gm
+import game_memory as gmem
+
+# pylint: disable=no-member
+pygame.init()
+_ = pygame.display.set_mode([1, 1])
+
+
+def test_surface_bytes_counts_shared_once():
+    """
+    Test that surfaces shared between sprites are only counted once.
+    """
+    shared = pygame.Surface((10, 10), 0, 32)
+    other = pygame.Surface((10, 20), 0, 32)
+    count, size = gmem.surface_bytes([shared, shared, other])
+    assert count == 2
+    assert size == shared.get_pitch() * 10 + other.get_pitch() * 20
+
+
+def test_entity_bytes(tmp_path):
+    """
+    Test that every entity type is counted and packages share a surface.
+
+    Args:
+        tmp_path: a pytest temporary directory.
+    """
+    factory = gm.Factory(999999999)
+    factory.generate_packages(factory.path, 5)
+    factory.generate_tower(400, 400, 10, 10)
+    monitor = gmem.MemoryMonitor(factory, 1, str(tmp_path / "report.txt"))
+    usage = monitor.entity_bytes()
+    monitor.close()
+    assert usage["Package"][0] == 5
+    assert usage["Package"][1] > 0
+    assert usage["Tower"][0] == 1
+    assert usage["Package surfaces"][0] == 1
+
+
+memory_report_cases = [
+    # Form: (ticks, expected_headers)
+    # Test that no final snapshot repeats one taken on the last tick.
+    (10, ["== tick 5", "== tick 10"]),
+    # Test that a final snapshot is taken when the game ends between
+    # intervals.
+    (12, ["== tick 5", "== tick 10", "== tick 12"]),
+]
+
+@pytest.mark.parametrize("ticks,expected_headers", memory_report_cases)
+def test_memory_report(tmp_path, ticks, expected_headers):
+    """
+    Test that snapshots are taken every interval and written at exit.
+
+    Args:
+        tmp_path: a pytest temporary directory.
+        ticks: an int representing the ticks played.
+        expected_headers: a list of the expected snapshot headers.
+    """
+    report_path = tmp_path / "memory_report.txt"
+    factory = gm.Factory(999999999)
+    generator = gm.Generator(factory, 1, factory.path)
+    monitor = gmem.MemoryMonitor(factory, 5, str(report_path))
+    for _ in range(ticks):
+        factory.tick(generator)
+        monitor.update(generator, 0.0)
+    monitor.close()
+    report = report_path.read_text().splitlines()
+    headers = [line for line in report if line.startswith("== tick")]
+    assert [header.split(":")[0] for header in headers] == expected_headers
+    assert f"  Package: {ticks} live" in "\n".join(report)
+    assert any("growth since last snapshot" in line for line in report)
@@ -2,6 +2,10 @@
 Test Logisti-Co model functions.
 """
 
+import math
+import random
+import time
+import numpy as np
 import pytest
 import pygame
 import game_model as gm
@@ -78,6 +82,60 @@ def test_package_no_move(x_pos, y_pos, path, output):
     assert package.move() == output
 
 
+# Test cases for fixed point movement, pinned so any platform or engine
+# which moves packages differently fails.
+package_fixed_cases = [
+    # Form: (path, moves, expected_fixed)
+    # Test that a diagonal step moves by the floored fixed point fraction.
+    ([(0,0),(3,1)], 2, (124345, 41448)),
+    # Test that the last fraction of a pixel lands exactly on the waypoint.
+    ([(0,0),(3,1)], 4, (196608, 65536)),
+    # Test that diagonal legs are finished instead of circling a waypoint.
+    ([(0,0),(333,157),(700,90)], 743, (45875200, 5898240)),
+    ([(0,0),(333,157),(700,90),(420,555),(10,590)], 1698, \
+     (655360, 38666240)),
+    # Test that straight legs move by whole pixels.
+    (gm.FACTORY_PATH, 2918, (0, 34471936)),
+]
+@pytest.mark.parametrize("path,moves,expected_fixed", package_fixed_cases)
+def test_package_fixed(path, moves, expected_fixed):
+    """
+    Test that packages move in exact fixed point steps, and that a package
+    moved to the end of a path stops there.
+
+    Args:
+        path: a list of tuple coordinates depicting the pixel waypoints the
+              package should reach.
+        moves: an int representing the times the package is moved.
+        expected_fixed: a tuple of ints of the expected fixed point
+                        location.
+    """
+    package = gm.Package(path[0][0], path[0][1], path)
+    for _ in range(moves):
+        assert package.move()
+    assert package.fixed == expected_fixed
+    assert package.location == (expected_fixed[0] / gm.FIXED_ONE, \
+                                expected_fixed[1] / gm.FIXED_ONE)
+    if expected_fixed == tuple(gm.to_fixed(value) for value in path[-1]):
+        assert package.move() is False
+
+
+def test_isqrt_array():
+    """
+    Test that the vectorized integer square root matches math.isqrt around
+    perfect squares and up to the largest values it is used for.
+    """
+    rng = np.random.default_rng(3)
+    roots = np.concatenate((np.arange(50), \
+                            rng.integers(0, 1 << 31, 2000)))
+    values = np.concatenate((roots * roots - 1, roots * roots, \
+                             roots * roots + 1, \
+                             rng.integers(0, 1 << 62, 2000)))
+    values = values[values >= 0]
+    assert gm.isqrt_array(values).tolist() == \
+           [math.isqrt(value) for value in values.tolist()]
+
+
 tower_update_ready_cases = [
     # Test the behavior of towers becoming ready after a set amount of ticks.
     # Should yield true if the cycles is greater than the rate.
@@ -315,3 +373,564 @@ def test_generator(rate, cycles, expected_packages):
         generator.update()
     # Determine if the number of packages is equal to the expected amount
     assert len(factory.packages) == expected_packages
+
+# Test burst generator behaves as expected.
+test_burst_generator_cases = [
+    # Form: (rate, on_ticks, off_ticks, batch, cycles, expected_packages)
+    # Test that a burst generates a batch every rate ticks.
+    (2,10,10,3,9,12),
+    # Test that nothing is generated during the quiet period.
+    (2,10,10,3,19,12),
+    # Test that the next burst starts after the quiet period.
+    (2,10,10,3,22,18),
+]
+
+@pytest.mark.parametrize("rate,on_ticks,off_ticks,batch,cycles," \
+    "expected_packages", test_burst_generator_cases)
+# pylint: disable=too-many-arguments
+def test_burst_generator(rate, on_ticks, off_ticks, batch, cycles, \
+                         expected_packages):
+    """
+    Test that the burst generator only generates during bursts.
+    Args:
+        rate: an int that represents the number of ticks between batches.
+        on_ticks: an int representing the length of a burst in ticks.
+        off_ticks: an int representing the length of a quiet period in ticks.
+        batch: an int representing the packages generated at once.
+        cycles: an int that represents how many generation ticks that are
+                simulated.
+        expected_packages: an int that represents how many packages that should
+                           be generated.
+    """
+    factory = gm.Factory(999999999)
+    generator = gm.BurstGenerator(factory, rate, factory.path, on_ticks, \
+                                  off_ticks, batch)
+    for _ in range(cycles):
+        generator.update()
+    assert len(factory.packages) == expected_packages
+
+def test_poisson_generator():
+    """
+    Test that the Poisson generator is reproducible and keeps its mean rate,
+    including several packages per tick.
+    """
+    counts = []
+    for _ in range(2):
+        factory = gm.Factory(999999999)
+        generator = gm.PoissonGenerator(factory, 0.5, factory.path, seed=3)
+        for _ in range(200):
+            generator.update()
+        counts.append(len(factory.packages))
+    assert counts[0] == counts[1]
+    assert 300 <= counts[0] <= 500
+
+def test_trace_generator(tmp_path):
+    """
+    Test that CSV and binary traces replay the same spawns.
+    Args:
+        tmp_path: a pytest temporary directory.
+    """
+    records = [(1, 1), (3, 5), (3, 2), (8, 1)]
+    csv_path = tmp_path / "trace.csv"
+    csv_path.write_text("tick,count\n" + \
+        "".join(f"{tick},{count}\n" for tick, count in records))
+    bin_path = tmp_path / "trace.bin"
+    bin_path.write_bytes(b"".join(gm.TRACE_RECORD.pack(*record) \
+                                  for record in records))
+    for trace_path in (csv_path, bin_path):
+        factory = gm.Factory(999999999)
+        generator = gm.TraceGenerator(factory, factory.path, str(trace_path))
+        sizes = []
+        for _ in range(8):
+            generator.update()
+            sizes.append(len(factory.packages))
+        assert sizes == [1, 1, 8, 8, 8, 8, 8, 9]
+        assert generator.exhausted
+
+def test_tower_state_matches_towers():
+    """
+    Test that advancing every tower at once matches advancing each tower on
+    its own, including the animation frames.
+    """
+    rates = [1, 2, 5, 30, 300]
+    state = gm.TowerState(2)
+    shared = [gm.Tower(0, 0, rate, 10, gm.TOWER_FRAMES_Y, state) \
+              for rate in rates]
+    single = [gm.Tower(0, 0, rate, 10, gm.TOWER_FRAMES_Y) for rate in rates]
+    for cycle in range(400):
+        for towers in (shared, single):
+            for tower in towers:
+                if tower.ready and cycle % 7 == 0:
+                    tower.animate()
+                    tower.ready_reset()
+        state.update()
+        for tower in single:
+            tower.update()
+        assert [tower.ready for tower in shared] == \
+               [tower.ready for tower in single]
+        assert [tower.frame for tower in shared] == \
+               [tower.frame for tower in single]
+
+def test_remove_tower_keeps_state():
+    """
+    Test that removing a tower frees its slot and keeps the state of the
+    other towers in order.
+    """
+    factory = gm.Factory(999999999)
+    for location in [(0,0), (10,10), (20,20)]:
+        factory.generate_tower(location[0], location[1], 2, 5)
+    towers = factory.robots.sprites()
+    factory.remove_tower(towers[1])
+    assert len(factory.tower_state) == 2
+    assert [tower.slot for tower in factory.robots] == [0, 1]
+    assert list(factory.tower_state.x_pos[:2]) == [0, 20]
+    for _ in range(2):
+        factory.update_robots()
+    assert list(factory.tower_state.ready_slots()) == [0, 1]
+
+# Tower changes in the form (tick, action, x_pos, y_pos, rate, radius), where
+# action is "place", or "remove" to remove the first tower.
+convoy_tower_changes = [
+    (200, "place", 300, 150, 30, 60),
+    (200, "place", 650, 300, 15, 100),
+    (900, "place", 420, 400, 20, 90),
+    (1500, "remove", 0, 0, 0, 0),
+    (2500, "place", 100, 84, 10, 40),
+]
+
+test_convoy_cases = [
+    # Form: (path, ticks)
+    # Test convoys on the axis-aligned factory path.
+    (gm.FACTORY_PATH, 4000),
+    # Test convoys on a path with diagonal legs.
+    ([(0, 0), (333, 157), (700, 90), (420, 555), (10, 590)], 2500),
+]
+
+@pytest.mark.parametrize("path,ticks", test_convoy_cases)
+def test_convoys_match_packages(path, ticks):
+    """
+    Test that advancing packages in convoys packs, fails and places packages
+    exactly like simulating every package, while towers come and go.
+
+    Args:
+        path: a list of tuples of ints which represent waypoints.
+        ticks: an int representing the game ticks to run.
+    """
+    results = []
+    for convoys in (False, True):
+        factory = gm.Factory(999999, path, convoys=convoys)
+        generator = gm.PoissonGenerator(factory, 2, path, seed=3)
+        for tick in range(ticks):
+            for change in convoy_tower_changes:
+                if change[0] == tick and change[1] == "place":
+                    factory.generate_tower(*change[2:])
+                elif change[0] == tick:
+                    factory.remove_tower(factory.robots.sprites()[0])
+            factory.tick(generator)
+        packages = [(package.age, package.location) \
+                    for package in factory.packages]
+        if convoys:
+            assert len(factory.convoys) > len(factory.packages)
+            packages += [(age, factory.convoys.location(age)) \
+                         for age, _ in factory.convoys.members()]
+        assert factory.package_count == len(packages)
+        results.append((factory.packed, factory.failed, factory.money, \
+                        sorted(packages)))
+    assert results[0] == results[1]
+    assert results[0][0] > 0
+
+def test_convoy_blits_spacing():
+    """
+    Test that convoy packages closer than the spacing are drawn once.
+    """
+    factory = gm.Factory(0, convoys=True)
+    for _ in range(100):
+        factory.generate_packages(factory.path, 3)
+        factory.tick(gm.Generator(factory, 10**9, factory.path))
+    assert len(factory.convoys) == 300
+    assert len(factory.convoys.blits()) == 100
+    assert len(factory.convoys.blits(4)) == 25
+
+convoy_area_cases = [
+    # Form: (area, spacing)
+    # Test that the packages on a leg in view are found.
+    ((100, 40, 300, 100), 1),
+    # Test that packages on several legs in view are found.
+    ((500, 50, 250, 400), 1),
+    # Test that an area reaching off the board is found.
+    ((-64, -64, 300, 300), 1),
+    # Test that the whole board finds every package drawn.
+    ((0, 0, 800, 600), 1),
+    # Test that an area away from the path finds nothing.
+    ((250, 260, 100, 50), 1),
+]
+
+@pytest.mark.parametrize("area,spacing", convoy_area_cases)
+def test_convoy_blits_in(area, spacing):
+    """
+    Test that the convoy packages found from the ages passing through an
+    area are those of the whole board centered in it.
+
+    Args:
+        area: a tuple of ints of the board area.
+        spacing: an int representing the fewest pixels of path between
+                 packages drawn.
+    """
+    factory = gm.Factory(10**9, convoys=True)
+    factory.generate_tower(400, 300, 30, 40)
+    generator = gm.Generator(factory, 2, factory.path)
+    for _ in range(2000):
+        factory.tick(generator)
+    convoys = factory.convoys
+    area = pygame.Rect(area)
+    expected = sorted(rect.center for _, rect in convoys.blits(spacing) \
+                      if area.collidepoint(rect.center))
+    assert sorted(rect.center for _, rect \
+                  in convoys.blits_in(area, spacing)) == expected
+
+@pytest.mark.parametrize("convoys", [False, True])
+def test_journal_mirrors_factory(convoys):
+    """
+    Test that replaying the change journal alone keeps track of the
+    packages, towers and counters of the gameboard.
+
+    Args:
+        convoys: a bool telling whether packages are advanced in convoys.
+    """
+    factory = gm.Factory(1000, convoys=convoys, journal=4096)
+    reader = factory.journal.subscribe()
+    generator = gm.PoissonGenerator(factory, 2, factory.path, seed=3)
+    packages = set()
+    towers = {}
+    animating = set()
+    counters = [1000, 0, 0]
+    for tick in range(3000):
+        for change in convoy_tower_changes:
+            if change[0] == tick and change[1] == "place":
+                factory.generate_tower(*change[2:])
+            elif change[0] == tick:
+                factory.remove_tower(factory.robots.sprites()[0])
+        factory.tick(generator)
+        records, missed = reader.read()
+        assert missed == 0
+        assert (records["tick"] == tick).all()
+        for record in records:
+            kind, serial = record["kind"], record["serial"]
+            if kind == gm.SPAWNED:
+                packages.add(serial)
+            elif kind in (gm.PACKED, gm.EXITED):
+                packages.remove(serial)
+            elif kind == gm.MOVED:
+                assert record["value"] == len(packages)
+            elif kind == gm.TOWER_PLACED:
+                towers[serial] = (record["x_pos"], record["y_pos"])
+            elif kind == gm.TOWER_REMOVED:
+                del towers[serial]
+                animating.discard(serial)
+            elif kind == gm.TOWER_ANIMATING:
+                animating.add(serial)
+            elif kind == gm.TOWER_IDLE:
+                animating.remove(serial)
+            else:
+                counters[kind - gm.MONEY_CHANGED] += record["value"]
+        assert len(packages) == factory.package_count
+        assert towers == {tower.serial: tuple(tower.location) \
+                          for tower in factory.robots}
+        assert animating == {tower.serial for tower in factory.robots \
+                             if tower.animating}
+        assert counters == [factory.money, factory.packed, factory.failed]
+    assert factory.packed > 0 and factory.failed > 0
+
+
+def test_journal_overflow():
+    """
+    Test that a reader falling behind the capacity of the journal is told
+    how many records it missed and still reads the newest ones in order.
+    """
+    journal = gm.ChangeJournal(capacity=8)
+    reader = journal.subscribe()
+    for serial in range(5):
+        journal.record(gm.SPAWNED, serial)
+    records, missed = reader.read()
+    assert (records["serial"].tolist(), missed) == ([0, 1, 2, 3, 4], 0)
+    late = journal.subscribe()
+    for serial in range(5, 25):
+        journal.record(gm.SPAWNED, serial)
+    assert reader.pending == 20
+    records, missed = reader.read()
+    assert (records["serial"].tolist(), missed) == (list(range(17, 25)), 12)
+    records, missed = late.read()
+    assert (records["serial"].tolist(), missed) == (list(range(17, 25)), 12)
+    assert len(reader.read()[0]) == 0
+
+test_flow_field_cases = [
+    # Form: (size, cell, seed)
+    # Test a small board with many blocked tiles.
+    ((200, 160), 20, 0),
+    # Test the default board.
+    ((800, 600), 20, 1),
+    # Test a board whose size is not a multiple of the tile size.
+    ((810, 615), 40, 2),
+]
+
+@pytest.mark.parametrize("size,cell,seed", test_flow_field_cases)
+def test_flow_field_incremental(size, cell, seed):
+    """
+    Test that blocking and freeing tiles one at a time leaves the same
+    distances as computing the field from scratch.
+
+    Args:
+        size: a tuple of ints of the width and height of the board.
+        cell: an int representing the width and height of a tile.
+        seed: an int seeding the tiles blocked and freed.
+    """
+    field = gm.FlowField(size, (0, size[1] - 1), cell)
+    rng = random.Random(seed)
+    tiles = len(field.distances().ravel())
+    blocked = []
+    for _ in range(2000):
+        if blocked and rng.random() < 0.3:
+            field.unblock(blocked.pop(rng.randrange(len(blocked))))
+        else:
+            tile = rng.randrange(tiles)
+            if field.block(tile, {0}):
+                blocked.append(tile)
+        if rng.random() < 0.05:
+            distances = field.distances()
+            field.recompute()
+            assert np.array_equal(distances, field.distances())
+    assert blocked
+    assert field.distance(0) != gm.FlowField.UNREACHABLE
+
+
+def test_flow_field_refuses_disconnect():
+    """
+    Test that a tile whose blocking would cut a kept tile off from the exit
+    stays open and leaves the field unchanged.
+    """
+    field = gm.FlowField((200, 200), (190, 190), 20)
+    for row in range(9):
+        assert field.block(field.tile(100, row * 20 + 10), {0})
+    distances = field.distances()
+    assert field.distance(0) == 18
+    assert not field.block(field.tile(100, 190), {0})
+    assert not field.blocked(field.tile(100, 190))
+    assert np.array_equal(distances, field.distances())
+    assert not field.block(field.exit)
+
+
+def test_flow_factory_reroutes():
+    """
+    Test that packages walk around towers to the end of the path, and that
+    placements disconnecting the start or landing on a package are refused.
+    """
+    factory = gm.Factory(10**6, flow_cell=20)
+    generator = gm.Generator(factory, 40, factory.path)
+    field = factory.flow_field
+    for _ in range(80):
+        factory.tick(generator)
+    factory.generate_tower(*factory.path[0], 1, 0)
+    package = factory.packages.sprites()[0]
+    factory.generate_tower(*package.rect.center, 1, 0)
+    assert len(factory.robots) == 0
+    # Wall the start off from the end but for a gap on the far right, then
+    # try to close it.
+    for column in range(39):
+        factory.generate_tower(column * 20 + 5, 205, 10**9, 0)
+    assert len(factory.robots) == 39
+    factory.generate_tower(785, 205, 10**9, 0)
+    assert len(factory.robots) == 39
+    assert factory.robots.sprites()[0].location == [10, 210]
+    assert field.distance(field.tile(*factory.path[0])) == 100
+    for _ in range(4000):
+        factory.tick(generator)
+        for package in factory.packages:
+            assert not field.blocked(field.tile(*package.rect.center))
+    assert factory.failed > 0
+    assert factory.money == 10**6 - 39 * 100
+    factory.remove_tower(factory.robots.sprites()[0])
+    assert not field.blocked(field.tile(10, 210))
+    assert field.distance(field.tile(*factory.path[0])) == 22
+
+spawn_generators = [
+    # Form: generator factory taking a Factory
+    # Test a fixed rate generator.
+    lambda factory: gm.Generator(factory, 7, factory.path),
+    # Test an exponential generator with a fractional rate.
+    lambda factory: gm.ExponentialGenerator(factory, 45, factory.path, 0.9),
+    # Test a Poisson generator.
+    lambda factory: gm.PoissonGenerator(factory, 9, factory.path, seed=2),
+    # Test a burst generator, with quiet periods between bursts.
+    lambda factory: gm.BurstGenerator(factory, 3, factory.path, 10, 25),
+]
+
+@pytest.mark.parametrize("make_generator", spawn_generators)
+def test_ticks_until_spawn(make_generator):
+    """
+    Test that generators tell how many updates pass until one spawns.
+
+    Args:
+        make_generator: a function returning a Generator of a Factory.
+    """
+    factory = gm.Factory(0)
+    generator = make_generator(factory)
+    for _ in range(20):
+        ticks = generator.ticks_until_spawn()
+        for _ in range(ticks - 1):
+            generator.update()
+            assert len(factory.packages) == 0
+        generator.update()
+        assert len(factory.packages) > 0
+        factory.packages.empty()
+
+
+def test_trace_generator_never_spawns(tmp_path):
+    """
+    Test that an exhausted trace never spawns again.
+    """
+    trace_path = tmp_path / "trace.csv"
+    trace_path.write_text("5\n", encoding="utf-8")
+    factory = gm.Factory(0)
+    generator = gm.TraceGenerator(factory, factory.path, str(trace_path))
+    assert generator.ticks_until_spawn() == 5
+    for _ in range(5):
+        generator.update()
+    assert generator.ticks_until_spawn() is None
+
+
+def test_quiescent():
+    """
+    Test that the gameboard is quiescent only without packages and
+    animating towers.
+    """
+    factory = gm.Factory(1000)
+    assert factory.quiescent()
+    factory.generate_tower(100, 100, 30, 100)
+    factory.generate_package(factory.path)
+    assert not factory.quiescent()
+    generator = gm.Generator(factory, 10**9, factory.path)
+    factory.tick(generator)
+    while factory.packages:
+        factory.tick(generator)
+    assert not factory.quiescent()
+    while not factory.quiescent():
+        factory.tick(generator)
+    assert factory.robots.sprites()[0].frame == 0
+
+
+def test_idle_sleeps_until_spawn():
+    """
+    Test that idling sleeps until the tick before the next spawn, catching
+    the model up on the ticks slept through.
+    """
+    pygame.display.set_mode((1, 1))
+    pygame.event.clear()
+    factory = gm.Factory(1000)
+    generator = gm.Generator(factory, 13, factory.path)
+    start = time.perf_counter()
+    assert factory.idle(generator) == []
+    assert time.perf_counter() - start >= 0.15
+    assert generator.tick_count == 12
+    assert len(factory.packages) == 0
+    factory.tick(generator)
+    assert len(factory.packages) == 1
+
+
+def test_idle_wakes_on_event():
+    """
+    Test that an event ends the sleep at once and is handed back.
+    """
+    pygame.display.set_mode((1, 1))
+    pygame.event.clear()
+    factory = gm.Factory(1000)
+    generator = gm.Generator(factory, 600, factory.path)
+    event = pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(1, 1), button=1)
+    pygame.event.post(event)
+    start = time.perf_counter()
+    woken = factory.idle(generator)
+    assert time.perf_counter() - start < 0.5
+    assert [woken_event.type for woken_event in woken] == \
+           [pygame.MOUSEBUTTONDOWN]
+    assert generator.tick_count < 30
+
+
+tally_cases = [
+    # Form: (towers, gen_rate, ticks)
+    # Test a lone tower which is mostly busy.
+    ([(300, 84, 30, 60)], 10, 3000),
+    # Test towers sharing packages, one of them often idle.
+    ([(300, 84, 30, 60), (600, 213, 40, 60)], 10, 3000),
+    # Test a tower out of range of the path, which is always idle.
+    ([(300, 84, 30, 60), (400, 500, 10, 20)], 25, 2000),
+]
+
+@pytest.mark.parametrize("towers,gen_rate,ticks", tally_cases)
+def test_tower_tallies(towers, gen_rate, ticks):
+    """
+    Test that every tick of every tower is counted as packing, idle or
+    busy, and the packed counts add up to the gameboard's.
+
+    Args:
+        towers: a list of (x_pos, y_pos, rate, radius) tuples of towers.
+        gen_rate: an int representing the ticks between packages.
+        ticks: an int representing the game ticks to run.
+    """
+    factory = gm.Factory(1000)
+    for x_pos, y_pos, rate, radius in towers:
+        factory.generate_tower(x_pos, y_pos, rate, radius)
+    ran = factory.simulate(gm.Generator(factory, gen_rate, factory.path), \
+                           ticks)
+    tallies = factory.tower_state.tallies()
+    assert [tally.serial for tally in tallies] == \
+           [tower.serial for tower in factory.robots]
+    for tally in tallies:
+        assert tally.packed + tally.idle_ticks + tally.busy_ticks == ran
+    assert sum(tally.packed for tally in tallies) == factory.packed
+    if towers[-1][3] == 20:
+        assert tallies[-1].packed == 0
+        assert tallies[-1].busy_ticks == towers[-1][2]
+
+
+def test_tower_tally_retired():
+    """
+    Test that the counters of a removed tower are kept, and a tower placed
+    in its slot starts counting afresh.
+    """
+    factory = gm.Factory(1000)
+    factory.generate_tower(300, 84, 30, 60)
+    factory.generate_tower(600, 213, 40, 60)
+    generator = gm.Generator(factory, 10, factory.path)
+    factory.simulate(generator, 1000)
+    first = factory.robots.sprites()[0]
+    tally = first.tally
+    factory.remove_tower(first)
+    assert factory.tower_state.retired == [tally]
+    factory.generate_tower(100, 84, 30, 60)
+    assert factory.robots.sprites()[-1].tally.packed == 0
+    assert factory.robots.sprites()[0].tally.packed > 0
+
+
+@pytest.mark.parametrize("convoys", [False, True])
+def test_leak_histogram(convoys):
+    """
+    Test that the leak histogram counts every finished package once, in the
+    segment it was packed or failed in.
+
+    Args:
+        convoys: a bool telling whether packages move in convoys.
+    """
+    factory = gm.Factory(1000, convoys=convoys, leak_segment=100)
+    factory.generate_tower(300, 84, 30, 60)
+    generator = gm.Generator(factory, 10, factory.path)
+    factory.simulate(generator, 10000)
+    leaks = factory.leaks
+    assert leaks.caught.sum() == factory.packed
+    assert leaks.exited.sum() == factory.failed == 10
+    # Only the segments within range of the tower pack anything.
+    assert np.flatnonzero(leaks.caught).tolist() == [2, 3]
+    assert np.flatnonzero(leaks.exited).tolist() == [len(leaks.exited) - 1]
+    entered = leaks.entered()
+    assert entered[0] == factory.packed + factory.failed
+    # Past the tower, only the packages which fail are left.
+    assert entered[4] == leaks.leaked()[3] == leaks.leaked()[-1] == \
+           factory.failed
@@ -0,0 +1,132 @@
+"""
+Test Logisti-Co monitor functions.
+"""
+
+import urllib.request
+import pytest
+import pygame
+import game_model as gm
+import game_monitor as gmon
+
+# pylint: disable=no-member
+pygame.init()
+_ = pygame.display.set_mode([1, 1])
+
+
+def test_telemetry_samples():
+    """
+    Test that the telemetry monitor samples the gameboard and generator.
+    """
+    factory = gm.Factory(999999999)
+    generator = gm.Generator(factory, 5, factory.path)
+    telemetry = gmon.TelemetryMonitor(factory)
+    factory.generate_tower(400, 400, 10, 10)
+    for _ in range(10):
+        factory.tick(generator)
+    telemetry.update(generator, 0.002)
+    assert telemetry.samples["logistico_packages"] == 2
+    assert telemetry.samples["logistico_towers"] == 1
+    assert telemetry.samples["logistico_money"] == 999999899
+    assert telemetry.samples["logistico_spawn_interval_ticks"] == 5
+    assert telemetry.samples["logistico_tick_duration_seconds"] == 0.002
+
+
+def test_prometheus_text():
+    """
+    Test that every metric is formatted with HELP, TYPE and value lines.
+    """
+    text = gmon.prometheus_text({"logistico_packed_total": 7})
+    lines = text.splitlines()
+    assert len(lines) == 3 * len(gmon.METRICS)
+    assert "# TYPE logistico_packed_total counter" in lines
+    assert "logistico_packed_total 7" in lines
+    assert "logistico_money 0" in lines
+
+
+def test_prometheus_exporter_scrape():
+    """
+    Test that the HTTP endpoint serves the latest samples.
+    """
+    factory = gm.Factory(150)
+    generator = gm.Generator(factory, 5, factory.path)
+    exporter = gmon.PrometheusExporter(port=0)
+    telemetry = gmon.TelemetryMonitor(factory, [exporter])
+    try:
+        telemetry.update(generator, 0.0)
+        url = f"http://127.0.0.1:{exporter.port}/metrics"
+        with urllib.request.urlopen(url, timeout=5) as response:
+            body = response.read().decode("utf-8")
+        assert "logistico_money 150" in body.splitlines()
+    finally:
+        telemetry.close()
+
+
+ring_buffer_cases = [
+    # Form: (capacity, interval, updates, expected_records)
+    # Test that a record is written every interval.
+    (10, 2, 6, 3),
+    # Test that the ring buffer keeps only the newest records once full.
+    (4, 1, 10, 4),
+    # Test that no record is written before the first interval.
+    (4, 5, 4, 0),
+]
+
+@pytest.mark.parametrize("capacity,interval,updates,expected_records", \
+                         ring_buffer_cases)
+def test_ring_buffer(tmp_path, capacity, interval, updates, expected_records):
+    """
+    Test that the ring buffer file keeps the newest records in order.
+
+    Args:
+        tmp_path: a pytest temporary directory.
+        capacity: an int representing the number of records kept.
+        interval: an int representing the number of ticks between records.
+        updates: an int representing the number of ticks simulated.
+        expected_records: an int representing how many records should be
+                          read back.
+    """
+    path = tmp_path / "telemetry.ring"
+    exporter = gmon.RingBufferExporter(str(path), capacity, interval)
+    for tick in range(1, updates + 1):
+        exporter.export({"logistico_packed_total": tick})
+    exporter.close()
+    records = gmon.read_ring_buffer(str(path))
+    assert len(records) == expected_records
+    packed = [record["logistico_packed_total"] for record in records]
+    assert packed == sorted(packed)
+    if records:
+        assert packed[-1] == updates - updates % interval
+
+
+ring_header_cases = [
+    # Form: (version_change, metrics_change)
+    # Test that a file of another layout version is refused.
+    (1, 0),
+    # Test that a file written with fewer metrics is refused.
+    (0, -1),
+    # Test that a file written with more metrics is refused.
+    (0, 1),
+]
+
+@pytest.mark.parametrize("version_change,metrics_change", ring_header_cases)
+def test_ring_buffer_header(tmp_path, version_change, metrics_change):
+    """
+    Test that ring buffers of another layout are refused rather than
+    misread.
+
+    Args:
+        tmp_path: a pytest temporary directory.
+        version_change: an int added to the layout version in the header.
+        metrics_change: an int added to the metric count in the header.
+    """
+    path = tmp_path / "telemetry.ring"
+    exporter = gmon.RingBufferExporter(str(path), 4, 1)
+    exporter.export({"logistico_packed_total": 1})
+    exporter.close()
+    assert len(gmon.read_ring_buffer(str(path))) == 1
+    with open(path, "r+b") as ring:
+        ring.write(gmon.RING_HEADER.pack(gmon.RING_MAGIC, \
+            gmon.RING_VERSION + version_change, \
+            len(gmon.METRICS) + metrics_change, 4, 1))
+    with pytest.raises(ValueError):
+        gmon.read_ring_buffer(str(path))
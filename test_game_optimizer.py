@@ -0,0 +1,85 @@
+"""
+Test Logisti-Co tower layout optimizer functions.
+"""
+
+import pytest
+import numpy as np
+import game_model as gm
+import game_optimizer as go
+
+path_samples_cases = [
+    # Form: (path, expected_samples)
+    # Test that a straight path is sampled at every pixel, including its
+    # start.
+    ([(0,0),(10,0)], 11),
+    # Test that every segment of a path is sampled.
+    ([(0,0),(10,0),(10,5)], 16),
+    # Test that repeated waypoints add no samples.
+    ([(0,0),(0,0),(0,3)], 4),
+]
+
+@pytest.mark.parametrize("path,expected_samples", path_samples_cases)
+def test_path_samples(path, expected_samples):
+    """
+    Test that paths are sampled at every pixel of arc length.
+
+    Args:
+        path: a list of tuples of ints which represent waypoints.
+        expected_samples: an int representing the expected sample count.
+    """
+    samples = go.path_samples(path)
+    assert len(samples) == expected_samples
+    assert tuple(samples[-1]) == path[-1]
+
+
+def test_coverage_matches_distance():
+    """
+    Test that candidate coverage agrees with the tower radius.
+    """
+    optimizer = go.LayoutOptimizer(gm.FACTORY_PATH, 300, 100, (200, 0.9))
+    samples = go.path_samples(gm.FACTORY_PATH)
+    for index in (0, 100, 700):
+        candidate = optimizer.candidates[index]
+        distances = np.hypot(*(samples - candidate).T)
+        assert (optimizer.coverage[index] == (distances <= 100)).all()
+
+
+def test_greedy_layout():
+    """
+    Test that greedy placement covers the path and never stacks towers.
+    """
+    optimizer = go.LayoutOptimizer(gm.FACTORY_PATH, 300, 100, (200, 0.9))
+    layout = optimizer.greedy(5)
+    assert len(set(layout)) == 5
+    assert optimizer.coverage[layout].any(axis=1).all()
+    improved, score = optimizer.local_search(layout)
+    assert score >= optimizer.score(layout)
+    assert len(improved) == 5
+
+
+def test_propose_layout():
+    """
+    Test that the proposed layout fits the budget and its simulation is
+    reproducible.
+    """
+    optimizer = go.LayoutOptimizer(gm.FACTORY_PATH, 300, 100, (200, 0.9))
+    layout, result = optimizer.propose(300, restarts=1, finalists=2, \
+                                       ticks=3000, workers=2)
+    assert len(layout) == 3
+    assert result == go.simulate_layout(gm.FACTORY_PATH, layout, 300, 100, \
+                                        (200, 0.9), 3000)
+    assert result[1] > 0
+
+
+def test_propose_cached(tmp_path, monkeypatch):
+    """
+    Test that a repeated proposal reads its simulations from the cache
+    rather than starting worker processes.
+    """
+    optimizer = go.LayoutOptimizer(gm.FACTORY_PATH, 300, 100, (200, 0.9), \
+                                   cache_dir=str(tmp_path))
+    first = optimizer.propose(300, restarts=1, finalists=2, ticks=3000, \
+                              workers=2)
+    monkeypatch.setattr(go, "ProcessPoolExecutor", None)
+    assert optimizer.propose(300, restarts=1, finalists=2, ticks=3000, \
+                             workers=2) == first
@@ -0,0 +1,167 @@
+"""
+Test Logisti-Co tower placement preview functions.
+"""
+
+import pytest
+import pygame
+import game_camera as gcam
+import game_model as gm
+import game_preview as gprev
+import game_view as gv
+
+# pylint: disable=no-member
+pygame.init()
+
+
+@pytest.fixture(name="preview")
+def fixture_preview():
+    """
+    Yield a PlacementPreview of a fresh gameboard, closed after the test.
+    """
+    preview = gprev.PlacementPreview(gm.Factory(1000))
+    yield preview
+    preview.close()
+
+
+coverage_cases = [
+    # Form: (pos, towers, expected_covered, expected_overlap)
+    # Test that a cell far from the path covers nothing.
+    ((790, 10), [], 0, 0),
+    # Test that a cell by a straight leg covers a chord of path, its center
+    # being 6 pixels off the path.
+    ((300, 84), [], 199, 0),
+    # Test that a tower in the same place already covers everything.
+    ((300, 84), [(310, 90)], 199, 199),
+    # Test that a tower further along shares part of the path.
+    ((300, 84), [(410, 90)], 199, 99),
+]
+
+@pytest.mark.parametrize("pos,towers,expected_covered,expected_overlap", \
+                         coverage_cases)
+def test_coverage(preview, pos, towers, expected_covered, expected_overlap):
+    """
+    Test that the path covered by a tower at the cursor and the part other
+    towers share are measured at the center of the cell.
+
+    Args:
+        preview: the PlacementPreview fixture.
+        pos: a tuple of ints of the cursor position.
+        towers: a list of tuples of ints of the positions of placed towers.
+        expected_covered: an int representing the path pixels in range.
+        expected_overlap: an int representing the path pixels shared.
+    """
+    for x_pos, y_pos in towers:
+        preview.gameboard.generate_tower(x_pos, y_pos, 300, 100)
+    preview.request(pos)
+    coverage = preview.wait(5)
+    assert coverage.center == (pos[0] // 20 * 20 + 10, pos[1] // 20 * 20 + 10)
+    assert (coverage.covered, coverage.overlap) == \
+           (expected_covered, expected_overlap)
+    assert coverage.surface.get_size() == (201, 201)
+
+
+def test_memoized(preview):
+    """
+    Test that cells seen before are not computed again until the towers
+    change.
+    """
+    for pos in [(300, 84), (305, 90), (500, 84), (300, 84)]:
+        preview.request(pos)
+        preview.wait(5)
+    assert preview.computed == 2
+    preview.gameboard.generate_tower(400, 90, 300, 100)
+    preview.request((300, 84))
+    assert preview.wait(5).overlap > 0
+    assert preview.computed == 3
+
+
+def test_leaving_board_clears(preview):
+    """
+    Test that the preview is cleared once the cursor leaves the board.
+    """
+    preview.request((300, 84))
+    assert preview.wait(5) is not None
+    preview.request((900, 84))
+    assert preview.latest is None
+    assert not preview.blits()
+
+
+def test_per_minute(preview):
+    """
+    Test that the catch estimate follows the flow and leaves shared path to
+    other towers.
+    """
+    generator = gm.Generator(preview.gameboard, 30, preview.gameboard.path)
+    preview.update(generator, 0.001)
+    alone = gprev.Coverage(None, (0, 0), 199, 0, None)
+    shared = gprev.Coverage(None, (0, 0), 199, 199, None)
+    # Packages are always in range, so the rate of the tower limits it.
+    assert preview.per_minute(alone) == pytest.approx(3600 / 299)
+    assert preview.per_minute(shared) == 0
+
+
+def test_view_draws_preview(preview):
+    """
+    Test that the view draws the latest preview over the board.
+    """
+    view = gv.PyGameView(preview.gameboard, overlays=[preview])
+    view.draw()
+    preview.request((300, 84))
+    preview.wait(5)
+    view.draw()
+    screen = pygame.display.get_surface()
+    assert screen.get_at((300, 84))[:3] == gprev.COVERED_COLOR[:3]
+
+
+def test_flow_field_refused():
+    """
+    Test that boards whose packages route around towers are refused.
+    """
+    with pytest.raises(ValueError):
+        gprev.PlacementPreview(gm.Factory(1000, flow_cell=20))
+
+
+camera_cases = [
+    # Form: (mouse_pos, expected_pos)
+    # Test that the cursor is mapped through the zoomed, panned camera.
+    ((100, 100), (300, 84)),
+    # Test that a cursor outside of the viewport is off the board.
+    ((900, 100), None),
+]
+
+@pytest.mark.parametrize("mouse_pos,expected_pos", camera_cases)
+def test_camera_board_pos(mouse_pos, expected_pos):
+    """
+    Test that the cursor is mapped to the board through the camera.
+
+    Args:
+        mouse_pos: a tuple of ints of the screen position of the cursor.
+        expected_pos: a tuple of ints of the expected board position, or
+                      None.
+    """
+    camera = gcam.Camera((800, 600), zoom=2.0, x_pos=250, y_pos=34)
+    preview = gprev.PlacementPreview(gm.Factory(1000), camera=camera)
+    try:
+        assert preview.board_pos(mouse_pos) == expected_pos
+    finally:
+        preview.close()
+
+
+def test_camera_blits():
+    """
+    Test that the preview is scaled with the camera zoom, placed on the
+    screen and cropped to the viewport.
+    """
+    camera = gcam.Camera((800, 600), zoom=2.0, x_pos=250, y_pos=34)
+    preview = gprev.PlacementPreview(gm.Factory(1000), camera=camera)
+    try:
+        preview.request((300, 84))
+        coverage = preview.wait(5)
+        surface, position = preview.blits()[0]
+        left, top = camera.to_screen((coverage.center[0] - 100, \
+                                      coverage.center[1] - 100))
+        assert position == (max(left, 0), max(top, 0))
+        assert surface.get_size() == (402 - position[0] + left, \
+                                      402 - position[1] + top)
+    finally:
+        preview.close()
@@ -0,0 +1,136 @@
+"""
+Test Logisti-Co statistics recorder functions.
+"""
+
+import os
+import timeit
+import tracemalloc
+import numpy as np
+import pytest
+import game_model as gm
+import game_recorder as grec
+
+recorder_cases = [
+    # Form: (capacity, bucket, bucket_capacity, ticks)
+    # Test that short games are kept at full resolution.
+    (64, 4, 16, 50),
+    # Test that older ticks are downsampled into buckets.
+    (64, 4, 16, 100),
+    # Test that buckets are merged once full.
+    (64, 4, 16, 1000),
+    # Test that buckets coarser than the raw ticks keep working.
+    (16, 4, 4, 5000),
+    # Test that buckets are merged until the raw ticks moved out fit.
+    (64, 4, 2, 1000),
+    (64, 4, 3, 1000),
+    (16, 1, 3, 5000),
+]
+
+@pytest.mark.parametrize("capacity,bucket,bucket_capacity,ticks", \
+                         recorder_cases)
+def test_recorder_downsampling(capacity, bucket, bucket_capacity, ticks):
+    """
+    Test that every tick is kept either raw or in a bucket, with the right
+    min, max and mean.
+
+    Args:
+        capacity: an int representing the number of raw ticks kept.
+        bucket: an int representing the ticks per bucket.
+        bucket_capacity: an int representing the number of buckets kept.
+        ticks: an int representing the number of ticks recorded.
+    """
+    factory = gm.Factory(0)
+    recorder = grec.StatsRecorder(factory, capacity, bucket, bucket_capacity)
+    for tick in range(ticks):
+        recorder.record(tick, 2 * tick, 0, tick % 7, 30)
+    raw_ticks, raw = recorder.raw()
+    bucket_ticks, buckets = recorder.buckets()
+    assert len(raw_ticks) <= capacity
+    assert len(bucket_ticks) <= bucket_capacity
+    assert list(raw["money"]) == list(raw_ticks)
+    assert raw_ticks[-1] == ticks - 1
+    # Buckets cover every tick before the raw ticks, in order.
+    edges = list(bucket_ticks) + [raw_ticks[0]]
+    assert edges[0] == 0
+    assert edges == sorted(edges)
+    for index, start in enumerate(bucket_ticks):
+        end = edges[index + 1]
+        money = buckets[index, grec.FIELDS.index("money")]
+        assert money[0] == start
+        assert money[1] == end - 1
+        assert money[2] == pytest.approx((start + end - 1) / 2)
+
+
+def test_recorder_bucket_capacity():
+    """
+    Test that too few buckets to merge into are refused.
+    """
+    with pytest.raises(ValueError):
+        grec.StatsRecorder(gm.Factory(0), 64, 4, 1)
+
+
+def test_recorder_dump(tmp_path):
+    """
+    Test that the recording is written to an NPZ file at the end of a game.
+
+    Args:
+        tmp_path: a pytest temporary directory.
+    """
+    path = tmp_path / "stats.npz"
+    factory = gm.Factory(999999999)
+    generator = gm.Generator(factory, 5, factory.path)
+    recorder = grec.StatsRecorder(factory, 64, 4, 16, str(path))
+    for _ in range(200):
+        factory.tick(generator)
+        recorder.update(generator, 0.0)
+    recorder.close()
+    with np.load(path) as data:
+        assert list(data["fields"]) == grec.FIELDS
+        assert data["raw"].shape[0] == len(grec.FIELDS)
+        assert data["ticks"][-1] == 199
+        assert data["raw"][grec.FIELDS.index("packages"), -1] == 40
+        assert len(data["bucket_ticks"]) == len(data["buckets"])
+
+
+def test_recorder_allocation():
+    """
+    Test that recording ticks through update keeps no memory per tick,
+    downsampling included, and stays within its raw and bucket capacities.
+    """
+    factory = gm.Factory(999999999, convoys=True)
+    generator = gm.Generator(factory, 5, factory.path)
+    factory.generate_packages(factory.path, 500)
+    recorder = grec.StatsRecorder(factory, 64, 4, 16)
+    for _ in range(1000):
+        recorder.update(generator, 0.0)
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        for _ in range(20000):
+            recorder.update(generator, 0.0)
+        grown = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    assert grown < 1024
+    raw_ticks, raw = recorder.raw()
+    bucket_ticks, _ = recorder.buckets()
+    assert len(raw_ticks) <= 64
+    assert len(bucket_ticks) <= 16
+    assert raw_ticks[-1] == 20999
+    assert raw["packages"][-1] == 500
+
+
+@pytest.mark.skipif(not os.environ.get("LOGISTICO_BENCHMARK"), \
+                    reason="set LOGISTICO_BENCHMARK to run benchmarks")
+def test_recorder_cost():
+    """
+    Benchmark that recording a tick through update costs under a
+    microsecond.
+    """
+    factory = gm.Factory(999999999)
+    generator = gm.Generator(factory, 5, factory.path)
+    factory.generate_packages(factory.path, 500)
+    recorder = grec.StatsRecorder(factory)
+    seconds = min(timeit.repeat(lambda: recorder.update(generator, 0.0), \
+                                number=100000, repeat=3)) / 100000
+    assert seconds < 1e-6
@@ -0,0 +1,83 @@
+"""
+Test Logisti-Co sharded engine functions.
+"""
+
+import numpy as np
+import pytest
+import game_model as gm
+import game_shard as gsh
+
+# A path with diagonal legs, where packages move by fractional pixels.
+DIAGONAL_PATH = [(0, 0), (333, 157), (700, 90), (420, 555), (10, 590)]
+
+# Towers in the form (x_pos, y_pos, rate, radius).
+TOWERS = [(300, 150, 30, 60), (310, 160, 25, 80), (600, 120, 40, 70), \
+          (420, 400, 20, 90), (200, 500, 35, 100), (650, 300, 15, 100)]
+
+match_cases = [
+    # Form: (path, workers, ticks)
+    # Test that a single worker matches the single-process engine.
+    (gm.FACTORY_PATH, 1, 3000),
+    # Test that packages handed off between workers are not lost or doubled.
+    (gm.FACTORY_PATH, 3, 3000),
+    # Test that fractional movement matches bit for bit.
+    (DIAGONAL_PATH, 2, 1500),
+]
+
+@pytest.mark.parametrize("path,workers,ticks", match_cases)
+def test_matches_factory(path, workers, ticks):
+    """
+    Test that the sharded engine packs, fails and earns exactly what Factory
+    does and leaves packages in the same places.
+
+    Args:
+        path: a list of tuples of ints which represent waypoints.
+        workers: an int representing the number of worker processes.
+        ticks: an int representing the game ticks to run.
+    """
+    factory = gm.Factory(1000, path)
+    sharded = gsh.ShardedFactory(1000, path, workers)
+    try:
+        generators = [gm.PoissonGenerator(board, 3, path, seed=5) \
+                      for board in (factory, sharded)]
+        for x_pos, y_pos, rate, radius in TOWERS:
+            factory.generate_tower(x_pos, y_pos, rate, radius)
+            sharded.generate_tower(x_pos, y_pos, rate, radius)
+        for _ in range(ticks):
+            factory.tick(generators[0])
+            sharded.tick(generators[1])
+        assert (sharded.packed, sharded.failed, sharded.money) == \
+               (factory.packed, factory.failed, factory.money)
+        assert factory.packed > 0
+        assert [tally[1:] for tally in sharded.tower_state.tallies()] == \
+               [tally[1:] for tally in factory.tower_state.tallies()]
+        locations = np.array([package.location \
+                              for package in factory.packages])
+        assert np.array_equal(sharded.locations(), locations)
+    finally:
+        sharded.close()
+
+
+def test_shard_blocks():
+    """
+    Test that shards own contiguous slots by traveled distance, the end of
+    the path first.
+    """
+    traveled = np.array([250, 240, 120, 100, 99, 5, 0, 0])
+    bounds = np.array([0, 100, 200, np.inf])
+    assert gsh.shard_blocks(traveled, bounds).tolist() == [0, 2, 4, 8]
+
+
+def test_compaction():
+    """
+    Test that slots of removed packages are reused once the arrays fill up.
+    """
+    sharded = gsh.ShardedFactory(0, gm.FACTORY_PATH, 1, capacity=64)
+    try:
+        generator = gm.Generator(sharded, 50, sharded.path)
+        sharded.simulate(generator, 3500)
+        assert sharded.failed == 10
+        with pytest.raises(RuntimeError):
+            sharded.generate_packages(sharded.path, 65)
+    finally:
+        sharded.close()
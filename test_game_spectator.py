@@ -0,0 +1,190 @@
+"""
+Test Logisti-Co spectator server and client functions.
+"""
+
+import json
+import socket
+import time
+import pytest
+import pygame
+import game_model as gm
+import game_spectator as gs
+
+# pylint: disable=no-member
+pygame.init()
+
+
+def wait_for(condition, timeout=5):
+    """
+    Wait until a condition holds.
+
+    Args:
+        condition: a callable returning a bool.
+        timeout: a float representing the most seconds to wait.
+
+    Returns:
+        The last result of condition.
+    """
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def visible_packages(factory):
+    """
+    Returns a dict mapping the serials of every package on a gameboard to
+    the (x, y) center it is drawn at.
+
+    Args:
+        factory: a Factory instance.
+    """
+    packages = {package.serial: package.rect.center \
+                for package in factory.packages}
+    if factory.convoys is not None:
+        for age, serial in factory.convoys.members():
+            location = factory.convoys.location(age)
+            packages[serial] = (int(location[0]), int(location[1]))
+    return packages
+
+
+@pytest.mark.parametrize("convoys", [False, True])
+def test_delta_round_trip(convoys):
+    """
+    Test that applying a keyframe then deltas of spawned and removed
+    packages rebuilds the state, replaying the moves of every package.
+
+    Args:
+        convoys: a bool telling whether packages are advanced in convoys.
+    """
+    factory = gm.Factory(999999999, convoys=convoys, journal=4096)
+    generator = gm.Generator(factory, 3, factory.path)
+    factory.generate_tower(100, 84, 10, 50)
+    reader = factory.journal.subscribe()
+    mirror = gs.MirrorBoard()
+    state = gs.board_state(factory)
+    mirror.apply(gs.keyframe(factory.journal.tick, factory.path, state))
+    previous = state[1:]
+    sizes = []
+    for _ in range(3000):
+        factory.tick(generator)
+        records, missed = reader.read()
+        assert missed == 0
+        summary = gs.board_summary(factory)
+        message = gs.delta(factory.journal.tick, records, previous, summary)
+        sizes.append(len(json.dumps(message)))
+        mirror.apply(message)
+        previous = summary
+    assert mirror.packages == visible_packages(factory)
+    assert mirror.towers == previous[0]
+    assert mirror.hud == previous[1]
+    assert factory.packed > 0 and factory.failed > 0
+    # Moving packages are never sent, so deltas stay small however many
+    # packages are on the board.
+    assert len(mirror.packages) > 100
+    assert max(sizes) < 200
+
+
+def test_server_needs_journal():
+    """
+    Test that boards without a journal, or whose packages follow a flow
+    field, are refused.
+    """
+    with pytest.raises(ValueError):
+        gs.SpectatorServer(gm.Factory(1000))
+    with pytest.raises(ValueError):
+        gs.SpectatorServer(gm.Factory(1000, journal=64, flow_cell=20))
+
+
+def test_no_capture_without_spectators(monkeypatch):
+    """
+    Test that nothing is captured while no spectator is connected.
+
+    Args:
+        monkeypatch: the pytest monkeypatch fixture.
+    """
+    factory = gm.Factory(999999999, journal=64)
+    generator = gm.Generator(factory, 2, factory.path)
+    server = gs.SpectatorServer(factory, batch_ticks=1)
+    def fail(_gameboard):
+        raise AssertionError("captured without spectators")
+    monkeypatch.setattr(gs, "board_state", fail)
+    monkeypatch.setattr(gs, "board_summary", fail)
+    try:
+        for _ in range(200):
+            factory.tick(generator)
+            server.update(generator, 0.0)
+    finally:
+        server.close()
+
+
+def test_spectator_drops_and_resyncs():
+    """
+    Test that a full queue drops batches and asks for a keyframe.
+    """
+    spectator = gs.Spectator(1)
+    spectator.offer(b"delta", b"key")
+    spectator.offer(b"delta", b"key")
+    assert spectator.resync
+    assert spectator.dropped == 1
+    assert spectator.queue.get_nowait() == b"key"
+    spectator.offer(b"delta", b"key")
+    assert spectator.queue.get_nowait() == b"key"
+    spectator.offer(b"delta", b"key")
+    assert spectator.queue.get_nowait() == b"delta"
+
+
+def test_stream_to_spectators():
+    """
+    Test that spectators joining at different times follow the game, even
+    when another spectator never reads, and can be drawn.
+    """
+    factory = gm.Factory(999999999, journal=4096)
+    generator = gm.Generator(factory, 2, factory.path)
+    factory.generate_tower(300, 84, 10, 50)
+    server = gs.SpectatorServer(factory, keyframe_interval=50, batch_ticks=3)
+    stalled = socket.create_connection(("127.0.0.1", server.port))
+    early = gs.SpectatorClient(server.port)
+    try:
+        assert wait_for(lambda: server.spectators == 2)
+        late = None
+        for tick in range(600):
+            factory.tick(generator)
+            server.update(generator, 0.0)
+            if tick == 300:
+                late = gs.SpectatorClient(server.port)
+                assert wait_for(lambda: server.spectators == 3)
+        towers, hud = gs.board_summary(factory)
+        for client in (early, late):
+            assert wait_for(lambda client=client: \
+                            client.mirror.tick == factory.journal.tick)
+            with client.lock:
+                assert client.mirror.packages == visible_packages(factory)
+                assert client.mirror.towers == towers
+                assert client.mirror.hud == hud
+        view = gs.SpectatorView(early, pygame.Surface((1100, 600)))
+        view.draw()
+        late.close()
+    finally:
+        early.close()
+        stalled.close()
+        server.close()
+
+
+def test_watch_drains_events():
+    """
+    Test that watching drains every event, not just QUIT, and stops once
+    the window is closed.
+    """
+    factory = gm.Factory(999999999, journal=64)
+    server = gs.SpectatorServer(factory)
+    try:
+        pygame.display.set_mode([1100, 600])
+        pygame.event.clear()
+        for _ in range(50):
+            pygame.event.post(pygame.event.Event(pygame.USEREVENT))
+        pygame.event.post(pygame.event.Event(pygame.QUIT))
+        gs.watch(server.port)
+        assert not pygame.event.peek(pygame.USEREVENT)
+    finally:
+        server.close()
@@ -0,0 +1,110 @@
+"""
+Test Logisti-Co view functions.
+"""
+
+import pytest
+import pygame
+import game_model as gm
+import game_view as gv
+
+# pylint: disable=no-member
+pygame.init()
+
+
+test_draw_cases = [
+    # Form: (package_count, tower_locations, return_rects, expected_rects)
+    # Test that nothing is returned when rects are not requested.
+    (100, [(400, 400)], False, None),
+    # Test that a rect is returned for every package and tower.
+    (100, [(400, 400), (200, 300)], True, 102),
+    # Test an empty gameboard returns no rects.
+    (0, [], True, 0),
+]
+
+@pytest.mark.parametrize("package_count,tower_locations,return_rects," \
+                         "expected_rects", test_draw_cases)
+def test_draw(package_count, tower_locations, return_rects, expected_rects):
+    """
+    Test that packages and towers are blitted in batches.
+
+    Args:
+        package_count: an int representing the packages on the gameboard.
+        tower_locations: a list of tuples of ints representing where towers
+                         are placed.
+        return_rects: a bool telling the view to return drawn rects.
+        expected_rects: the expected number of rects returned by draw, or None.
+    """
+    factory = gm.Factory(999999999)
+    factory.generate_packages(factory.path, package_count)
+    for location in tower_locations:
+        factory.generate_tower(location[0], location[1], 10, 10)
+    view = gv.PyGameView(factory, return_rects)
+    rects = view.draw()
+    if expected_rects is None:
+        assert rects is None
+    else:
+        assert len(rects) == expected_rects
+
+
+
+def test_sdl2_view():
+    """
+    Test that the SDL2 renderer backend draws headless with the software
+    renderer and uploads shared sprite surfaces once.
+    """
+    factory = gm.Factory(999999999)
+    factory.generate_packages(factory.path, 50)
+    factory.generate_tower(400, 400, 10, 10)
+    factory.generate_tower(200, 300, 10, 10)
+    view = gv.SDL2View(factory, software=True, hidden=True)
+    view.draw()
+    view.draw()
+    # One texture for the shared box and one for the first tower frame.
+    assert view.textures == 2
+    assert view.to_surface().get_size() == (1100, 600)
+    assert len(view.hud_texts) == 3
+
+
+class SquareOverlay():
+    """
+    An overlay drawing a square, which can be swapped for a new one.
+
+    Attributes:
+        surface: the Surface of the square drawn.
+    """
+
+    def __init__(self, color):
+        """
+        Initialize SquareOverlay.
+
+        Args:
+            color: a tuple of ints of the color of the square.
+        """
+        self.surface = pygame.Surface((20, 20))
+        self.surface.fill(color)
+
+    def blits(self):
+        """
+        Returns a list of (surface, position) tuples of the overlay.
+        """
+        return [(self.surface, (500, 500))]
+
+
+def test_sdl2_view_overlays():
+    """
+    Test that the SDL2 renderer backend draws overlays, uploading their
+    surfaces only when they change and dropping replaced ones.
+    """
+    factory = gm.Factory(999999999)
+    overlay = SquareOverlay((255, 0, 0))
+    view = gv.SDL2View(factory, software=True, hidden=True, \
+                       overlays=[overlay])
+    view.draw()
+    view.draw()
+    assert view.overlay_textures == 1
+    assert view.to_surface().get_at((510, 510))[:3] == (255, 0, 0)
+    overlay.surface = pygame.Surface((20, 20))
+    overlay.surface.fill((0, 0, 255))
+    view.draw()
+    assert view.overlay_textures == 1
+    assert view.to_surface().get_at((510, 510))[:3] == (0, 0, 255)
@@ -43,15 +43,18 @@ class EventTest():
     Attributes:
         type: the pygame Event type.
         button: an int correstponding to the mouse button pressed.
+        pos: a tuple of ints representing where the mouse was clicked.
     """
 
-    def __init__(self, event_type, button):
+    def __init__(self, event_type, button, pos=(0,0)):
         """
-        Initialize type and button.
+        Initialize type, button and position.
 
         Args:
             type: a pygame Event type.
             button: an int correstponding to the mouse button pressed.
+            pos: a tuple of ints representing where the mouse was clicked.
         """
         self.type = event_type
         self.button = button
+        self.pos = pos